@@ -3,1068 +3,754 @@ Dashboard Completo de Prácticas de Fisiología Vegetal
 Universidad Autónoma de Madrid (UAM)
 
 5 Prácticas completas con análisis, validaciones, gráficas y PDF
+
+Interfaz Gradio sobre el paquete practicas (análisis, figuras e informe PDF,
+sin dependencias de la interfaz): aquí solo quedan la caché de resultados, el
+almacén de archivos, el pool de procesos, la cola de PDF y la interfaz.
 """
 
-import gradio as gr
+# Solo lo imprescindible al importar: Gradio se importa al crear la interfaz y
+# scipy.optimize, matplotlib y ReportLab en la primera función que los usa (o
+# antes, en el hilo de precalentamiento). Así la interfaz aparece antes al
+# reiniciar el Space y los procesos de trabajo no cargan Gradio.
+# Vigilar el tiempo de arranque con: python benchmarks/startup.py
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
-from scipy.stats import linregress
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+import contextlib
 import tempfile
-import io
+import os
+import time
+import hashlib
+import threading
+import multiprocessing
 import warnings
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+
+from practicas import (
+    FIGURES, METRICS, PRACTICA_OUTPUTS, PRACTICA_PROCESSORS, Counter, Gauge, InvalidWorkbookError, Trace,
+    MAX_WORKBOOK_BYTES, build_pdf, check_workbook, current_trace, figure_is_live, image_format, is_figure,
+    open_practicas_workbook, open_workbook, practica_digest, resident_memory_bytes, span, traced_call, warm_worker, with_figure_images,
+    without_figures,
+)
 
 warnings.filterwarnings('ignore')
-plt.ion()  # Activar modo interactivo para que las figuras no se cierren
 
 # ============================================================================
-# FUNCIONES MATEMÁTICAS
+# CACHÉ DE RESULTADOS
 # ============================================================================
 
-def sigmoid(x, xmid, scal):
-    """Función sigmoide: 100 / (1 + exp(-(x - xmid) * scal))"""
-    return 100 / (1 + np.exp(-(x - xmid) * scal))
-
-def calculate_potencial_50(xmid, scal):
-    """Calcula el potencial osmótico al 50% de plasmólisis"""
-    return round((np.log((100 - 50) / 50) / scal) + xmid, 2)
-
-def validate_column(df, student_col, correct_col, tolerance=0.1):
-    """Valida si los cálculos del estudiante son correctos"""
-    ratio = df[student_col] / df[correct_col]
-    return ['✅ Correcto' if ((0.9 <= r <= 1.1) or (df[student_col].iloc[i] == 0 and df[correct_col].iloc[i] == 0)) 
-            else '❌ Incorrecto' for i, r in enumerate(ratio)]
-
-def style_dataframe(df, validation_cols=[]):
-    """Aplica estilo a DataFrame con colores para validaciones"""
-    def highlight_row(row):
-        colors = []
-        for col in df.columns:
-            if col in validation_cols:
-                colors.append('background-color: #d4edda' if '✅' in str(row[col]) else 'background-color: #f8d7da')
-            else:
-                colors.append('')
-        return colors
-    return df.style.apply(highlight_row, axis=1)
+def file_digest(file_path, chunk_size=1 << 20):
+    """SHA-256 del contenido del archivo subido (identifica el libro, no su nombre)"""
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def estimate_size(value):
+    """Estimación en bytes de lo que ocupa un resultado (para el límite de la caché)"""
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, bytes):
+        return len(value)
+    if is_figure(value):
+        # Lo que ocupa el lienzo RGBA una vez dibujado
+        width, height = value.get_size_inches() * value.dpi
+        return int(width * height * 4)
+    if isinstance(value, str):
+        if value.endswith('.pdf') and os.path.isfile(value):
+            return os.path.getsize(value)
+        return len(value.encode('utf-8'))
+    return 64
+
+class ResultCache:
+    """Caché LRU en memoria con caducidad (TTL) y límite de tamaño total.
+
+    Se indexa por el hash del archivo subido: volver a subir el mismo libro (o
+    pulsar otra vez "Analizar Todo") devuelve los 35 outputs ya calculados.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024, ttl=3600, on_evict=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (creado, tamaño, valor)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def peek(self, key):
+        """Como get, pero sin contar acierto ni fallo: para consultas que no son subidas"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                return None
+            return entry[2]
+
+    def put(self, key, value, size=None):
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), size, value)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, size, value = self._entries.pop(key)
+        self.total_bytes -= size
+        if self.on_evict is not None:
+            self.on_evict(value)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+# Las figuras de un resultado expulsado no se liberan: pueden seguir en
+# PRACTICA_CACHE o mostrándose. Se recogen cuando ninguna caché las usa
+RESULT_CACHE = ResultCache()
+
+# Resultado de cada práctica por el contenido de su hoja (practica_digest):
+# al volver a subir el libro con una práctica corregida, las demás se reutilizan.
+# Con FIGURE_OUTPUT='imagen' guarda los bytes de cada imagen, no la figura
+PRACTICA_CACHE = ResultCache(max_entries=5 * 32)
+
+def _cached_outputs_valid(outputs):
+    """Un resultado cacheado solo sirve si su PDF y sus imágenes siguen en disco y sus figuras no se han liberado"""
+    pdf_path = outputs[-1]
+    if pdf_path is not None and not os.path.isfile(pdf_path):
+        return False
+    if not all(os.path.isfile(v) for v in outputs if _is_image_path(v)):
+        return False
+    return all(figure_is_live(v) for v in outputs if is_figure(v))
+
+def _cached_result_valid(result):
+    """Un resultado de práctica cacheado solo sirve si sus figuras no se han liberado"""
+    return all(figure_is_live(v) for v in result.values() if is_figure(v))
 
 # ============================================================================
-# PRÁCTICA 1: POTENCIAL OSMÓTICO Y HÍDRICO
+# ALMACÉN DE ARCHIVOS GENERADOS
 # ============================================================================
 
-def process_practica1(file_path):
-    """Procesa toda la Práctica 1: sacarosa, cebolla y patata"""
-    results = {}
-    
-    try:
-        print(f"  → Leyendo Práctica 1 de: {file_path}")
-        # 1. SACAROSA
-        df_sac = pd.read_excel(file_path, sheet_name="Practica 1", usecols="B:C", skiprows=5, nrows=8)
-        df_sac.columns = ['Concentración (M)', 'Ψ estudiante (MPa)']
-        df_sac['Ψ correcto (MPa)'] = round(-df_sac['Concentración (M)'] * 0.008314 * 295, 2)
-        df_sac['Validación'] = validate_column(df_sac, 'Ψ estudiante (MPa)', 'Ψ correcto (MPa)')
-        results['sacarosa'] = df_sac
-        print(f"  ✓ Sacarosa: {len(df_sac)} filas")
-        results['sacarosa_expl'] = r"""
-**Cálculo del potencial hídrico de sacarosa usando ecuación de van't Hoff:**
-
-Para el cálculo del potencial hídrico de la solución de sacarosa utilizamos la ecuación de van't Hoff:
-
-$$\Psi_{s}=-RTiCs$$
-
-Asumiendo que obtenemos un valor X al aplicar la ecuación, para la conversión de las unidades debería seguir los siguientes pasos:
-
-$$X\: \frac{J}{{\color{red}{K}} \cdot {\color{red} {mol}}} \times {{\color{red}{K}}} \times {\frac{\color{red} {mol}}{L}} \Rightarrow X\: \frac{J}{{\color{red} {L}}} \times {\frac{1000\:{\color{red} {L}}}{m^{3}}}\Rightarrow$$
-
-$$\Rightarrow 1000X\: \frac{J}{m^{3}}\Rightarrow 1000X\: {\color{red} {Pa}} \times{\frac{MPa}{10^{6}\color{red} {Pa}}}$$
-
-Por lo tanto la fórmula final podríamos reflejarla como:
-
-$$\Psi_{w}=-\frac{X}{1000} \text{ MPa}$$
-"""
-        
-        # 2. CEBOLLA
-        df_onion = pd.read_excel(file_path, sheet_name="Practica 1", usecols="B:E", skiprows=17, nrows=7, header=None)
-        df_onion.columns = ['Tubos', 'Concentración (M)', 'Ψπ (MPa)', '% plasmólisis']
-        df_onion['Ψπ (MPa)'] = pd.to_numeric(df_onion['Ψπ (MPa)'], errors='coerce')
-        df_onion['% plasmólisis'] = pd.to_numeric(df_onion['% plasmólisis'], errors='coerce')
-        df_onion = df_onion.dropna()
-        
-        # Validar plasmólisis decreciente
-        plasmo_val = []
-        for i in range(len(df_onion)):
-            if i == 0:
-                plasmo_val.append('✅' if df_onion['% plasmólisis'].iloc[i] >= df_onion['% plasmólisis'].iloc[i+1] else '❌')
-            elif i == len(df_onion)-1:
-                plasmo_val.append('✅' if df_onion['% plasmólisis'].iloc[i] <= df_onion['% plasmólisis'].iloc[i-1] else '❌')
-            else:
-                plasmo_val.append('✅' if (df_onion['% plasmólisis'].iloc[i] <= df_onion['% plasmólisis'].iloc[i-1] and 
-                                          df_onion['% plasmólisis'].iloc[i] >= df_onion['% plasmólisis'].iloc[i+1]) else '❌')
-        df_onion['Val. Orden'] = plasmo_val
-        
-        # Modelo sigmoide
+# Directorio propio para los PDF (y demás archivos generados) en lugar de
+# dejarlos sueltos en /tmp; se limpia por antigüedad y por tamaño total.
+ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR', os.path.join(tempfile.gettempdir(), 'practicas_artifacts'))
+ARTIFACT_MAX_BYTES = int(os.environ.get('ARTIFACT_MAX_MB', 512)) * 1024 * 1024
+ARTIFACT_TTL = int(os.environ.get('ARTIFACT_TTL', 24 * 3600))          # segundos sin usarse
+ARTIFACT_SWEEP_INTERVAL = int(os.environ.get('ARTIFACT_SWEEP_INTERVAL', 600))
+
+class ArtifactStore:
+    """Archivos generados en un directorio gestionado, con nombre por contenido.
+
+    Cada archivo se guarda como <clave><sufijo>: la clave es el SHA-256 de
+    su contenido o una dada por quien lo guarda (p.ej. el hash del libro del
+    que sale un informe), así que el mismo contenido nunca se guarda dos
+    veces. La fecha de modificación marca el último uso: sweep() borra lo
+    que lleva más de `ttl` sin usarse y, si se supera `max_bytes`, lo usado
+    hace más tiempo. Es seguro entre procesos (escrituras atómicas).
+    """
+
+    def __init__(self, directory, max_bytes=ARTIFACT_MAX_BYTES, ttl=ARTIFACT_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sweeper = None
+        self._stop = threading.Event()
+
+    def path_for(self, key, suffix):
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def get(self, key, suffix):
+        """Ruta del archivo guardado con esa clave (y lo marca como usado), o None"""
+        path = self.path_for(key, suffix)
         try:
-            x = df_onion['Ψπ (MPa)'].values
-            y = df_onion['% plasmólisis'].values
-            params, _ = curve_fit(sigmoid, x, y, p0=[np.median(x), 1], maxfev=5000)
-            xmid, scal = params
-            potencial_osm = calculate_potencial_50(xmid, scal)
-            
-            fig_onion, ax = plt.subplots(figsize=(10, 7))
-            ax.scatter(x, y, s=80, alpha=0.7, color='#2ecc71', edgecolors='black', linewidths=2, label='Datos', zorder=3)
-            x_range = np.linspace(x.min(), x.max(), 200)
-            ax.plot(x_range, sigmoid(x_range, xmid, scal), 'b-', linewidth=3, label='Modelo sigmoide', zorder=2)
-            ax.axhline(y=50, color='gray', linestyle='--', linewidth=2, alpha=0.6, label='50% plasmólisis', zorder=1)
-            ax.axvline(x=potencial_osm, color='red', linestyle=':', linewidth=2.5, alpha=0.8, label=f'Ψπ = {potencial_osm} MPa', zorder=1)
-            ax.set_xlabel('Potencial osmótico (MPa)', fontsize=14, fontweight='bold')
-            ax.set_ylabel('Porcentaje de plasmólisis (%)', fontsize=14, fontweight='bold')
-            ax.set_title('Plasmólisis en células de cebolla', fontsize=16, fontweight='bold', pad=20)
-            ax.legend(fontsize=12, frameon=True, shadow=True)
-            ax.grid(True, alpha=0.3, linestyle='--')
-            plt.tight_layout()
-            plt.draw()  # Dibujar la figura
-            
-            results['onion'] = df_onion
-            results['onion_fig'] = fig_onion
-            results['onion_pot'] = potencial_osm
-            print(f"  ✓ Cebolla: {len(df_onion)} filas, potencial={potencial_osm} MPa")
-            results['onion_expl'] = f"""
-**Análisis de Plasmólisis:**
-
-A la hora de revisar los resultados, hay que cerciorarse de que el porcentaje de células plasmolizadas **disminuya a la par que se reduce la concentración de sacarosa en el medio**. 
-
-En una solución hipertónica como la del tubo 1, el potencial osmótico de las células será superior al del medio y por tanto perderán agua conduciendo a la plasmólisis. Si se disminuye la concentración de sacarosa en el medio, su potencial osmótico irá aumentando hasta el punto en el que será hipotónica respecto al tejido y las moléculas de agua pasarán a las células provocando la turgencia. 
-
-Por lo tanto, para estimar el potencial osmótico medio del tejido de epidermis de cebolla observamos el porcentaje de células plasmolizadas y ajustamos los puntos a una **curva sigmoide**.
-
-El valor del potencial osmótico medio corresponderá al punto en el que se observa que el 50% de las células han plasmolizado.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
 
-**Por lo tanto, el valor de Potencial osmótico medio se puede estimar en este caso en** <span style='color:red; font-weight:bold;'>{potencial_osm} MPa</span>
-
-**Parámetros del modelo:** xmid = {round(xmid, 3)}, scal = {round(scal, 3)}
-"""
-        except Exception as e:
-            results['onion_error'] = f"Error en modelo sigmoide: {e}"
-        
-        # 3. PATATA
-        df_potato = pd.read_excel(file_path, sheet_name="Practica 1", usecols="B:G", skiprows=37, nrows=7, header=None)
-        df_potato.columns = ['Tubos', 'Concentración (M)', 'Ψw (MPa)', 'Peso inicial (g)', 'Peso final (g)', '% Var estudiante']
-        df_potato['% Var correcto'] = round((df_potato['Peso final (g)'] - df_potato['Peso inicial (g)']) / df_potato['Peso inicial (g)'] * 100, 2)
-        df_potato['Validación'] = validate_column(df_potato, '% Var estudiante', '% Var correcto')
-        
-        # Regresión lineal
-        x = df_potato['Ψw (MPa)'].values
-        y = df_potato['% Var estudiante'].values
-        slope, intercept, r_value, _, _ = linregress(x, y)
-        hydric_pot = round(-intercept / slope, 2)
-        
-        fig_potato, ax = plt.subplots(figsize=(10, 7))
-        ax.scatter(x, y, s=80, alpha=0.7, color='#e74c3c', edgecolors='black', linewidths=2, label='Datos', zorder=3)
-        ax.plot(x, slope * x + intercept, 'b-', linewidth=3, label='Regresión lineal', zorder=2)
-        ax.axhline(y=0, color='gray', linestyle='--', linewidth=2, alpha=0.6, zorder=1)
-        ax.axvline(x=hydric_pot, color='red', linestyle=':', linewidth=2.5, alpha=0.8, label=f'Ψw = {hydric_pot} MPa', zorder=1)
-        ax.set_xlabel('Potencial hídrico (MPa)', fontsize=14, fontweight='bold')
-        ax.set_ylabel('Variación de peso (%)', fontsize=14, fontweight='bold')
-        ax.set_title('Potencial hídrico en patata', fontsize=16, fontweight='bold', pad=20)
-        ax.legend(fontsize=12, frameon=True, shadow=True)
-        ax.grid(True, alpha=0.3, linestyle='--')
-        plt.tight_layout()
-        plt.draw()  # Dibujar la figura
-        
-        results['potato'] = df_potato
-        results['potato_fig'] = fig_potato
-        results['potato_pot'] = hydric_pot
-        print(f"  ✓ Patata: {len(df_potato)} filas, potencial={hydric_pot} MPa")
-        results['potato_expl'] = f"""
-**Cálculo del Potencial Hídrico:**
-
-Para el cálculo del potencial hídrico del tubérculo de patata comparamos la variación de peso (en porcentaje) del tejido de patata frente al Potencial hídrico de la solución de sacarosa.
-
-Antes hemos de cerciorarnos que hemos calculado bien el porcentaje de variación de peso:
-
-$$\\frac{{(\\text{{Peso final}} - \\text{{Peso inicial}})}}{{\\text{{Peso inicial}}}} \\times 100$$
-
-Para calcular el Potencial hídrico del tejido de patata, hemos de asumir que la relación entre el Potencial hídrico y la variación de peso es lineal:
-
-$$\\% \\text{{ Variación de peso}} = a \\times \\text{{Potencial hídrico}} + b$$
-
-Si asumimos que el Potencial hídrico del tejido es aquel valor de Potencial hídrico que hace que la variación de peso sea 0, podemos despejar la ecuación anterior para encontrar el valor de Potencial hídrico:
-
-$$0 = a \\times \\text{{Potencial hídrico}} + b$$
-
-$$\\text{{Potencial hídrico}} = -\\frac{{b}}{{a}}$$
-
-Para encontrar los valores de a y b, podemos usar el método de **mínimos cuadrados**, que nos permitirá encontrar la recta que mejor se ajusta a los datos.
-
-Al aplicarlos obtenemos un valor de pendiente igual a <span style='color:red; font-weight:bold;'>{round(slope, 3)}</span>, y un valor de ordenada de origen igual a <span style='color:red; font-weight:bold;'>{round(intercept, 3)}</span>.
-
-Despejando obtenemos que el **Potencial hídrico del tejido es igual a** <span style='color:red; font-weight:bold;'>{hydric_pot} MPa</span>
-"""
-        
-    except Exception as e:
-        results['error'] = f"Error procesando Práctica 1: {e}"
-    
-    return results
-
-# ============================================================================
-# PRÁCTICA 2: AUXINAS Y ESTRÉS SALINO
-# ============================================================================
-
-def process_practica2(file_path):
-    """Procesa Práctica 2: maíz (auxina) y guisante (NaCl)"""
-    results = {}
-    
-    try:
-        print(f"  → Leyendo Práctica 2 de: {file_path}")
-        
-        # 1. MAÍZ - AUXINA (B8:F10 en R, equivale a skiprows=7, nrows=2 - solo datos válidos)
-        # En R se lee horizontal y se transpone, aquí leemos directamente
+    def touch(self, path):
+        """Marca como usado un archivo del almacén (p.ej. al descargarlo)"""
         try:
-            df_corn = pd.read_excel(file_path, sheet_name="Practica 2", usecols="B:F", skiprows=7, nrows=2)
-            print(f"  → Maíz leído: {df_corn.shape}")
-            # Transponer: las columnas son tratamientos
-            df_corn_t = df_corn.T
-            df_corn_t.columns = df_corn_t.iloc[0]
-            df_corn_t = df_corn_t[1:].reset_index()
-            df_corn_t.columns = ['Tratamiento', 'Media longitud (mm)', 'Variación(%) estudiante']
-            df_corn_t['Variación(%) correcto'] = round((df_corn_t['Media longitud (mm)'].astype(float) - 10) / 10 * 100, 2)
-            df_corn_t['Validación'] = validate_column(df_corn_t, 'Variación(%) estudiante', 'Variación(%) correcto')
-            
-            fig_corn, ax = plt.subplots(figsize=(10, 7))
-            x_pos = np.arange(len(df_corn_t))
-            bars = ax.bar(x_pos, df_corn_t['Variación(%) correcto'], color=['#3498db', '#e74c3c', '#2ecc71', '#f39c12'], edgecolor='black', linewidth=1.0)
-            ax.set_xticks(x_pos)
-            ax.set_xticklabels(df_corn_t['Tratamiento'], fontsize=12, rotation=15, ha='right')
-            ax.set_xlabel('Tratamiento', fontsize=14, fontweight='bold')
-            ax.set_ylabel('Variación (%)', fontsize=14, fontweight='bold')
-            ax.set_title('Efecto de auxina en coleóptilos de maíz', fontsize=16, fontweight='bold', pad=20)
-            ax.grid(axis='y', alpha=0.3, linestyle='--')
-            for i, bar in enumerate(bars):
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height, f'{height:.1f}%', ha='center', va='bottom', fontweight='bold')
-            plt.tight_layout()
-            plt.draw()  # Dibujar la figura
-            
-            results['corn'] = df_corn_t
-            results['corn_fig'] = fig_corn
-            print(f"  ✓ Maíz: {len(df_corn_t)} filas")
-        except Exception as e:
-            error_msg = f"Error en Maíz: {str(e)}"
-            print(f"  ✗ {error_msg}")
-            results['corn'] = pd.DataFrame()
-            results['corn_fig'] = None
-            results['corn_error'] = error_msg
-        
-        results['corn_expl'] = r"""
-**Efecto de Auxina en Coleóptilos de Maíz:**
-
-Para el cálculo de la variación de longitud de coleóptilo de maíz, hemos de comparar la longitud media de coleóptilo de maíz en diferentes tratamientos a las 24h respecto a los 10 mm iniciales.
-
-$$\text{Variación} (\%) = \frac{\text{Longitud media} - 10}{10} \times 100$$
-
-Una vez calculado la variación de longitud en los distintos tratamientos de Auxina tenemos que prestar atención a los valores obtenidos:
-
-- ¿Hay diferencias entre tratamientos?
-- ¿Se elonga el coleóptilo de maíz según incrementamos la concentración de Auxina o llegado un punto se observan alteraciones?
-"""
-        
-        # 2. GUISANTE - ESTRÉS SALINO (H8:K14 en R, equivale a skiprows=7, nrows=7)
-        # En R también se transpone
+            os.utime(path)
+        except OSError:
+            pass
+
+    def put(self, data, suffix, key=None):
+        """Guarda bytes y devuelve su ruta; si ya existía el mismo contenido, la reutiliza"""
+        key = key or hashlib.sha256(data).hexdigest()
+        path = self.get(key, suffix)
+        if path is not None:
+            return path
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='tmp', suffix='.part')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        path = self.path_for(key, suffix)
+        os.replace(tmp, path)
+        return path
+
+    def sweep(self):
+        """Borra lo caducado y, si hace falta, lo menos usado hasta quedar bajo el máximo"""
         try:
-            df_pea = pd.read_excel(file_path, sheet_name="Practica 2", usecols="H:K", skiprows=7, nrows=7)
-            print(f"  → Guisante leído: {df_pea.shape}")
-            # La primera columna contiene los nombres de tratamiento
-            df_pea_t = df_pea.T
-            df_pea_t.columns = df_pea_t.iloc[0]
-            df_pea_t = df_pea_t[1:].reset_index(drop=True)
-            df_pea_t['Concentración NaCl'] = df_pea_t.index.astype(str)
-            df_pea_t = df_pea_t[['Concentración NaCl'] + [col for col in df_pea_t.columns if col != 'Concentración NaCl']]
-            
-            # Calcular variación de peso
-            peso_seco = df_pea_t['Peso seco (g)'].astype(float)
-            peso_humedo = df_pea_t['Peso húmedo (g)'].astype(float)
-            df_pea_t['% Var correcto'] = round((peso_humedo - peso_seco) / peso_seco * 100, 2)
-            
-            # Gráfica de variación de peso
-            fig_pea1, ax = plt.subplots(figsize=(8, 6))
-            ax.bar(range(len(df_pea_t)), df_pea_t['% Var correcto'], color='#16a085', edgecolor='black', linewidth=1.0)
-            ax.set_xticks(range(len(df_pea_t)))
-            ax.set_xticklabels(df_pea_t['Concentración NaCl'], fontsize=11, rotation=45, ha='right')
-            ax.set_xlabel('Concentración NaCl', fontsize=13, fontweight='bold')
-            ax.set_ylabel('Variación peso (%)', fontsize=13, fontweight='bold')
-            ax.set_title('Variación de peso en guisantes', fontsize=15, fontweight='bold')
-            ax.grid(axis='y', alpha=0.3)
-            plt.tight_layout()
-            plt.draw()  # Dibujar la figura
-            
-            # Gráfica de metabolismo (NBT, TFT)
-            fig_pea2, ax = plt.subplots(figsize=(10, 6))
-            x_pos = np.arange(len(df_pea_t))
-            width = 0.25
+            entries = [e for e in os.scandir(self.directory) if e.is_file()]
+        except FileNotFoundError:
+            return 0
+        files = []
+        for entry in entries:
             try:
-                ax.bar(x_pos - width, df_pea_t['% embriones TFT'].astype(float), width, label='TFT', color='#3498db', edgecolor='black')
-                ax.bar(x_pos, df_pea_t['% cotiledones NBT+'].astype(float), width, label='NBT+', color='#f39c12', edgecolor='black')
-                ax.bar(x_pos + width, df_pea_t['% cotiledones NBT++'].astype(float), width, label='NBT++', color='#e74c3c', edgecolor='black')
-                ax.set_xticks(x_pos)
-                ax.set_xticklabels(df_pea_t['Concentración NaCl'], fontsize=11, rotation=45, ha='right')
-                ax.set_xlabel('Concentración NaCl', fontsize=13, fontweight='bold')
-                ax.set_ylabel('Porcentaje (%)', fontsize=13, fontweight='bold')
-                ax.set_title('Actividad metabólica en guisantes', fontsize=15, fontweight='bold')
-                ax.legend(fontsize=11)
-                ax.grid(axis='y', alpha=0.3)
-                plt.tight_layout()
-                plt.draw()  # Dibujar la figura
-            except:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, entry.path))
+        files.sort()
+        now = time.time()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            if now - mtime <= self.ttl and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
                 pass
-            
-            results['pea'] = df_pea_t
-            results['pea_fig1'] = fig_pea1
-            results['pea_fig2'] = fig_pea2
-            print(f"  ✓ Guisante: {len(df_pea_t)} filas")
-        except Exception as e:
-            error_msg = f"Error en Guisante: {str(e)}"
-            print(f"  ✗ {error_msg}")
-            results['pea'] = pd.DataFrame()
-            results['pea_fig1'] = None
-            results['pea_fig2'] = None
-            results['pea_error'] = error_msg
-        
-        results['pea_expl'] = r"""
-**Influencia del Estrés Salino en Guisantes:**
+            total -= size
+        return removed
 
-Para el cálculo de la variación peso de los guisantes, hemos de comparar el peso húmedo de las semillas de guisante tras 24h de tratamiento frente al peso seco de las semillas antes del tratamiento.
+    def total_bytes(self):
+        try:
+            return sum(e.stat().st_size for e in os.scandir(self.directory) if e.is_file())
+        except FileNotFoundError:
+            return 0
+
+    def start_sweeper(self, interval=ARTIFACT_SWEEP_INTERVAL):
+        """Limpieza periódica en un hilo de fondo (una sola vez por proceso)"""
+        if self._sweeper is not None:
+            return
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    removed = self.sweep()
+                    if removed:
+                        print(f"[ALMACÉN] {removed} archivos eliminados")
+                except Exception as e:
+                    print(f"  ⚠ Error limpiando {self.directory}: {e}")
+        self._sweeper = threading.Thread(target=loop, name='artifact-sweeper', daemon=True)
+        self._sweeper.start()
 
-$$\text{Variación} (\%) = \frac{\text{Peso húmedo} - \text{Peso seco}}{\text{Peso seco}} \times 100$$
+    def stop_sweeper(self):
+        self._stop.set()
 
-**Preguntas clave:**
-- ¿El estrés salino afecta a la hidratación de las semillas? ¿A qué se puede deber?
-- Respecto a la viabilidad de las semillas, ¿hay alguna alteración en la actividad metabólica?
-- ¿Has observado acumulación de especies reactivas de oxígeno (ROS)?
-- ¿Qué reactivo nos permitía detectar dichos parámetros?
-"""
-        
-    except Exception as e:
-        results['error'] = f"Error procesando Práctica 2: {e}"
-    
-    return results
+ARTIFACTS = ArtifactStore(ARTIFACT_DIR)
 
 # ============================================================================
-# PRÁCTICA 3: PIGMENTOS
+# EJECUCIÓN CONCURRENTE
 # ============================================================================
 
-def process_practica3(file_path):
-    """Procesa Práctica 3: clorofilas y pigmentos"""
-    results = {}
-    
+# Procesos de trabajo para el análisis (CPU): uno por núcleo salvo que se indique
+# otra cosa; con ANALYSIS_WORKERS=0 el análisis se ejecuta en el propio hilo.
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', os.cpu_count() or 1))
+# Peticiones que Gradio deja esperando en cola antes de rechazar nuevas
+QUEUE_MAX_SIZE = int(os.environ.get('QUEUE_MAX_SIZE', 100))
+# Análisis simultáneos admitidos por la interfaz: no tiene sentido superar el pool
+ANALYSIS_CONCURRENCY = max(1, ANALYSIS_WORKERS)
+
+_analysis_pool = None
+_analysis_pool_lock = threading.Lock()
+
+def get_analysis_pool():
+    """Pool de procesos compartido (se crea en el primer análisis)"""
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is None and ANALYSIS_WORKERS > 0:
+            # 'spawn': el servidor ya tiene hilos en marcha y no es seguro hacer fork
+            _analysis_pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=warm_worker)
+        return _analysis_pool
+
+def _reset_analysis_pool():
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is not None:
+            _analysis_pool.shutdown(wait=False, cancel_futures=True)
+        _analysis_pool = None
+
+class _InlineCall:
+    """Sustituto de Future sin pool: la llamada se ejecuta al pedir el resultado"""
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def result(self):
+        return self.fn(*self.args)
+
+    def cancel(self):
+        return False
+
+# Tareas enviadas al pool que aún no han terminado (métrica practicas_tareas_en_curso)
+_tasks_in_flight = 0
+_tasks_in_flight_lock = threading.Lock()
+
+def _task_done(future):
+    global _tasks_in_flight
+    with _tasks_in_flight_lock:
+        _tasks_in_flight -= 1
+
+def submit_analysis(fn, *args):
+    """Encola fn(*args) en el pool de procesos (o la deja pendiente si no hay pool)"""
+    global _tasks_in_flight
+    pool = get_analysis_pool()
+    if pool is None:
+        return _InlineCall(traced_call, fn, *args)
+    future = pool.submit(traced_call, fn, *args)
+    with _tasks_in_flight_lock:
+        _tasks_in_flight += 1
+    future.add_done_callback(_task_done)
+    return future
+
+def collect_analysis(future):
+    """Espera el resultado de submit_analysis; sus spans van a la traza activa"""
     try:
-        # 1. CLOROFILA
-        abs_val = pd.read_excel(file_path, sheet_name="Practica 3", usecols="G", skiprows=5, nrows=1, header=None).iloc[0, 0]
-        conc_student = pd.read_excel(file_path, sheet_name="Practica 3", usecols="G", skiprows=7, nrows=1, header=None).iloc[0, 0]
-        conc_g_student = pd.read_excel(file_path, sheet_name="Practica 3", usecols="G", skiprows=9, nrows=1, header=None).iloc[0, 0]
-        
-        conc_corr = round(abs_val / 76.07 * 50, 2)
-        conc_g_corr = round(conc_corr * 8 / 4, 2)
-        
-        df_clor = pd.DataFrame({
-            'Parámetro': ['ABS', 'Chla mg/mL', 'Chla mg/g'],
-            'Estudiante': [abs_val, conc_student, conc_g_student],
-            'Correcto': [abs_val, conc_corr, conc_g_corr]
-        })
-        df_clor['Validación'] = validate_column(df_clor, 'Estudiante', 'Correcto')
-        
-        results['clorofila'] = df_clor
-        results['clor_expl'] = rf"""
-**Determinación de la concentración de Chl a en extracto etanólico de espinaca:**
-
-Para el cálculo de la concentración de clorofila, se ha de tener en cuenta que la clorofila a tiene un coeficiente de extinción molar de 76.07 mL/(mg · cm). 
-
-Si aplicamos la ecuación de Lambert Beer:
-
-$$\text{{Chla Determinada}} (\text{{mg/mL}}) = \frac{{\text{{ABS}}}}{{76.07}}$$
-
-Hemos hecho una dilución 1:50 de la muestra, por lo que la concentración de clorofila en la muestra original es:
-
-$$\text{{Chla Extracto}} (\text{{mg/mL}}) = \text{{Chla Determinada}} (\text{{mg/mL}}) \times 50$$
-
-Para calcular la concentración de clorofila respecto a g de espinaca hemos de tener en cuenta de que hemos triturado 4 g de hoja en 8 mL de extracto:
-
-$$\text{{Chla}} (\text{{mg/g}}) = \frac{{\text{{mg Chla}}}}{{\text{{mL Extracto}}}} \times \frac{{8 \text{{ mL Extracto}}}}{{4 \text{{ g Espinaca}}}}$$
-
-**Resultados obtenidos:** {conc_corr} mg/mL, {conc_g_corr} mg/g
-"""
-        
-        # 2. CROMATOGRAFÍA (B16:E22 en R, equivale a skiprows=15, nrows=6 - solo datos válidos)
-        try:
-            df_croma = pd.read_excel(file_path, sheet_name="Practica 3", usecols="B:E", skiprows=15, nrows=6)
-            print(f"  → Cromatografía leída: {df_croma.shape}")
-            df_croma.columns = ['Banda', 'Distancia pigmento', 'Distancia disolvente', 'Rf']
-            
-            # Añadir columna Pigmento si no existe
-            if len(df_croma.columns) < 5:
-                df_croma['Pigmento'] = [''] * len(df_croma)
-            else:
-                df_croma.columns = ['Banda', 'Distancia pigmento', 'Distancia disolvente', 'Rf', 'Pigmento']
-            
-            # Validar Rf decreciente
-            rf_correcto = df_croma['Rf'].iloc[0] == 1 and all(np.diff(df_croma['Rf']) < 0)
-            df_croma['Val. Rf'] = '✅ Correcto' if rf_correcto else '❌ Incorrecto'
-            
-            # Validar pigmentos (solo los que existen)
-            pigs_correct = ['β-caroteno', 'Clorofila a', 'Clorofila b', 'Luteina', 'Violaxantina', 'Neoxantina'][:len(df_croma)]
-            df_croma['Val. Pigmento'] = ['✅' if df_croma['Pigmento'].iloc[i] == pigs_correct[i] else '❌' for i in range(len(df_croma))]
-            
-            results['cromatografia'] = df_croma
-            print(f"  ✓ Cromatografía: {len(df_croma)} filas")
-        except Exception as e:
-            error_msg = f"Error en Cromatografía: {str(e)}"
-            print(f"  ✗ {error_msg}")
-            results['cromatografia'] = pd.DataFrame()
-            results['croma_error'] = error_msg
-        
-        results['croma_expl'] = r"""
-**Caracterización de Pigmentos - Cromatografía:**
-
-A la hora de determinar la identidad de los pigmentos hay que tener en cuenta dos factores: su apolaridad relativa determinada en este caso por el valor de Rf y sus máximos de absorción. 
-
-Para la determinación de cada Rf hay que aplicar la siguiente fórmula:
-
-$$R_f = \frac{\text{Distancia recorrida por el pigmento}}{\text{Distancia recorrida por el disolvente}}$$
-
-El pigmento **más apolar** es el que se mueve más con el disolvente (banda 1) y el **más polar** el que se queda más cerca del punto de aplicación (banda 6). 
+        result, spans = future.result()
+    except BrokenProcessPool:
+        # Un proceso murió (p.ej. sin memoria): el siguiente análisis usará un pool nuevo
+        _reset_analysis_pool()
+        raise
+    trace = current_trace()
+    if trace is not None:
+        trace.extend(spans)
+    # Las figuras llegan copiadas desde el proceso de trabajo: cuentan como vivas aquí
+    if isinstance(result, dict):
+        for value in result.values():
+            if is_figure(value):
+                FIGURES.register(value)
+    return result
 
-Así, el pigmento más polar es el que presenta un **menor valor de Rf** y el más apolar el que presenta un **mayor valor de Rf**.
+# ============================================================================
+# INFORMES PDF EN SEGUNDO PLANO
+# ============================================================================
 
-En el extracto que hemos preparado los pigmentos que se distinguen son: **β-Caroteno, Clorofila a, Clorofila b, Luteina, Violaxantina y Neoxantina**.
+# Trabajos de PDF terminados que se conservan para entregarlos más tarde
+MAX_PDF_JOBS = 64
+
+class PdfJobQueue:
+    """Generación de informes PDF en segundo plano.
+
+    Cada trabajo es de una sesión y un libro (la sesión de Gradio y el hash
+    del archivo subido): cancelar en una pestaña no afecta a las demás. Las
+    sesiones que piden el mismo libro comparten su generación, y el PDF se
+    guarda por contenido. Un hilo por análisis simultáneo lanza build_pdf en
+    el pool y espera a que termine; si ninguna sesión lo sigue esperando, se
+    retira del pool (si aún no ha empezado) o se descarta su resultado.
+    """
+
+    def __init__(self, max_jobs=MAX_PDF_JOBS, max_workers=ANALYSIS_CONCURRENCY):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pdf')
+        self._builds = OrderedDict()  # hash del libro -> Future con la ruta del PDF
+        self._jobs = {}  # (sesión, hash del libro) -> Future de su generación
+        self._pool_futures = {}  # hash del libro -> build_pdf enviado al pool
+        self._cancelled = set()  # hashes cuya generación se ha cancelado
+        self._lock = threading.Lock()
+
+    def submit(self, session, digest, results, outputs=None, trace=None):
+        """Encola el PDF de `results`; si `outputs` se indica, se completa con la ruta al terminar.
+
+        Con `trace`, los tiempos del PDF se añaden a la traza del análisis.
+        """
+        with self._lock:
+            if not self._join(session, digest):
+                self._cancelled.discard(digest)
+                self._builds[digest] = self._executor.submit(self._run, digest, results, outputs, trace)
+                self._jobs[(session, digest)] = self._builds[digest]
+            self._builds.move_to_end(digest)
+            self._prune()
+        return (session, digest)
+
+    def join(self, session, digest):
+        """Suma la sesión a la generación en curso del libro; False si no hay ninguna"""
+        with self._lock:
+            return self._join(session, digest)
+
+    def _join(self, session, digest):
+        build = self._builds.get(digest)
+        if build is None or build.done() or digest in self._cancelled:
+            return False
+        self._jobs[(session, digest)] = build
+        return True
+
+    def _run(self, digest, results, outputs, trace=None):
+        with trace.activate() if trace is not None else contextlib.nullcontext():
+            # Mismo libro que en una subida anterior: el informe ya está en el almacén
+            key = f"informe_{digest}"
+            pdf_path = ARTIFACTS.get(key, '.pdf')
+            if pdf_path is None:
+                with self._lock:
+                    if digest in self._cancelled:
+                        return None
+                    future = self._pool_futures[digest] = submit_analysis(build_pdf, results)
+                # El PDF llega en memoria desde el proceso de trabajo: se escribe una sola vez
+                try:
+                    pdf_bytes = collect_analysis(future)
+                except CancelledError:
+                    pdf_bytes = None
+                finally:
+                    with self._lock:
+                        if self._pool_futures.get(digest) is future:
+                            del self._pool_futures[digest]
+                        cancelled = digest in self._cancelled
+                if cancelled:
+                    print(f"     ✗ PDF {digest[:12]} cancelado")
+                    return None
+                if pdf_bytes is not None:
+                    with span('pdf.guardar', bytes=len(pdf_bytes)):
+                        pdf_path = ARTIFACTS.put(pdf_bytes, '.pdf', key=key)
+            if outputs is not None:
+                outputs[0] = status_output(results, pdf_path, trace=trace)
+                outputs[PDF_OUTPUT] = pdf_path
+        if trace is not None:
+            trace.write()
+        return pdf_path
 
-**Orden de polaridad (de más apolar a más polar):**
-β-Caroteno > Clorofila a > Clorofila b > Luteina > Violaxantina > Neoxantina
-"""
-        
-        # 3. ANABAENA (D27:D28 en R, equivale a skiprows=26, nrows=2)
+    def result(self, session, digest, timeout=None):
+        """Ruta del PDF cuando el trabajo termina; None si no existe, falló o se canceló"""
+        with self._lock:
+            future = self._jobs.get((session, digest))
+        if future is None:
+            return None
         try:
-            abs_anabaena = pd.read_excel(file_path, sheet_name="Practica 3", usecols="D", skiprows=26, nrows=1, header=None).iloc[0, 0]
-            pig_anabaena = pd.read_excel(file_path, sheet_name="Practica 3", usecols="D", skiprows=27, nrows=1, header=None).iloc[0, 0]
-            print(f"  → Anabaena leída: ABS={abs_anabaena}, Pig={pig_anabaena}")
-            
-            df_anabaena = pd.DataFrame({
-                'Resultado': ['Máximos absorción', 'Pigmento estudiante', 'Pigmento correcto'],
-                'Valores': [str(abs_anabaena), pig_anabaena, 'Ficocianina']
-            })
-            
-            results['anabaena'] = df_anabaena
-            print(f"  ✓ Anabaena: {len(df_anabaena)} filas")
+            return future.result(timeout)
+        except CancelledError:
+            return None
         except Exception as e:
-            error_msg = f"Error en Anabaena: {str(e)}"
-            print(f"  ✗ {error_msg}")
-            results['anabaena'] = pd.DataFrame()
-            results['anabaena_error'] = error_msg
-        
-        results['anabaena_expl'] = """
-**Pigmentos en *Anabaena*:**
+            print(f"     ✗ Error generando PDF {digest[:12]}: {e}")
+            return None
 
-En el caso de la extracción de los pigmentos de *Anabaena*, no hemos usado una extracción basada en disolventes apolares. Hemos usado una pequeña cantidad de tolueno para debilitar la membrana de la bacteria para quedarnos con los elementos solubles en agua, y por lo tanto polares.
+    def cancel(self, session, digest):
+        """Cancela el trabajo pendiente o en curso de la sesión; False si ya había terminado.
 
-Al determinar los máximos de Absorbancia apreciamos que el pico está en la región del rojo (~620 nm), de ahí el color azulado que presenta el extracto, y que coincide con el espectro típico de la **ficocianina**.
-
-**Preguntas:**
-- ¿Has comparado el espectro de absorción *in vivo* del cultivo de *Anabaena* con el del extracto de ficocianina?
-- ¿Qué pigmento enmascara el pico de absorción de ficocianina en el cultivo vivo?
-"""
-        
-    except Exception as e:
-        results['error'] = f"Error procesando Práctica 3: {e}"
-    
-    return results
+        La generación solo se detiene si ninguna otra sesión espera el mismo PDF.
+        """
+        with self._lock:
+            build = self._jobs.pop((session, digest), None)
+            if build is None or build.done() or digest in self._cancelled:
+                return False
+            if any(other is build for other in self._jobs.values()):
+                return True
+            self._cancelled.add(digest)
+            build.cancel()
+            pool_future = self._pool_futures.get(digest)
+            if pool_future is not None:
+                pool_future.cancel()
+            return True
+
+    def active(self, session, digest):
+        """True si el trabajo de la sesión sigue en cola o en curso"""
+        with self._lock:
+            future = self._jobs.get((session, digest))
+            return future is not None and not future.done() and digest not in self._cancelled
+
+    def pending(self):
+        """Informes en cola o en curso"""
+        with self._lock:
+            return sum(1 for digest, future in self._builds.items()
+                       if not future.done() and digest not in self._cancelled)
+
+    def _prune(self):
+        # Olvidar las generaciones terminadas más antiguas y sus trabajos (el PDF sigue en la caché)
+        for digest in [k for k, f in self._builds.items() if f.done()]:
+            if len(self._builds) <= self.max_jobs:
+                break
+            build = self._builds.pop(digest)
+            self._cancelled.discard(digest)
+            for job in [j for j, f in self._jobs.items() if f is build]:
+                del self._jobs[job]
+
+PDF_JOBS = PdfJobQueue()
 
 # ============================================================================
-# PRÁCTICA 4: REACCIÓN DE HILL
+# FUNCIÓN PRINCIPAL
 # ============================================================================
 
-def process_practica4(file_path):
-    """Procesa Práctica 4: Reacción de Hill y fotosíntesis"""
-    results = {}
-    
-    # Inicializar variables por defecto para evitar NameError en bloques posteriores
-    chl_corr_mg = 1.0  # Valor por defecto si falla la lectura
-    df_ferri = pd.DataFrame()  # DataFrame vacío por defecto
+def _format_ms(ms):
+    return f"{ms:.0f} ms" if ms >= 10 else f"{ms:.1f} ms"
+
+def timing_lines(trace, pdf_path, pdf_pending=False):
+    """Desglose de tiempos de una traza para el panel de información"""
+    lines = [f"Lectura del libro: {_format_ms(trace.total_ms('lectura.libro'))}"]
+    for n, processor in PRACTICA_PROCESSORS.items():
+        task = processor.__name__
+        if trace.count('cache.practica', funcion=task, acierto=True):
+            lines.append(f"Práctica {n}: reutilizada (su hoja no ha cambiado)")
+            continue
+        parts = [('bloques', trace.total_ms('lectura.bloque', tarea=task)),
+                 ('ajustes', trace.total_ms('ajuste.sigmoide', tarea=task) + trace.total_ms('ajuste.recta', tarea=task)),
+                 ('figuras', trace.total_ms('figura', tarea=task)),
+                 ('imágenes', trace.total_ms('figura.imagen', tarea=task))]
+        detail = ', '.join(f"{label} {_format_ms(ms)}" for label, ms in parts if ms)
+        lines.append(f"Práctica {n}: {_format_ms(trace.total_ms('tarea', funcion=task))}" + (f" ({detail})" if detail else ''))
+    pdf_ms = trace.total_ms('tarea', funcion='build_pdf')
+    if pdf_pending:
+        lines.append("PDF: en preparación")
+    elif pdf_ms:
+        lines.append(f"PDF: {_format_ms(pdf_ms)} (maquetado {_format_ms(trace.total_ms('pdf.maquetado', tarea='build_pdf'))})")
+    elif pdf_path:
+        lines.append("PDF: reutilizado de una subida anterior")
+    lines.append(f"Total desde la subida: {_format_ms(trace.elapsed_ms())}")
+    return lines
+
+def status_output(results, pdf_path, pdf_pending=False, trace=None):
+    """Output 1: estado final con la información de procesamiento, los tiempos y los errores"""
+    p1, p2, p3, p4, p5 = (results[n] for n in range(1, 6))
     
-    # 1. CLOROFILA EN REACCIÓN
-    try:
-        abs_chl = pd.read_excel(file_path, sheet_name="Practica 4", usecols="D", skiprows=5, nrows=1, header=None).iloc[0, 0]
-        chl_student_ml = pd.read_excel(file_path, sheet_name="Practica 4", usecols="D", skiprows=6, nrows=1, header=None).iloc[0, 0]
-        chl_student_mg = pd.read_excel(file_path, sheet_name="Practica 4", usecols="D", skiprows=7, nrows=1, header=None).iloc[0, 0]
-        
-        chl_corr_ml = round(abs_chl / 76.07 * 100, 2)
-        chl_corr_mg = round(chl_corr_ml * 0.5, 2)
-        
-        df_chl_hill = pd.DataFrame({
-            'Parámetro': ['ABS', 'Chla tilacoides mg/mL', 'mg Chla en reacción'],
-            'Estudiante': [abs_chl, chl_student_ml, chl_student_mg],
-            'Correcto': [abs_chl, chl_corr_ml, chl_corr_mg]
-        })
-        df_chl_hill['Validación'] = validate_column(df_chl_hill, 'Estudiante', 'Correcto')
-        
-        results['chl_hill'] = df_chl_hill
-        results['chl_hill_expl'] = rf"""
-**Determinación de la concentración de Chl a en reacción de Hill:**
-
-En la práctica 4 hemos determinado la concentración de clorofila en el extracto de tilacoides diluido 100 veces, por lo que para calcular la concentración en el extracto:
-
-$$[\text{{Chla tilacoides}}] (\text{{mg/mL}}) = \frac{{\text{{ABS}}_{{665}}}}{{76.07 \cdot 1 \text{{ cm}}}} \times 100 \frac{{\text{{mg}}}}{{\text{{mL}}}}$$
-
-Por otro lado, para calcular la cantidad en mg de Chla en la reacción de Hill hemos de tener en cuenta que hemos añadido 0.5 mL del extracto de tilacoides a la reacción. Por ello:
-
-$$\text{{mg Chla en reacción}} = [\text{{Chla tilacoides}}] \frac{{\text{{mg Chla}}}}{{\text{{mL Extracto}}}} \times 0.5 \text{{ mL Extracto}}$$
-
-**Valor calculado:** {chl_corr_mg} mg Chla
-"""
-        print(f"  ✓ Clorofila Hill: {len(df_chl_hill)} filas")
-    except Exception as e:
-        print(f"  ✗ Error en Clorofila Hill: {e}")
-        results['chl_hill'] = pd.DataFrame()
-        results['chl_hill_expl'] = "Error al procesar datos de clorofila"
+    # Recopilar errores para mostrar
+    errors_list = []
+    if p2.get('corn_error'): errors_list.append(f"• P2-Maíz: {p2['corn_error']}")
+    if p2.get('pea_error'): errors_list.append(f"• P2-Guisante: {p2['pea_error']}")
+    if p3.get('croma_error'): errors_list.append(f"• P3-Cromatografía: {p3['croma_error']}")
+    if p3.get('anabaena_error'): errors_list.append(f"• P3-Anabaena: {p3['anabaena_error']}")
+    if p4.get('hill_error'): errors_list.append(f"• P4-Hill: {p4['hill_error']}")
+    if p5.get('amilasa_error'): errors_list.append(f"• P5-Amilasa: {p5['amilasa_error']}")
     
-    # 2. FERRICIANURO
-    try:
-        df_ferri = pd.read_excel(file_path, sheet_name="Practica 4", usecols="B:D", skiprows=11, nrows=9)
-        df_ferri.columns = ['Tubo', 'Abs 420 nm', '[Ferricianuro] estudiante']
-        df_ferri['[Ferricianuro] correcto'] = round(df_ferri['Abs 420 nm'] * 4, 2)
-        df_ferri['Validación'] = validate_column(df_ferri, '[Ferricianuro] estudiante', '[Ferricianuro] correcto')
-        
-        results['ferricianuro'] = df_ferri
-        results['ferri_expl'] = r"""
-**Concentración de Ferricianuro:**
-
-En la práctica 4 hemos determinado la concentración de ferricianuro en la reacción de Hill. Para ello hemos medido la absorbancia a 420 nm de una mezcla diluida.
-
-Hemos de tener en cuenta que el coeficiente de extinción del ferricianuro (ε) a 420 nm es 1 mL·µmol⁻¹·cm⁻¹. Por lo tanto la concentración de ferricianuro en la disolución que hemos medido será:
-
-$$[\text{Ferricianuro}]_{\text{determinado}} = \frac{\text{ABS}}{1 \text{ mL} \cdot \mu\text{mol}^{-1} \cdot \text{cm}^{-1}}$$
-
-Sin embargo para obtener el valor en la mezcla de reacción, hemos de tener en cuenta que hemos diluido la reacción 4 veces, por lo que hemos de multiplicar el valor de absorbancia por 4 para obtener la absorbancia de la reacción sin diluir.
-
-$$[\text{Ferricianuro}]_{\text{reacción}} = [\text{Ferricianuro}]_{\text{determinado}} \times 4$$
-"""
-        
-        # Versión PDF (sin ecuaciones LaTeX, solo Unicode)
-        results['ferri_expl_pdf'] = """
-**Concentración de Ferricianuro:**
-
-En la práctica 4 hemos determinado la concentración de ferricianuro en la reacción de Hill. Para ello hemos medido la absorbancia a 420 nm de una mezcla diluida.
-
-Hemos de tener en cuenta que el coeficiente de extinción del ferricianuro (ε) a 420 nm es 1 mL·µmol⁻¹·cm⁻¹. Por lo tanto la concentración de ferricianuro en la disolución que hemos medido será:
-
-[Ferricianuro] = ABS / (1 mL·µmol⁻¹·cm⁻¹)
-
-Sin embargo para obtener el valor en la mezcla de reacción, hemos de tener en cuenta que hemos diluido la reacción 4 veces, por lo que hemos de multiplicar el valor de absorbancia por 4 para obtener la absorbancia de la reacción sin diluir.
-
-[Ferricianuro]reacción = [Ferricianuro]determinado × 4
-"""
-        print(f"  ✓ Ferricianuro: {len(df_ferri)} filas")
-    except Exception as e:
-        print(f"  ✗ Error en Ferricianuro: {e}")
-        results['ferricianuro'] = pd.DataFrame()
-        results['ferri_expl'] = "Error al procesar datos de ferricianuro"
-        
-    # 3. ACTIVIDAD FOTOSINTÉTICA (B24:D27 sin cabecera, skiprows=23, nrows=4)
-    try:
-        df_hill = pd.read_excel(file_path, sheet_name="Practica 4", usecols="B:D", skiprows=23, nrows=4, header=None)
-        print(f"  → Hill leído: {df_hill.shape}")
-        df_hill.columns = ['Tubo', 'Tiempo (min)', 'Reducción estudiante']
-        
-        # Verificar que df_ferri tiene suficientes filas antes de usarlo
-        if len(df_ferri) >= 7:
-            # df_hill tiene 4 filas (tubos 4-7), necesitamos índices 3:7 de df_ferri (4 valores)
-            df_hill['Reducción corregido'] = np.round(df_ferri['[Ferricianuro] correcto'].iloc[3:7].values * 3.5 / chl_corr_mg, 2)
-        else:
-            print(f"  ⚠ Ferricianuro insuficiente ({len(df_ferri)} filas), usando valores por defecto")
-            df_hill['Reducción corregido'] = 0.0
-        
-        # Regresión lineal Hill
-        x_hill = df_hill['Tiempo (min)'].values
-        y_hill = df_hill['Reducción corregido'].values
-        slope_hill, intercept_hill, _, _, _ = linregress(x_hill, y_hill)
-        
-        fig_hill, ax = plt.subplots(figsize=(10, 7))
-        ax.scatter(x_hill, y_hill, s=100, alpha=0.7, color='#27ae60', edgecolors='black', linewidths=2, label='Datos', zorder=3)
-        ax.plot(x_hill, slope_hill * x_hill + intercept_hill, 'b-', linewidth=3, label='Regresión lineal', zorder=2)
-        ax.set_xlabel('Tiempo reacción (min)', fontsize=14, fontweight='bold')
-        ax.set_ylabel('µmol Fe³⁺CN · mg Chl⁻¹', fontsize=14, fontweight='bold')
-        ax.set_title('Reacción de Hill - Reducción de Ferricianuro', fontsize=16, fontweight='bold', pad=20)
-        ax.legend(fontsize=12, frameon=True, shadow=True)
-        ax.grid(True, alpha=0.3, linestyle='--')
-        plt.tight_layout()
-        plt.draw()  # Dibujar la figura
-        
-        # Calcular actividades
-        vel_min = abs(round(slope_hill, 2))
-        vel_hora = round(vel_min * 60, 2)
-        vel_o2 = round(vel_hora / 4, 2)
-        
-        # Calcular actividad DCMU solo si df_ferri tiene suficientes datos
-        if len(df_ferri) >= 8:
-            dcmu_activity = round((df_ferri['[Ferricianuro] correcto'].iloc[3] - df_ferri['[Ferricianuro] correcto'].iloc[7]) * 3.5 * 4 / chl_corr_mg, 2)
-        else:
-            dcmu_activity = 0.0
-        
-        df_foto = pd.DataFrame({
-            'Parámetro': [
-                'Velocidad Hill (µmol Fe³⁺CN · mg Chl⁻¹ · min⁻¹)', 
-                'Actividad FSII (µmol Fe³⁺CN · mg Chl⁻¹ · h⁻¹)', 
-                'Liberación O₂ (µmol O₂ · mg Chl⁻¹ · h⁻¹)', 
-                'Actividad FSII+DCMU (µmol Fe³⁺CN · mg Chl⁻¹ · min⁻¹)'
-            ],
-            'Valor': [vel_min, vel_hora, vel_o2, dcmu_activity]
-        })
-        
-        results['hill'] = df_hill
-        results['hill_fig'] = fig_hill
-        results['fotosintesis'] = df_foto
-        
-        # Generar explicación con los valores calculados (versión DASHBOARD con LaTeX)
-        results['foto_expl'] = rf"""
-**Actividad Fotosintética - Reacción de Hill:**
-
-Para obtener los valores de µmoles de Ferricianuro por miligramo de clorofila en cada tiempo de reacción (tubos 4 a 7), hemos de multiplicar la concentración por el volumen de la muestra, 3.5 mL, y dividirlo por la cantidad de clorofila que hemos añadido con nuestra suspensión de tilacoides que en este caso es **{chl_corr_mg} mg Chla**.
-
-Podemos representar los valores obtenidos frente al tiempo (0, 5, 10, 15 minutos) en un gráfico y calcular la pendiente. Dicha pendiente, de signo negativo dado que estamos observando una disminución de la concentración de Fe³⁺CN, nos da la velocidad de reacción de la enzima.
-
-En este caso, la pendiente es de **{vel_min}** µmol Fe³⁺CN·mg Chl⁻¹·min⁻¹.
-
-Si multiplicamos esta pendiente por 60, obtendremos la velocidad de reacción en una hora: **{vel_hora}** µmol Fe³⁺CN·mg Chl⁻¹·h⁻¹.
-
-Sabemos que:
-
-$$\text{{Fe}}^{{3+}}\text{{CN}} + 1e^- \Rightarrow \text{{Fe}}^{{2+}}\text{{CN}}$$
-
-También sabemos que en la reacción de fotólisis del agua:
-
-$$2\text{{H}}_2\text{{O}} + h\nu \Rightarrow \text{{O}}_2 + 4\text{{H}}^+ + 4e^-$$
-
-Por lo tanto por cada µmol de O₂ se liberan 4 µmoles de e⁻. Si dividimos esta velocidad por 4, obtendremos la actividad del FSII en forma de liberación de O₂:
-
-**{vel_o2}** µmol O₂·mg Chl⁻¹·h⁻¹
-
-Finalmente, si añadimos **DCMU**, que captura los electrones al nivel de la plastoquinona compitiendo por el FeCN, se aprecia un descenso en la tasa de reducción del FeCN. Para calcular esa tasa hemos comparado el valor del tubo 4 (tiempo 0) con el del tubo con el DCMU a los 15 minutos de reacción (tubo 8) con la siguiente fórmula:
-
-$$\text{{Reducción Fe}}^{{3+}}\text{{CN}} = -\frac{{[\text{{Fe}}^{{3+}}\text{{CN}}]_{{\text{{Tubo 8}}}} - [\text{{Fe}}^{{3+}}\text{{CN}}]_{{\text{{Tubo 4}}}}}}{{15 \text{{ min}} - 0 \text{{ min}}}} \times \frac{{60 \text{{ min}}}}{{1 \text{{ h}}}}$$
-
-**Actividad FSII + DCMU:** {dcmu_activity} µmol Fe²⁺CN·mg Chl⁻¹·h⁻¹
-"""
-        
-        # Versión PDF (sin ecuaciones LaTeX, solo Unicode)
-        results['foto_expl_pdf'] = f"""
-**Actividad Fotosintética - Reacción de Hill:**
-
-Para obtener los valores de µmoles de Ferricianuro por miligramo de clorofila en cada tiempo de reacción (tubos 4 a 7), hemos de multiplicar la concentración por el volumen de la muestra, 3.5 mL, y dividirlo por la cantidad de clorofila que hemos añadido con nuestra suspensión de tilacoides que en este caso es **{chl_corr_mg} mg Chla**.
-
-Podemos representar los valores obtenidos frente al tiempo (0, 5, 10, 15 minutos) en un gráfico y calcular la pendiente. Dicha pendiente, de signo negativo dado que estamos observando una disminución de la concentración de Fe³⁺CN, nos da la velocidad de reacción de la enzima.
-
-En este caso, la pendiente es de **{vel_min}** µmol Fe³⁺CN·mg Chl⁻¹·min⁻¹.
-
-Si multiplicamos esta pendiente por 60, obtendremos la velocidad de reacción en una hora: **{vel_hora}** µmol Fe³⁺CN·mg Chl⁻¹·h⁻¹.
-
-Sabemos que: Fe³⁺CN + 1e⁻ → Fe²⁺CN
-
-También sabemos que en la reacción de fotólisis del agua: 2H₂O + luz → O₂ + 4H⁺ + 4e⁻
-
-Por lo tanto por cada µmol de O₂ se liberan 4 µmoles de e⁻. Si dividimos esta velocidad por 4, obtendremos la actividad del FSII en forma de liberación de O₂:
-
-**{vel_o2}** µmol O₂·mg Chl⁻¹·h⁻¹
-
-Finalmente, si añadimos **DCMU**, que captura los electrones al nivel de la plastoquinona compitiendo por el FeCN, se aprecia un descenso en la tasa de reducción del FeCN. Para calcular esa tasa hemos comparado el valor del tubo 4 (tiempo 0) con el del tubo con el DCMU a los 15 minutos de reacción (tubo 8).
-
-**Actividad FSII + DCMU:** {dcmu_activity} µmol Fe²⁺CN·mg Chl⁻¹·h⁻¹
-"""
-        
-        print(f"  ✓ Hill: {len(df_hill)} filas, Fotosíntesis: {len(df_foto)} filas")
-    except Exception as e:
-        error_msg = f"Error en Hill/Fotosíntesis: {str(e)}"
-        print(f"  ✗ {error_msg}")
-        results['hill'] = pd.DataFrame()
-        results['hill_fig'] = None
-        results['fotosintesis'] = pd.DataFrame()
-        results['hill_error'] = error_msg
-        # Explicación genérica si falla el procesamiento
-        results['foto_expl'] = """
-**Actividad Fotosintética - Reacción de Hill:**
-
-No se pudieron calcular los parámetros de la reacción de Hill. Verifique que los datos de entrada sean correctos.
-"""
-    
-    return results
-
-# ============================================================================
-# PRÁCTICA 5: α-AMILASA
-# ============================================================================
-
-def process_practica5(file_path):
-    """Procesa Práctica 5: Germinación y α-amilasa"""
-    results = {}
+    errors_html = ""
+    if errors_list:
+        errors_html = f"""
+        <div style='background: #fff3cd; border: 2px solid #ffc107; border-radius: 10px; padding: 15px; margin: 10px 0;'>
+            <h4 style='color: #856404; margin-top: 0;'>⚠️ Errores Detectados:</h4>
+            <ul style='color: #856404; margin: 5px 0; font-size: 11px;'>
+                {''.join([f'<li>{err}</li>' for err in errors_list])}
+            </ul>
+        </div>
+        """
     
-    try:
-        # 1. GERMINACIÓN
-        germinacion = pd.read_excel(file_path, sheet_name="Practica 5", usecols="E", skiprows=3, nrows=1, header=None).iloc[0, 0]
-        results['germinacion'] = germinacion
-        results['germ_expl'] = f"""
-        **Germinación de semillas:** {germinacion}%
-        
-        ¿Este paquete de semillas es adecuado para la práctica? (Se considera adecuado >80%)
+    timing_html = ""
+    if trace is not None:
+        timing_html = f"""
+        <h4 style='color: #0c5460; margin-bottom: 0;'>⏱️ Tiempos:</h4>
+        <ul style='color: #0c5460; margin: 5px 0;'>
+            {''.join(f'<li>{line}</li>' for line in timing_lines(trace, pdf_path, pdf_pending))}
+        </ul>
         """
-        
-        # 2. α-AMILASA (B10:I15 en R, equivale a skiprows=10, nrows=5 - saltando encabezado)
-        try:
-            df_amil = pd.read_excel(file_path, sheet_name="Practica 5", usecols="B:I", skiprows=10, nrows=5, header=None)
-            print(f"  → Amilasa leída: {df_amil.shape}")
-            # Estructura real: Número, Tipo semilla, Tratamiento, Peso seco, Abs t=0, Abs t=10, Almidón deg/h, Actividad
-            df_amil.columns = ['Número', 'Tipo semilla', 'Tratamiento', 'Peso seco (mg)', 
-                           'Abs t=0', 'Abs t=10', 'Almidón deg/h estudiante', 'Actividad estudiante']
-            
-            # Convertir columnas numéricas a float (por si hay strings)
-            for col in ['Peso seco (mg)', 'Abs t=0', 'Abs t=10', 'Almidón deg/h estudiante', 'Actividad estudiante']:
-                df_amil[col] = pd.to_numeric(df_amil[col], errors='coerce')
-            
-            # Calcular valores corregidos
-            df_amil['Almidón deg/h correcto'] = np.round((df_amil['Abs t=0'] - df_amil['Abs t=10']) / 11.4 * 7 * 6, 2)
-            mg_semillas_reaccion = df_amil['Peso seco (mg)'] / 10 * 0.25
-            df_amil['Actividad corregida'] = np.round(df_amil['Almidón deg/h correcto'] / mg_semillas_reaccion, 2)
-            
-            df_amil['Val. Almidón'] = validate_column(df_amil, 'Almidón deg/h estudiante', 'Almidón deg/h correcto')
-            df_amil['Val. Actividad'] = validate_column(df_amil, 'Actividad estudiante', 'Actividad corregida')
-            
-            # Gráfica
-            fig_amil, ax = plt.subplots(figsize=(12, 7))
-            x_pos = np.arange(len(df_amil))
-            colors_amil = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6']
-            bars = ax.bar(x_pos, df_amil['Actividad corregida'], color=colors_amil, edgecolor='black', linewidth=1.0)
-            ax.set_xticks(x_pos)
-            ax.set_xticklabels(df_amil['Tratamiento'], fontsize=12, rotation=20, ha='right')
-            ax.set_xlabel('Tratamiento', fontsize=14, fontweight='bold')
-            ax.set_ylabel('Actividad α-amilasa (mg almidón·mg semilla⁻¹·h⁻¹)', fontsize=13, fontweight='bold')
-            ax.set_title('Inducción de actividad α-amilasa en cebada', fontsize=16, fontweight='bold', pad=20)
-            ax.grid(axis='y', alpha=0.3, linestyle='--')
-            for i, bar in enumerate(bars):
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height, f'{height:.2f}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-            plt.tight_layout()
-            plt.draw()  # Dibujar la figura
-            
-            results['amilasa'] = df_amil
-            results['amilasa_fig'] = fig_amil
-            print(f"  ✓ Amilasa: {len(df_amil)} filas")
-        except Exception as e:
-            error_msg = f"Error en Amilasa: {str(e)}"
-            print(f"  ✗ {error_msg}")
-            results['amilasa'] = pd.DataFrame()
-            results['amilasa_fig'] = None
-            results['amilasa_error'] = error_msg
-        
-        results['amilasa_expl'] = r"""
-**Inducción de actividad α-amilasa en cebada:**
-
-La actividad de la α-amilasa se ha calculado a partir de la degradación del almidón. Para ello, se ha medido la absorbancia de la solución de almidón en el tiempo 0 y a los 10 minutos de reacción. La actividad de la α-amilasa se ha calculado con la siguiente fórmula:
-
-$$\text{Almidón degradado (mg/h)} = \frac{(\text{Abs}_{t=0} - \text{Abs}_{t=10}) \cdot 1\text{cm}}{11.4 \text{ mL} \cdot \text{mg}^{-1} \cdot \text{cm}^{-1}} \times 7 \text{ mL} \times \frac{60 \text{ min}}{10 \text{ min} \cdot \text{h}}$$
-
-Es importante tener en cuenta que no todos los experimentos parten de la misma cantidad de material biológico, ya que el peso seco de las semillas varía entre los casos. Por esta razón, es necesario **normalizar** los resultados para permitir una comparación adecuada entre ellos.
-
-En este procedimiento, utilizaremos el peso seco de las semillas como factor de normalización, expresando la actividad de α-amilasa como la cantidad de almidón degradado (en mg) por hora, por mg de semilla.
-
-Para llevar a cabo este cálculo, recordemos que el extracto enzimático de semillas se ha obtenido homogenizando el peso seco de las semillas de cada caso en un volumen final de 10 mL de tampón. De este homogenizado, se tomaron 0.25 mL para la reacción. Por lo tanto, debemos determinar cuántos mg de semillas están representados en esos 0.25 mL de extracto:
-
-$$\text{mg semillas en 0.25 mL} = \frac{\text{mg semillas en placa}}{10 \text{ mL}} \times 0.25 \text{ mL}$$
-
-Finalmente, para referir la actividad de la α-amilasa a la cantidad de semillas utilizadas, hemos de dividir la actividad de la α-amilasa por los mg de semillas utilizados. El resultado se expresa en mg de almidón degradado por hora y mg de semillas.
-
-**Preguntas clave para el análisis:**
-
-- ¿Qué placas hemos de comparar para determinar la influencia del embrión?
-- ¿Qué placas hemos de comparar para determinar la influencia de la Giberelina? ¿Induce la actividad germinativa o no? ¿Dónde se produce la Giberelina? ¿Cuál es su diana?
-- ¿Qué placas hemos de comparar para determinar si la actividad alfa amilasa depende de la regulación transcripcional? ¿Hay actividad alfa amilasa independiente del embrión o de la Giberelina?
-"""
-        
-    except Exception as e:
-        results['error'] = f"Error procesando Práctica 5: {e}"
     
-    return results
-
-# ============================================================================
-# FUNCIÓN PRINCIPAL
-# ============================================================================
-
-def process_all_practicas(file):
-    """Procesa todas las 5 prácticas y devuelve TODOS los outputs"""
+    debug_info = f"""
+    <div style='background: #e8f4f8; border: 2px solid #17a2b8; border-radius: 10px; padding: 15px; margin: 10px 0; font-family: monospace; font-size: 12px;'>
+        <h4 style='color: #0c5460; margin-top: 0;'>📊 Información de Procesamiento:</h4>
+        <ul style='color: #0c5460; margin: 5px 0;'>
+            <li>✓ P1 - Sacarosa: {len(p1.get('sacarosa', pd.DataFrame()))} filas</li>
+            <li>✓ P1 - Cebolla: {len(p1.get('onion', pd.DataFrame()))} filas, Figura: {'OK' if p1.get('onion_chart') is not None else 'FALTA'}</li>
+            <li>✓ P1 - Patata: {len(p1.get('potato', pd.DataFrame()))} filas, Figura: {'OK' if p1.get('potato_chart') is not None else 'FALTA'}</li>
+            <li>✓ P2 - Maíz: {len(p2.get('corn', pd.DataFrame()))} filas, Figura: {'OK' if p2.get('corn_chart') is not None else 'FALTA'}</li>
+            <li>✓ P2 - Guisante: {len(p2.get('pea', pd.DataFrame()))} filas, Figuras: {'OK' if p2.get('pea_chart1') and p2.get('pea_chart2') else 'FALTA'}</li>
+            <li>✓ P3 - Clorofila: {len(p3.get('clorofila', pd.DataFrame()))} filas</li>
+            <li>✓ P3 - Cromatografía: {len(p3.get('cromatografia', pd.DataFrame()))} filas</li>
+            <li>✓ P3 - Anabaena: {len(p3.get('anabaena', pd.DataFrame()))} filas</li>
+            <li>✓ P4 - Chl Hill: {len(p4.get('chl_hill', pd.DataFrame()))} filas</li>
+            <li>✓ P4 - Ferricianuro: {len(p4.get('ferricianuro', pd.DataFrame()))} filas</li>
+            <li>✓ P4 - Hill: {len(p4.get('hill', pd.DataFrame()))} filas, Figura: {'OK' if p4.get('hill_chart') is not None else 'FALTA'}</li>
+            <li>✓ P4 - Fotosíntesis: {len(p4.get('fotosintesis', pd.DataFrame()))} filas</li>
+            <li>✓ P5 - Germinación: {p5.get('germinacion', 'N/A')}%</li>
+            <li>✓ P5 - Amilasa: {len(p5.get('amilasa', pd.DataFrame()))} filas, Figura: {'OK' if p5.get('amilasa_chart') is not None else 'FALTA'}</li>
+            <li>✓ PDF: {'En preparación (aparecerá abajo al terminar)' if pdf_pending else 'Generado' if pdf_path else 'ERROR'}</li>
+        </ul>
+        {timing_html}
+    </div>
+    {errors_html}
+    """
+    
+    return f"""
+    <div style='background: #d4edda; border: 2px solid #28a745; border-radius: 10px; padding: 20px; margin: 10px 0;'>
+        <h2 style='color: #155724; margin-top: 0;'>✅ ANÁLISIS COMPLETADO CON ÉXITO</h2>
+        <p style='font-size: 16px; color: #155724;'>
+            Las 5 prácticas han sido procesadas correctamente.<br>
+            Revise los resultados detallados a continuación.
+        </p>
+    </div>
+    {debug_info}
+    """
+
+def progress_output(done, current=None):
+    """Output 1 mientras se procesa: prácticas ya mostradas de las 5 y la que está en curso"""
+    current = done + 1 if current is None else current
+    pending = 'Generando informe PDF...' if done == 5 else f'Procesando Práctica {current}...'
+    return f"""
+    <div style='background: #e8f4f8; border: 2px solid #17a2b8; border-radius: 10px; padding: 20px; margin: 10px 0;'>
+        <h2 style='color: #0c5460; margin-top: 0;'>⏳ ANÁLISIS EN CURSO ({done}/5)</h2>
+        <p style='font-size: 16px; color: #0c5460;'>{pending}</p>
+    </div>
+    """
+
+PDF_OUTPUT = 34
+
+# Cómo llegan las gráficas al navegador. 'imagen': cada figura se rasteriza
+# una vez (en el proceso de trabajo, a resolución de pantalla) y vuelve de él
+# ya en bytes, que se sirven como archivo del almacén: la respuesta solo lleva
+# su URL y las cachés guardan imágenes en lugar de figuras vivas. 'plot': la figura viva a gr.Plot,
+# que la vuelve a dibujar a tamaño completo y en base64 en cada respuesta.
+FIGURE_OUTPUT = os.environ.get('FIGURE_OUTPUT', 'imagen')
+
+def analysis_task(processor):
+    """Lo que se envía al pool para una práctica: con imágenes ya rasterizadas si hacen falta"""
+    return with_figure_images(processor) if FIGURE_OUTPUT == 'imagen' else processor
+
+def _is_image_path(value):
+    return (isinstance(value, str) and value.endswith(('.webp', '.png'))
+            and os.path.dirname(value) == ARTIFACTS.directory)
+
+def practica_outputs(n, result):
+    """Outputs de la práctica `n` para la interfaz: las imágenes ya rasterizadas, como archivos del almacén"""
+    builder, _ = PRACTICA_OUTPUTS[n]
+    return [ARTIFACTS.put(v, f".{image_format()}") if isinstance(v, bytes) else v
+            for v in builder(result)]
+
+def assemble_outputs(results, pdf_path, pdf_pending=False, trace=None):
+    """Los 35 outputs del dashboard a partir de los resultados {1: p1, ..., 5: p5} y el PDF"""
+    outputs = [status_output(results, pdf_path, pdf_pending, trace)] + [None] * 34
+    for n, (_, positions) in PRACTICA_OUTPUTS.items():
+        outputs[positions] = practica_outputs(n, results[n])
+    outputs[PDF_OUTPUT] = pdf_path
+    return outputs
+
+def analyze_workbook(file_path):
+    """Procesa las 5 prácticas de un libro y devuelve los 35 outputs de una vez.
+
+    No toca la caché ni el estado de la interfaz, así que sirve para procesos
+    de trabajo y procesamiento por lotes. Lanza InvalidWorkbookError si el
+    archivo no tiene el formato de las prácticas.
+    """
+    trace = Trace()
+    with trace.activate():
+        wb = open_practicas_workbook(file_path)
+        trace.context['archivo'] = file_digest(file_path)[:16]
+        
+        results = {}
+        for n, processor in PRACTICA_PROCESSORS.items():
+            results[n], spans = traced_call(analysis_task(processor), wb)
+            trace.extend(spans)
+        
+        pdf_bytes, spans = traced_call(build_pdf, results)
+        trace.extend(spans)
+        pdf_path = ARTIFACTS.put(pdf_bytes, '.pdf') if pdf_bytes is not None else None
+        outputs = assemble_outputs(results, pdf_path, trace=trace)
+    trace.write()
+    return outputs
+
+def process_all_practicas(file, session=None):
+    """Procesa las 5 prácticas y va entregando los outputs según se completan.
+
+    Es un generador: cada práctica se calcula en el pool de procesos y se
+    muestra en cuanto está lista, en orden. El PDF no se espera: queda
+    encolado en PDF_JOBS para la sesión `session` y lo entrega deliver_pdf.
+    Cada entrega lleva los 35 outputs, con gr.update() en los que no cambian,
+    salvo la última: el estado completo (con el PDF pendiente), que es lo
+    único que devuelve la API (gradio_client, /process_all_practicas).
+    """
     
     if file is None:
         empty_results = [None] * 34  # 34 outputs vacíos (35 total - 1 mensaje)
-        return ["⚠️ Por favor, suba un archivo Excel"] + empty_results
+        yield ["⚠️ Por favor, suba un archivo Excel"] + empty_results
+        return
     
+    # Los spans solo se activan en los tramos sin yield: Gradio puede
+    # reanudar el generador en otro hilo
+    trace = Trace()
     try:
         file_path = file.name
         
-        # Validar archivo
-        sheets = pd.ExcelFile(file_path).sheet_names
-        if "INFO PAREJA" not in sheets:
-            empty_results = [None] * 34
-            return ["❌ El archivo no tiene el formato correcto"] + empty_results
-        
-        # ========================================================================
-        # PASO 1: PROCESAR TODAS LAS PRÁCTICAS
-        # ========================================================================
-        print("\n" + "="*60)
-        print("INICIANDO PROCESAMIENTO DE PRÁCTICAS")
-        print("="*60)
-        
-        print("\n[1/5] Procesando Práctica 1...")
-        p1 = process_practica1(file_path)
-        print(f"     Resultado P1: {len(p1)} elementos")
-        
-        print("\n[2/5] Procesando Práctica 2...")
-        p2 = process_practica2(file_path)
-        print(f"     Resultado P2: {len(p2)} elementos")
-        
-        print("\n[3/5] Procesando Práctica 3...")
-        p3 = process_practica3(file_path)
-        print(f"     Resultado P3: {len(p3)} elementos")
-        
-        print("\n[4/5] Procesando Práctica 4...")
-        p4 = process_practica4(file_path)
-        print(f"     Resultado P4: {len(p4)} elementos")
-        
-        print("\n[5/5] Procesando Práctica 5...")
-        p5 = process_practica5(file_path)
-        print(f"     Resultado P5: {len(p5)} elementos")
-        
-        print("\n[PDF] Generando informe PDF...")
-        try:
-            pdf_path = generate_simple_pdf({'p1': p1, 'p2': p2, 'p3': p3, 'p4': p4, 'p5': p5})
-            if pdf_path is None:
-                print("     ✗ Error: No se pudo generar el PDF")
-                pdf_path = None  # Asegurar que es None
-            else:
-                print(f"     ✓ PDF generado en: {pdf_path}")
-        except Exception as e:
-            print(f"     ✗ Error generando PDF: {e}")
-            import traceback
-            traceback.print_exc()
-            pdf_path = None
-        
-        # ========================================================================
-        # PASO 2: EXTRAER TODOS LOS RESULTADOS EN ORDEN
-        # ========================================================================
-        
-        # STATUS CON INFORMACIÓN DETALLADA
-        # Recopilar errores para mostrar
-        errors_list = []
-        if p2.get('corn_error'): errors_list.append(f"• P2-Maíz: {p2['corn_error']}")
-        if p2.get('pea_error'): errors_list.append(f"• P2-Guisante: {p2['pea_error']}")
-        if p3.get('croma_error'): errors_list.append(f"• P3-Cromatografía: {p3['croma_error']}")
-        if p3.get('anabaena_error'): errors_list.append(f"• P3-Anabaena: {p3['anabaena_error']}")
-        if p4.get('hill_error'): errors_list.append(f"• P4-Hill: {p4['hill_error']}")
-        if p5.get('amilasa_error'): errors_list.append(f"• P5-Amilasa: {p5['amilasa_error']}")
-        
-        errors_html = ""
-        if errors_list:
-            errors_html = f"""
-            <div style='background: #fff3cd; border: 2px solid #ffc107; border-radius: 10px; padding: 15px; margin: 10px 0;'>
-                <h4 style='color: #856404; margin-top: 0;'>⚠️ Errores Detectados:</h4>
-                <ul style='color: #856404; margin: 5px 0; font-size: 11px;'>
-                    {''.join([f'<li>{err}</li>' for err in errors_list])}
-                </ul>
-            </div>
-            """
-        
-        debug_info = f"""
-        <div style='background: #e8f4f8; border: 2px solid #17a2b8; border-radius: 10px; padding: 15px; margin: 10px 0; font-family: monospace; font-size: 12px;'>
-            <h4 style='color: #0c5460; margin-top: 0;'>📊 Información de Procesamiento:</h4>
-            <ul style='color: #0c5460; margin: 5px 0;'>
-                <li>✓ P1 - Sacarosa: {len(p1.get('sacarosa', pd.DataFrame()))} filas</li>
-                <li>✓ P1 - Cebolla: {len(p1.get('onion', pd.DataFrame()))} filas, Figura: {'OK' if p1.get('onion_fig') is not None else 'FALTA'}</li>
-                <li>✓ P1 - Patata: {len(p1.get('potato', pd.DataFrame()))} filas, Figura: {'OK' if p1.get('potato_fig') is not None else 'FALTA'}</li>
-                <li>✓ P2 - Maíz: {len(p2.get('corn', pd.DataFrame()))} filas, Figura: {'OK' if p2.get('corn_fig') is not None else 'FALTA'}</li>
-                <li>✓ P2 - Guisante: {len(p2.get('pea', pd.DataFrame()))} filas, Figuras: {'OK' if p2.get('pea_fig1') and p2.get('pea_fig2') else 'FALTA'}</li>
-                <li>✓ P3 - Clorofila: {len(p3.get('clorofila', pd.DataFrame()))} filas</li>
-                <li>✓ P3 - Cromatografía: {len(p3.get('cromatografia', pd.DataFrame()))} filas</li>
-                <li>✓ P3 - Anabaena: {len(p3.get('anabaena', pd.DataFrame()))} filas</li>
-                <li>✓ P4 - Chl Hill: {len(p4.get('chl_hill', pd.DataFrame()))} filas</li>
-                <li>✓ P4 - Ferricianuro: {len(p4.get('ferricianuro', pd.DataFrame()))} filas</li>
-                <li>✓ P4 - Hill: {len(p4.get('hill', pd.DataFrame()))} filas, Figura: {'OK' if p4.get('hill_fig') is not None else 'FALTA'}</li>
-                <li>✓ P4 - Fotosíntesis: {len(p4.get('fotosintesis', pd.DataFrame()))} filas</li>
-                <li>✓ P5 - Germinación: {p5.get('germinacion', 'N/A')}%</li>
-                <li>✓ P5 - Amilasa: {len(p5.get('amilasa', pd.DataFrame()))} filas, Figura: {'OK' if p5.get('amilasa_fig') is not None else 'FALTA'}</li>
-                <li>✓ PDF: {'Generado' if pdf_path else 'ERROR'}</li>
-            </ul>
-        </div>
-        {errors_html}
-        """
-        
-        output_01_status = f"""
-        <div style='background: #d4edda; border: 2px solid #28a745; border-radius: 10px; padding: 20px; margin: 10px 0;'>
-            <h2 style='color: #155724; margin-top: 0;'>✅ ANÁLISIS COMPLETADO CON ÉXITO</h2>
-            <p style='font-size: 16px; color: #155724;'>
-                Las 5 prácticas han sido procesadas correctamente.<br>
-                Revise los resultados detallados a continuación.
-            </p>
-        </div>
-        {debug_info}
-        """
-        
-        # PRÁCTICA 1 - SACAROSA (2 outputs)
-        output_02_df_sac = p1.get('sacarosa', pd.DataFrame())
-        if output_02_df_sac.empty:
-            output_02_df_sac = pd.DataFrame({'ERROR': ['No se pudo leer la hoja Practica 1']})
-        output_03_sac_expl = p1.get('sacarosa_expl', '')
-        
-        # PRÁCTICA 1 - CEBOLLA (3 outputs)
-        output_04_df_onion = p1.get('onion', pd.DataFrame())
-        if output_04_df_onion.empty:
-            output_04_df_onion = pd.DataFrame({'ERROR': ['No se pudieron leer datos de cebolla']})
-        output_05_fig_onion = p1.get('onion_fig', None)
-        output_06_onion_expl = p1.get('onion_expl', '')
-        
-        # PRÁCTICA 1 - PATATA (3 outputs)
-        output_07_df_potato = p1.get('potato', pd.DataFrame())
-        if output_07_df_potato.empty:
-            output_07_df_potato = pd.DataFrame({'ERROR': ['No se pudieron leer datos de patata']})
-        output_08_fig_potato = p1.get('potato_fig', None)
-        output_09_potato_expl = p1.get('potato_expl', '')
-        
-        # PRÁCTICA 2 - MAÍZ (3 outputs)
-        output_10_df_corn = p2.get('corn', pd.DataFrame())
-        if output_10_df_corn.empty:
-            output_10_df_corn = pd.DataFrame({'ERROR': ['No se pudieron leer datos de maíz']})
-        output_11_fig_corn = p2.get('corn_fig', None)
-        output_12_corn_expl = p2.get('corn_expl', '')
-        
-        # PRÁCTICA 2 - GUISANTE (4 outputs)
-        output_13_df_pea = p2.get('pea', pd.DataFrame())
-        if output_13_df_pea.empty:
-            output_13_df_pea = pd.DataFrame({'ERROR': ['No se pudieron leer datos de guisante']})
-        output_14_fig_pea1 = p2.get('pea_fig1', None)
-        output_15_fig_pea2 = p2.get('pea_fig2', None)
-        output_16_pea_expl = p2.get('pea_expl', '')
-        
-        # PRÁCTICA 3 - CLOROFILA (2 outputs)
-        output_17_df_clor = p3.get('clorofila', pd.DataFrame())
-        if output_17_df_clor.empty:
-            output_17_df_clor = pd.DataFrame({'ERROR': ['No se pudieron leer datos de clorofila']})
-        output_18_clor_expl = p3.get('clor_expl', '')
-        
-        # PRÁCTICA 3 - CROMATOGRAFÍA (2 outputs)
-        output_19_df_croma = p3.get('cromatografia', pd.DataFrame())
-        if output_19_df_croma.empty:
-            output_19_df_croma = pd.DataFrame({'ERROR': ['No se pudieron leer datos de cromatografía']})
-        output_20_croma_expl = p3.get('croma_expl', '')
-        
-        # PRÁCTICA 3 - ANABAENA (2 outputs)
-        output_21_df_anabaena = p3.get('anabaena', pd.DataFrame())
-        if output_21_df_anabaena.empty:
-            output_21_df_anabaena = pd.DataFrame({'ERROR': ['No se pudieron leer datos de anabaena']})
-        output_22_anabaena_expl = p3.get('anabaena_expl', '')
-        
-        # PRÁCTICA 4 - CLOROFILA HILL (2 outputs)
-        output_23_df_chl_hill = p4.get('chl_hill', pd.DataFrame())
-        if output_23_df_chl_hill.empty:
-            output_23_df_chl_hill = pd.DataFrame({'ERROR': ['No se pudieron leer datos de clorofila Hill']})
-        output_24_chl_hill_expl = p4.get('chl_hill_expl', '')
-        
-        # PRÁCTICA 4 - FERRICIANURO (2 outputs)
-        output_25_df_ferri = p4.get('ferricianuro', pd.DataFrame())
-        if output_25_df_ferri.empty:
-            output_25_df_ferri = pd.DataFrame({'ERROR': ['No se pudieron leer datos de ferricianuro']})
-        output_26_ferri_expl = p4.get('ferri_expl', '')
-        
-        # PRÁCTICA 4 - ACTIVIDAD FOTOSINTÉTICA (4 outputs)
-        output_27_df_hill = p4.get('hill', pd.DataFrame())
-        if output_27_df_hill.empty:
-            output_27_df_hill = pd.DataFrame({'ERROR': ['No se pudieron leer datos de Hill']})
-        output_28_fig_hill = p4.get('hill_fig', None)
-        output_29_df_foto = p4.get('fotosintesis', pd.DataFrame())
-        if output_29_df_foto.empty:
-            output_29_df_foto = pd.DataFrame({'ERROR': ['No se pudieron calcular actividades']})
-        output_30_foto_expl = p4.get('foto_expl', '')
-        
-        # PRÁCTICA 5 - GERMINACIÓN (1 output)
-        output_31_germ_text = p5.get('germ_expl', '')
-        
-        # PRÁCTICA 5 - AMILASA (3 outputs)
-        output_32_df_amil = p5.get('amilasa', pd.DataFrame())
-        if output_32_df_amil.empty:
-            output_32_df_amil = pd.DataFrame({'ERROR': ['No se pudieron leer datos de amilasa']})
-        output_33_fig_amil = p5.get('amilasa_fig', None)
-        output_34_amil_expl = p5.get('amilasa_expl', '')
-        
-        # PDF (1 output)
-        output_35_pdf = pdf_path
-        
-        # ========================================================================
-        # PASO 3: VALIDAR DATOS ANTES DE RETORNAR
-        # ========================================================================
-        print("\n" + "="*60)
-        print("VALIDACIÓN DE OUTPUTS")
-        print("="*60)
-        print(f"Output 02 (df_sac): {type(output_02_df_sac).__name__} - {len(output_02_df_sac) if hasattr(output_02_df_sac, '__len__') else 'N/A'} filas")
-        print(f"Output 04 (df_onion): {type(output_04_df_onion).__name__} - {len(output_04_df_onion) if hasattr(output_04_df_onion, '__len__') else 'N/A'} filas")
-        print(f"Output 05 (fig_onion): {'OK' if output_05_fig_onion is not None else 'NONE'}")
-        print(f"Output 10 (df_corn): {type(output_10_df_corn).__name__} - {len(output_10_df_corn) if hasattr(output_10_df_corn, '__len__') else 'N/A'} filas")
-        print(f"Output 11 (fig_corn): {'OK' if output_11_fig_corn is not None else 'NONE'}")
-        print(f"Output 19 (df_croma): {type(output_19_df_croma).__name__} - {len(output_19_df_croma) if hasattr(output_19_df_croma, '__len__') else 'N/A'} filas")
-        print(f"Output 27 (df_hill): {type(output_27_df_hill).__name__} - {len(output_27_df_hill) if hasattr(output_27_df_hill, '__len__') else 'N/A'} filas")
-        print(f"Output 28 (fig_hill): {'OK' if output_28_fig_hill is not None else 'NONE'}")
-        print(f"Output 32 (df_amil): {type(output_32_df_amil).__name__} - {len(output_32_df_amil) if hasattr(output_32_df_amil, '__len__') else 'N/A'} filas")
-        print(f"Output 33 (fig_amil): {'OK' if output_33_fig_amil is not None else 'NONE'}")
-        print(f"Output 35 (PDF): {output_35_pdf}")
-        
-        print("\n" + "="*60)
-        print("RETORNANDO 35 OUTPUTS")
-        print("="*60 + "\n")
-        
-        return [
-            output_01_status,           # 1
-            output_02_df_sac,           # 2
-            output_03_sac_expl,         # 3
-            output_04_df_onion,         # 4
-            output_05_fig_onion,        # 5
-            output_06_onion_expl,       # 6
-            output_07_df_potato,        # 7
-            output_08_fig_potato,       # 8
-            output_09_potato_expl,      # 9
-            output_10_df_corn,          # 10
-            output_11_fig_corn,         # 11
-            output_12_corn_expl,        # 12
-            output_13_df_pea,           # 13
-            output_14_fig_pea1,         # 14
-            output_15_fig_pea2,         # 15
-            output_16_pea_expl,         # 16
-            output_17_df_clor,          # 17
-            output_18_clor_expl,        # 18
-            output_19_df_croma,         # 19
-            output_20_croma_expl,       # 20
-            output_21_df_anabaena,      # 21
-            output_22_anabaena_expl,    # 22
-            output_23_df_chl_hill,      # 23
-            output_24_chl_hill_expl,    # 24
-            output_25_df_ferri,         # 25
-            output_26_ferri_expl,       # 26
-            output_27_df_hill,          # 27
-            output_28_fig_hill,         # 28
-            output_29_df_foto,          # 29
-            output_30_foto_expl,        # 30
-            output_31_germ_text,        # 31
-            output_32_df_amil,          # 32
-            output_33_fig_amil,         # 33
-            output_34_amil_expl,        # 34
-            output_35_pdf               # 35
-        ]
-        
+        # Solo el índice del zip y xl/workbook.xml: lo que no sirve se rechaza
+        # antes de leer el archivo entero, de abrirlo y de ocupar el pool
+        with trace.activate():
+            check_workbook(file_path)
+        
+        # Mismo contenido que una subida anterior: devolver el resultado ya calculado
+        cache_key = file_digest(file_path)
+        trace.context['archivo'] = cache_key[:16]
+        cached = RESULT_CACHE.get(cache_key)
+        # (si su PDF se canceló, se vuelve a analizar; si aún se está generando, se espera)
+        if (cached is not None and _cached_outputs_valid(cached)
+                and (cached[PDF_OUTPUT] is not None or PDF_JOBS.join(session, cache_key))):
+            for value in cached:
+                if _is_image_path(value):
+                    ARTIFACTS.touch(value)
+            trace.finish('cache')
+            yield list(cached)
+            return
+        
+        with trace.activate():
+            wb = open_workbook(file_path)  # ya comprobado arriba
+        
+        # Prácticas cuya hoja no ha cambiado desde otra subida: se reutilizan
+        results = {}
+        outputs = [None] * 35
+        with trace.activate():
+            keys = {n: practica_digest(wb, n) for n in PRACTICA_PROCESSORS}
+            for n, processor in PRACTICA_PROCESSORS.items():
+                with span('cache.practica', funcion=processor.__name__) as s:
+                    result = PRACTICA_CACHE.get(keys[n])
+                    if result is not None and _cached_result_valid(result):
+                        results[n] = result
+                        outputs[PRACTICA_OUTPUTS[n][1]] = practica_outputs(n, result)
+                    s.set(acierto=n in results)
+        
+        # Las demás se encolan todas a la vez; se recogen en orden
+        pending = {n: submit_analysis(analysis_task(processor), wb)
+                   for n, processor in PRACTICA_PROCESSORS.items() if n not in results}
+        
+        # Primera entrega: lo reutilizado, y nada de un análisis anterior
+        outputs[0] = progress_output(len(results), next(iter(pending), None))
+        yield list(outputs)
+        
+        for n, future in pending.items():
+            with trace.activate():
+                results[n] = collect_analysis(future)
+                PRACTICA_CACHE.put(keys[n], results[n])
+                positions = PRACTICA_OUTPUTS[n][1]
+                outputs[positions] = practica_outputs(n, results[n])
+                outputs[0] = progress_output(len(results), next((m for m in pending if m not in results), None))
+            yield _changed_outputs(outputs, positions)
+        results = {n: results[n] for n in PRACTICA_PROCESSORS}
+        
+        # El PDF se genera en segundo plano para esta sesión y este libro;
+        # al terminar completa estos mismos outputs (los de la caché) y la traza.
+        # Solo recibe los datos de las gráficas: ninguna figura viva sale hacia el PDF
+        outputs = assemble_outputs(results, None, pdf_pending=True, trace=trace)
+        trace.finish('ok')
+        RESULT_CACHE.put(cache_key, outputs)
+        PDF_JOBS.submit(session, cache_key, {n: without_figures(result) for n, result in results.items()}, outputs, trace)
+        yield list(outputs)
+        
+    except InvalidWorkbookError as e:
+        trace.finish('formato')
+        empty_results = [None] * 34
+        yield [str(e)] + empty_results
     except Exception as e:
+        trace.finish('error')
         import traceback
         error_msg = f"""
         <div style='background: #f8d7da; border: 2px solid #dc3545; border-radius: 10px; padding: 20px;'>
@@ -1074,598 +760,115 @@ def process_all_practicas(file):
         </div>
         """
         empty_results = [None] * 34
-        return [error_msg] + empty_results
+        yield [error_msg] + empty_results
+
+def _changed_outputs(outputs, positions):
+    """Entrega parcial: el estado y los outputs de `positions`; el resto sin cambios"""
+    import gradio as gr
+    changed = [gr.update()] * len(outputs)
+    changed[0] = outputs[0]
+    changed[positions] = outputs[positions]
+    return changed
+
+def deliver_pdf(file, session=None):
+    """Espera el PDF en segundo plano del archivo subido y lo entrega (None si se canceló)"""
+    if file is None:
+        return None
+    digest = file_digest(file.name)
+    pdf_path = PDF_JOBS.result(session, digest)
+    if pdf_path is None:
+        # Trabajo ya olvidado: el PDF puede seguir en la caché (sin contar
+        # la consulta: la proporción de aciertos es la de las subidas)
+        cached = RESULT_CACHE.peek(digest)
+        pdf_path = cached[PDF_OUTPUT] if cached is not None else None
+    if pdf_path is not None and not os.path.isfile(pdf_path):
+        return None
+    if pdf_path is not None:
+        ARTIFACTS.touch(pdf_path)
+    return pdf_path
 
-def generate_simple_pdf(results):
-    """Genera PDF completo con todas las tablas, figuras y resultados"""
+def cancel_pdf(file, session=None):
+    """Cancela el PDF pendiente del archivo subido en la sesión `session`"""
+    if file is None:
+        return
+    if PDF_JOBS.cancel(session, file_digest(file.name)):
+        import gradio as gr
+        gr.Info("Generación del PDF cancelada")
+
+# ============================================================================
+# PRECALENTAMIENTO EN SEGUNDO PLANO
+# ============================================================================
+
+def _warm_up():
+    start = time.perf_counter()
     try:
-        pdf_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        pdf_path = pdf_file.name
-        pdf_file.close()  # Cerrar el archivo para que ReportLab pueda escribir
-        
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4, rightMargin=1.5*cm, leftMargin=1.5*cm, topMargin=1.5*cm, bottomMargin=1.5*cm)
-        
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=16, textColor=colors.HexColor('#1f4788'),
-                                     spaceAfter=12, alignment=TA_CENTER, fontName='Helvetica-Bold')
-        heading_style = ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontSize=12, textColor=colors.HexColor('#2c3e50'),
-                                       spaceAfter=8, spaceBefore=8, fontName='Helvetica-Bold')
-        small_style = ParagraphStyle('Small', parent=styles['Normal'], fontSize=8, spaceAfter=4)
-        
-        story = []
-        story.append(Paragraph("INFORME DE PRÁCTICAS - FISIOLOGÍA VEGETAL", title_style))
-        story.append(Paragraph("Universidad Autónoma de Madrid (UAM)", small_style))
-        story.append(Paragraph(f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}", small_style))
-        story.append(Spacer(1, 0.3*cm))
-        
-        # Lista para mantener buffers abiertos hasta que se construya el PDF
-        image_buffers = []
-        
-        # Helper para agregar figuras (limitar altura máxima)
-        def add_figure(fig, width=14*cm, max_height=9*cm):
-            if fig is not None:
-                try:
-                    img_buffer = io.BytesIO()
-                    fig.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-                    img_buffer.seek(0)
-                    # NO cerrar el buffer - ReportLab lo necesita abierto
-                    image_buffers.append(img_buffer)  # Guardar referencia
-                    img = Image(img_buffer, width=width, height=max_height, kind='proportional')
-                    img.hAlign = 'CENTER'
-                    story.append(img)
-                    story.append(Spacer(1, 0.3*cm))
-                except Exception as e:
-                    print(f"  ⚠ Error añadiendo figura: {e}")
-                    story.append(Paragraph(f"[Figura no disponible: {str(e)}]", small_style))
-        
-        # Helper para renderizar ecuaciones LaTeX como imágenes
-        def latex_to_image(latex_code):
-            """Convierte una ecuación LaTeX a imagen PNG para insertar en PDF"""
-            try:
-                import matplotlib.pyplot as plt
-                import io
-                
-                # Crear figura más grande para la ecuación
-                fig, ax = plt.subplots(figsize=(10, 1.2))
-                ax.axis('off')
-                
-                # Renderizar LaTeX con fuente más grande
-                ax.text(0.5, 0.5, f'${latex_code}$', 
-                       fontsize=16, ha='center', va='center',
-                       transform=ax.transAxes)
-                
-                # Guardar como imagen
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png', bbox_inches='tight', 
-                           pad_inches=0.1, dpi=200, transparent=False,
-                           facecolor='white')
-                plt.close(fig)
-                buf.seek(0)
-                
-                # Añadir a lista de buffers
-                image_buffers.append(buf)
-                
-                # Crear objeto Image de ReportLab más grande
-                img = Image(buf, width=14*cm, height=1.5*cm, kind='proportional')
-                return img
-            except Exception as e:
-                print(f"  ⚠ Error renderizando LaTeX: {e}")
-                return None
-        
-        # Helper para agregar texto simple (sin procesamiento LaTeX)
-        def add_text_simple(text):
-            """Añade texto al PDF sin procesar LaTeX, para textos que ya tienen Unicode correcto"""
-            if text:
-                try:
-                    import re
-                    text = str(text)
-                    
-                    # Solo convertir markdown **texto** a negrita
-                    text = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', text)
-                    
-                    # Limpiar espacios múltiples y saltos de línea
-                    text = re.sub(r'\n+', '\n', text)
-                    text = re.sub(r' +', ' ', text)
-                    text = text.strip()
-                    
-                    if len(text) > 1500:
-                        text = text[:1500] + '...'
-                    
-                    # Escapar XML (excepto tags <b>)
-                    if '&amp;' not in text:
-                        text = text.replace('&', '&amp;')
-                    text = re.sub(r'<(?!/?(b|i|u)>)', '&lt;', text)
-                    text = re.sub(r'(?<!</(b|i|u))>(?!)', '&gt;', text)
-                    
-                    if text:
-                        paragraphs = text.split('\n')
-                        for para in paragraphs:
-                            para = para.strip()
-                            if para:
-                                story.append(Paragraph(para, small_style))
-                        story.append(Spacer(1, 0.2*cm))
-                except Exception as e:
-                    print(f"  ⚠ Error añadiendo texto: {e}")
-        
-        # Helper para agregar texto explicativo con conversión LaTeX mejorada
-        def add_text(text):
-            if text:
-                try:
-                    import re
-                    text = str(text)
-
-                    
-                    # Eliminar etiquetas HTML
-                    text = re.sub(r'<span[^>]*>', '', text)
-                    text = re.sub(r'</span>', '', text)
-                    text = re.sub(r'<[^>]+>', '', text)
-                    
-                    # Extraer y procesar ecuaciones $$...$$
-                    parts = []
-                    last_end = 0
-                    
-                    for match in re.finditer(r'\$\$([^$]+)\$\$', text):
-                        # Añadir texto antes de la ecuación
-                        if match.start() > last_end:
-                            text_before = text[last_end:match.start()].strip()
-                            if text_before:
-                                parts.append(('text', text_before))
-                        
-                        # Añadir la ecuación como imagen
-                        latex_eq = match.group(1).strip()
-                        parts.append(('equation', latex_eq))
-                        last_end = match.end()
-                    
-                    # Añadir texto restante
-                    if last_end < len(text):
-                        text_after = text[last_end:].strip()
-                        if text_after:
-                            parts.append(('text', text_after))
-                    
-                    # Si no hay ecuaciones, procesar como antes
-                    if not parts:
-                        parts = [('text', text)]
-                    
-                    # Procesar cada parte
-                    for part_type, content in parts:
-                        if part_type == 'equation':
-                            # Renderizar ecuación como imagen
-                            eq_img = latex_to_image(content)
-                            if eq_img:
-                                story.append(eq_img)
-                                story.append(Spacer(1, 0.1*cm))
-                        else:
-                            # Procesar texto normal (puede venir con Unicode o LaTeX)
-                            # 1. Convertir markdown **texto** a negrita
-                            content = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', content)
-                            
-                            # 2. Solo convertir símbolos LaTeX si existen (el texto puede venir ya con Unicode)
-                            if '\\' in content:
-                                latex_map = {
-                                    '\\mu': 'μ', '\\alpha': 'α', '\\beta': 'β', 
-                                    '\\gamma': 'γ', '\\delta': 'δ', '\\sigma': 'σ',
-                                    '\\Psi': 'Ψ', '\\Delta': 'Δ', '\\pi': 'π',
-                                    '\\cdot': '·', '\\times': '×',
-                                }
-                                
-                                for latex, unicode_char in latex_map.items():
-                                    content = content.replace(latex, unicode_char)
-                                
-                                # Limpiar comandos LaTeX \text{...}
-                                content = re.sub(r'\\text\{([^}]*)\}', r'\1', content)
-                                content = re.sub(r'\\color\{[^}]+\}\{([^}]*)\}', r'\1', content)
-                                
-                                # Limpiar comandos LaTeX restantes
-                                content = re.sub(r'\\[a-zA-Z]+', '', content)
-                                content = content.replace('\\', '')
-                            
-                            # 3. Solo procesar super/subíndices LaTeX si hay ^ o _ seguidos de llaves
-                            if '^{' in content or '_{' in content:
-                                # Superíndices con llaves: ^{...}
-                                def convert_superscript(match):
-                                    text = match.group(1)
-                                    result = ''
-                                    for char in text:
-                                        if char == '-':
-                                            result += '⁻'
-                                        elif char == '+':
-                                            result += '⁺'
-                                        elif char.isdigit():
-                                            digit_map = {'0':'⁰','1':'¹','2':'²','3':'³','4':'⁴','5':'⁵','6':'⁶','7':'⁷','8':'⁸','9':'⁹'}
-                                            result += digit_map.get(char, char)
-                                        else:
-                                            result += char
-                                    return result
-                                
-                                content = re.sub(r'\^{([^}]+)}', convert_superscript, content)
-                                
-                                # Subíndices con llaves: _{...}
-                                def convert_subscript(match):
-                                    text = match.group(1)
-                                    result = ''
-                                    for char in text:
-                                        if char.isdigit():
-                                            sub_map = {'0':'₀','1':'₁','2':'₂','3':'₃','4':'₄','5':'₅','6':'₆','7':'₇','8':'₈','9':'₉'}
-                                            result += sub_map.get(char, char)
-                                        elif char.isalpha():
-                                            sub_alpha = {'s':'ₛ','w':'ᵥᵥ','p':'ₚ','h':'ₕ','a':'ₐ','e':'ₑ','i':'ᵢ','o':'ₒ','u':'ᵤ'}
-                                            result += sub_alpha.get(char, char)
-                                        else:
-                                            result += char
-                                    return result
-                                
-                                content = re.sub(r'_{([^}]+)}', convert_subscript, content)
-                                
-                                # Limpiar llaves restantes
-                                content = content.replace('{', '').replace('}', '')
-                            
-                            # 4. Procesar super/subíndices simples sin llaves solo si existen
-                            if '^' in content or '_' in content:
-                                # Superíndices simples
-                                content = content.replace('^-1', '⁻¹').replace('^-2', '⁻²').replace('^-3', '⁻³')
-                                content = content.replace('^1', '¹').replace('^2', '²').replace('^3', '³').replace('^4', '⁴')
-                                # Subíndices simples
-                                content = content.replace('_s', 'ₛ').replace('_w', 'ᵥᵥ').replace('_p', 'ₚ').replace('_h', 'ₕ')
-                                content = content.replace('_2', '₂').replace('_0', '₀')
-
-                            
-                            # Limpiar espacios
-                            content = re.sub(r'\n+', '\n', content)
-                            content = re.sub(r' +', ' ', content)
-                            content = content.strip()
-                            
-                            if len(content) > 1500:
-                                content = content[:1500] + '...'
-                            
-                            # Escapar XML (excepto tags <b>)
-                            if '&amp;' not in content:
-                                content = content.replace('&', '&amp;')
-                            # No escapar < y > que son parte de <b> y </b>
-                            content = re.sub(r'<(?!/?(b|i|u)>)', '&lt;', content)
-                            content = re.sub(r'(?<!</(b|i|u))>(?!)', '&gt;', content)
-                            
-                            if content:
-                                paragraphs = content.split('\n')
-                                for para in paragraphs:
-                                    para = para.strip()
-                                    if para:
-                                        story.append(Paragraph(para, small_style))
-                                story.append(Spacer(1, 0.2*cm))
-                                
-                except Exception as e:
-                    print(f"  ⚠ Error añadiendo texto: {e}")
-        
-        # Helper para limpiar texto LaTeX en celdas de tabla
-        def clean_latex(text):
-            """Limpia símbolos LaTeX en texto de tablas"""
-            if not isinstance(text, str):
-                return text
-            
-            import re
-            
-            # Convertir símbolos LaTeX PRIMERO
-            latex_map = {
-                '\\mu': 'μ', '\\alpha': 'α', '\\beta': 'β', 
-                '\\gamma': 'γ', '\\delta': 'δ', '\\sigma': 'σ',
-                '\\Psi': 'Ψ', '\\Delta': 'Δ', '\\pi': 'π',
-                '\\cdot': '·', '\\times': '×',
-            }
-            
-            for latex, unicode_char in latex_map.items():
-                text = text.replace(latex, unicode_char)
-            
-            # Limpiar \text{...}
-            text = re.sub(r'\\text\{([^}]*)\}', r'\1', text)
-            
-            # Convertir superíndices con llaves ANTES de limpiar llaves
-            def convert_super(m):
-                t = m.group(1)
-                result = ''
-                for c in t:
-                    if c == '-': result += '⁻'
-                    elif c == '+': result += '⁺'
-                    elif c.isdigit():
-                        result += {'0':'⁰','1':'¹','2':'²','3':'³','4':'⁴','5':'⁵','6':'⁶','7':'⁷','8':'⁸','9':'⁹'}[c]
-                    else: result += c
-                return result
-            
-            text = re.sub(r'\^{([^}]+)}', convert_super, text)
-            
-            # Subíndices con llaves
-            def convert_sub(m):
-                t = m.group(1)
-                result = ''
-                for c in t:
-                    if c.isdigit():
-                        result += {'0':'₀','1':'₁','2':'₂','3':'₃','4':'₄','5':'₅','6':'₆','7':'₇','8':'₈','9':'₉'}[c]
-                    elif c.isalpha():
-                        sub_map = {'s':'ₛ','w':'ᵥᵥ','p':'ₚ','h':'ₕ','a':'ₐ','e':'ₑ'}
-                        result += sub_map.get(c, c)
-                    else: result += c
-                return result
-            
-            text = re.sub(r'_{([^}]+)}', convert_sub, text)
-            
-            # Superíndices simples sin llaves
-            text = text.replace('^-1', '⁻¹').replace('^-2', '⁻²').replace('^-3', '⁻³')
-            text = text.replace('^1', '¹').replace('^2', '²').replace('^3', '³').replace('^4', '⁴')
-            text = text.replace('^2+', '²⁺').replace('^3+', '³⁺')
-            
-            # Subíndices simples
-            text = text.replace('_s', 'ₛ').replace('_w', 'ᵥᵥ').replace('_p', 'ₚ').replace('_2', '₂')
-            
-            # Ahora limpiar llaves restantes (después de procesar super/subíndices)
-            text = text.replace('{', '').replace('}', '')
-            text = re.sub(r'\\[a-zA-Z]+', '', text)
-            text = text.replace('\\', '')
-            
-            return text
-        
-        # PRÁCTICA 1
-        if 'p1' in results:
-            story.append(Paragraph("PRÁCTICA 1: POTENCIAL OSMÓTICO Y HÍDRICO", heading_style))
-            
-            # Sacarosa
-            if 'sacarosa' in results['p1'] and not results['p1']['sacarosa'].empty:
-                story.append(Paragraph("<b>Sacarosa:</b>", small_style))
-                df_sac = results['p1']['sacarosa']
-                # Limpiar LaTeX en todas las celdas
-                table_data = [[clean_latex(str(cell)) for cell in df_sac.columns.tolist()]]
-                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_sac.values.tolist()]
-                t = Table(table_data, colWidths=[3*cm]*len(df_sac.columns))
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-                ]))
-                story.append(t)
-                story.append(Spacer(1, 0.2*cm))
-                if 'sacarosa_expl' in results['p1']:
-                    add_text(results['p1']['sacarosa_expl'])
-            
-            # Cebolla
-            if 'onion_fig' in results['p1']:
-                story.append(Paragraph("<b>Cebolla - Potencial Osmótico:</b>", small_style))
-                add_figure(results['p1']['onion_fig'], width=13*cm, max_height=8*cm)
-                if 'onion_pot' in results['p1']:
-                    story.append(Paragraph(f"Potencial osmótico: {results['p1']['onion_pot']} MPa", small_style))
-                if 'onion_expl' in results['p1']:
-                    add_text(results['p1']['onion_expl'])
-            
-            # Patata
-            if 'potato_fig' in results['p1']:
-                story.append(Paragraph("<b>Patata - Potencial Hídrico:</b>", small_style))
-                add_figure(results['p1']['potato_fig'], width=13*cm, max_height=8*cm)
-                if 'potato_pot' in results['p1']:
-                    story.append(Paragraph(f"Potencial hídrico: {results['p1']['potato_pot']} MPa", small_style))
-                if 'potato_expl' in results['p1']:
-                    add_text(results['p1']['potato_expl'])
-            
-            story.append(PageBreak())
-        
-        # PRÁCTICA 2
-        if 'p2' in results:
-            story.append(Paragraph("PRÁCTICA 2: TRANSPIRACIÓN", heading_style))
-            
-            # Maíz
-            if 'corn_fig' in results['p2']:
-                story.append(Paragraph("<b>Maíz - Potencial Hídrico:</b>", small_style))
-                add_figure(results['p2']['corn_fig'], width=13*cm, max_height=8*cm)
-                if 'corn_pot' in results['p2']:
-                    story.append(Paragraph(f"Potencial hídrico: {results['p2']['corn_pot']} MPa", small_style))
-                if 'corn_expl' in results['p2']:
-                    add_text(results['p2']['corn_expl'])
-                story.append(Spacer(1, 0.3*cm))
-            
-            # Guisante
-            if 'pea_fig1' in results['p2']:
-                story.append(Paragraph("<b>Guisante - Potencial Hídrico:</b>", small_style))
-                add_figure(results['p2']['pea_fig1'], width=13*cm, max_height=8*cm)
-                if 'pea_pot' in results['p2']:
-                    story.append(Paragraph(f"Potencial hídrico: {results['p2']['pea_pot']} MPa", small_style))
-                story.append(Spacer(1, 0.3*cm))
-            
-            if 'pea_fig2' in results['p2']:
-                story.append(Paragraph("<b>Guisante - Resistencias:</b>", small_style))
-                add_figure(results['p2']['pea_fig2'], width=13*cm, max_height=8*cm)
-                if 'pea_expl' in results['p2']:
-                    add_text(results['p2']['pea_expl'])
-                story.append(Spacer(1, 0.3*cm))
-            
-            story.append(PageBreak())
-        
-        # PRÁCTICA 3
-        if 'p3' in results:
-            story.append(Paragraph("PRÁCTICA 3: CLOROFILAS Y PIGMENTOS", heading_style))
-            
-            # Clorofila
-            if 'clorofila' in results['p3'] and not results['p3']['clorofila'].empty:
-                story.append(Paragraph("<b>Determinación de Clorofila:</b>", small_style))
-                df_clor = results['p3']['clorofila']
-                # Limpiar LaTeX en todas las celdas
-                table_data = [[clean_latex(str(cell)) for cell in df_clor.columns.tolist()]]
-                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_clor.values.tolist()]
-                t = Table(table_data, colWidths=[4*cm]*len(df_clor.columns))
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ecc71')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-                ]))
-                story.append(t)
-                story.append(Spacer(1, 0.3*cm))
-                if 'clor_expl' in results['p3']:
-                    add_text(results['p3']['clor_expl'])
-            
-            # Cromatografía
-            if 'cromatografia' in results['p3'] and not results['p3']['cromatografia'].empty:
-                story.append(Paragraph("<b>Cromatografía de Pigmentos:</b>", small_style))
-                df_crom = results['p3']['cromatografia']
-                table_data = [df_crom.columns.tolist()] + df_crom.values.tolist()
-                t = Table(table_data, colWidths=[3.5*cm]*len(df_crom.columns))
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ecc71')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-                ]))
-                story.append(t)
-                story.append(Spacer(1, 0.3*cm))
-                if 'croma_expl' in results['p3']:
-                    add_text(results['p3']['croma_expl'])
-            
-            # Anabaena
-            if 'anabaena_abs' in results['p3']:
-                story.append(Paragraph(f"<b>Anabaena Absorbancia:</b> {results['p3']['anabaena_abs']}", small_style))
-                if 'anabaena_expl' in results['p3']:
-                    add_text(results['p3']['anabaena_expl'])
-                story.append(Spacer(1, 0.3*cm))
-            
-            story.append(PageBreak())
-        
-        # PRÁCTICA 4
-        if 'p4' in results:
-            story.append(Paragraph("PRÁCTICA 4: REACCIÓN DE HILL", heading_style))
-            
-            # Clorofila Hill
-            if 'chl_hill' in results['p4'] and not results['p4']['chl_hill'].empty:
-                story.append(Paragraph("<b>Determinación de Clorofila:</b>", small_style))
-                df_chl = results['p4']['chl_hill']
-                # Limpiar LaTeX en todas las celdas
-                table_data = [[clean_latex(str(cell)) for cell in df_chl.columns.tolist()]]
-                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_chl.values.tolist()]
-                t = Table(table_data, colWidths=[4*cm]*len(df_chl.columns))
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-                ]))
-                story.append(t)
-                story.append(Spacer(1, 0.3*cm))
-                if 'chl_hill_expl' in results['p4']:
-                    add_text(results['p4']['chl_hill_expl'])
-            
-            # Ferricianuro
-            if 'ferricianuro' in results['p4'] and not results['p4']['ferricianuro'].empty:
-                story.append(Paragraph("<b>Absorción de Ferricianuro:</b>", small_style))
-                df_ferri = results['p4']['ferricianuro']
-                # Limpiar LaTeX en todas las celdas
-                table_data = [[clean_latex(str(cell)) for cell in df_ferri.columns.tolist()]]
-                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_ferri.values.tolist()]
-                t = Table(table_data, colWidths=[3*cm]*len(df_ferri.columns))
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-                ]))
-                story.append(t)
-                story.append(Spacer(1, 0.3*cm))
-                if 'ferri_expl_pdf' in results['p4']:
-                    add_text_simple(results['p4']['ferri_expl_pdf'])
-            
-            # Hill figura
-            if 'hill_fig' in results['p4']:
-                story.append(Paragraph("<b>Reacción de Hill:</b>", small_style))
-                add_figure(results['p4']['hill_fig'], width=13*cm, max_height=8*cm)
-                story.append(Spacer(1, 0.3*cm))
-            
-            # Fotosíntesis
-            if 'fotosintesis' in results['p4'] and not results['p4']['fotosintesis'].empty:
-                story.append(Paragraph("<b>Actividades Fotosintéticas:</b>", small_style))
-                df_foto = results['p4']['fotosintesis']
-                # Limpiar LaTeX en todas las celdas
-                table_data = [[clean_latex(str(cell)) for cell in df_foto.columns.tolist()]]
-                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_foto.values.tolist()]
-                t = Table(table_data, colWidths=[8*cm, 4*cm])
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-                ]))
-                story.append(t)
-                story.append(Spacer(1, 0.3*cm))
-                if 'foto_expl_pdf' in results['p4']:
-                    add_text_simple(results['p4']['foto_expl_pdf'])
-            
-            story.append(PageBreak())
-        
-        # PRÁCTICA 5
-        if 'p5' in results:
-            story.append(Paragraph("PRÁCTICA 5: GERMINACIÓN Y α-AMILASA", heading_style))
-            
-            if 'germinacion' in results['p5']:
-                story.append(Paragraph(f"<b>Germinación:</b> {results['p5']['germinacion']}%", small_style))
-                if 'germ_expl' in results['p5']:
-                    add_text(results['p5']['germ_expl'])
-                story.append(Spacer(1, 0.3*cm))
-            
-            # Amilasa figura
-            if 'amilasa_fig' in results['p5']:
-                story.append(Paragraph("<b>Actividad α-amilasa:</b>", small_style))
-                add_figure(results['p5']['amilasa_fig'], width=13*cm, max_height=8*cm)
-                story.append(Spacer(1, 0.3*cm))
-            
-            # Tabla amilasa
-            if 'amilasa' in results['p5'] and not results['p5']['amilasa'].empty:
-                df_amil = results['p5']['amilasa']
-                # Limpiar LaTeX en todas las celdas (solo primeras 5 columnas)
-                table_data = [[clean_latex(str(cell)) for cell in df_amil.columns.tolist()[:5]]]
-                table_data += [[clean_latex(str(cell)) for cell in row[:5]] for row in df_amil.values.tolist()]
-                t = Table(table_data, colWidths=[3*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm])
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9b59b6')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 7),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-                ]))
-                story.append(t)
-                story.append(Spacer(1, 0.3*cm))
-                if 'amilasa_expl' in results['p5']:
-                    add_text(results['p5']['amilasa_expl'])
-            
-            story.append(PageBreak())
-    
-        story.append(PageBreak())
-        story.append(Paragraph("CONCLUSIONES", heading_style))
-        story.append(Paragraph("Todos los análisis se completaron satisfactoriamente. Consulte el dashboard web para gráficas y explicaciones detalladas.", styles['Normal']))
-        
-        # Construir el documento
-        doc.build(story)
-        
-        # Ahora sí podemos cerrar los buffers
-        for buf in image_buffers:
-            try:
-                buf.close()
-            except:
-                pass
-        
-        print(f"  ✓ PDF generado exitosamente: {pdf_path}")
-        return pdf_path
-        
+        info = warm_worker()
+        # Lanzar ya los procesos del pool: el primer análisis no espera a que arranquen
+        pool = get_analysis_pool()
+        if pool is not None:
+            pool.submit(int).result()
+        print(f"✓ Precalentamiento en {time.perf_counter() - start:.1f} s (ecuaciones: {info})")
     except Exception as e:
-        print(f"  ✗ Error generando PDF: {e}")
-        import traceback
-        traceback.print_exc()
-        # Retornar None si falla
-        return None
+        print(f"  ⚠ Precalentamiento incompleto: {e}")
+
+def start_warm_up():
+    """Precalienta en un hilo aparte; el primer análisis usa lo que ya esté cargado"""
+    thread = threading.Thread(target=_warm_up, name='precalentamiento', daemon=True)
+    thread.start()
+    return thread
+
+# ============================================================================
+# MÉTRICAS DEL SERVIDOR
+# ============================================================================
+
+METRICS_PATH = os.environ.get('METRICS_PATH', '/metrics')  # vacío: sin endpoint
+METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', '') == '1'  # servirlas también a clientes remotos
+LOCAL_HOSTS = {'127.0.0.1', '::1', 'localhost'}
+
+def add_live_metrics(metrics, demo=None):
+    """Indicadores que se leen al pedir las métricas (y la cola de Gradio si se da `demo`)"""
+    metrics.add(Counter('practicas_cache_aciertos_total', "Consultas a la caché de resultados con acierto",
+                        fn=lambda: RESULT_CACHE.hits))
+    metrics.add(Counter('practicas_cache_fallos_total', "Consultas a la caché de resultados sin acierto",
+                        fn=lambda: RESULT_CACHE.misses))
+    metrics.add(Gauge('practicas_cache_ratio_aciertos', "Aciertos / consultas de la caché de resultados",
+                      fn=lambda: RESULT_CACHE.hits / max(1, RESULT_CACHE.hits + RESULT_CACHE.misses)))
+    metrics.add(Gauge('practicas_cache_bytes', "Tamaño estimado de la caché de resultados",
+                      fn=lambda: RESULT_CACHE.total_bytes))
+    metrics.add(Counter('practicas_cache_practica_aciertos_total',
+                        "Prácticas reutilizadas de otra subida (su hoja no había cambiado)",
+                        fn=lambda: PRACTICA_CACHE.hits))
+    metrics.add(Counter('practicas_cache_practica_fallos_total', "Prácticas que hubo que analizar",
+                        fn=lambda: PRACTICA_CACHE.misses))
+    metrics.add(Gauge('practicas_cache_practica_bytes', "Tamaño estimado de la caché por práctica",
+                      fn=lambda: PRACTICA_CACHE.total_bytes))
+    metrics.add(Gauge('practicas_pdf_en_cola', "Informes PDF en cola o en curso", fn=PDF_JOBS.pending))
+    metrics.add(Gauge('practicas_tareas_en_curso', "Tareas enviadas al pool de análisis sin terminar",
+                      fn=lambda: _tasks_in_flight))
+    metrics.add(Gauge('practicas_procesos_trabajo', "Procesos del pool de análisis (0: en el propio hilo)",
+                      fn=lambda: ANALYSIS_WORKERS))
+    metrics.add(Gauge('practicas_figuras_vivas', "Figuras de matplotlib vivas en este proceso", fn=FIGURES.count))
+    metrics.add(Gauge('practicas_memoria_residente_bytes', "Memoria residente (RSS) del proceso",
+                      fn=resident_memory_bytes))
+    if demo is not None:
+        metrics.add(Gauge('practicas_cola_peticiones', "Peticiones esperando en la cola de Gradio",
+                          fn=lambda: len(demo._queue)))
+        metrics.add(Gauge('practicas_peticiones_en_curso', "Peticiones que Gradio está ejecutando",
+                          fn=lambda: demo._queue.get_active_worker_count()))
+
+def mount_metrics(demo, path=METRICS_PATH):
+    """Sirve METRICS en `path` de la aplicación de Gradio; se llama después de demo.launch()"""
+    from fastapi import Request
+    from fastapi.responses import PlainTextResponse, Response
+    
+    add_live_metrics(METRICS, demo)
+    
+    def metrics_endpoint(request: Request):
+        if not METRICS_PUBLIC and (request.client is None or request.client.host not in LOCAL_HOSTS):
+            return Response(status_code=404)
+        return PlainTextResponse(METRICS.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+    
+    demo.app.add_api_route(path, metrics_endpoint, methods=['GET'], include_in_schema=False)
 
 # ============================================================================
 # INTERFAZ GRADIO
@@ -1673,8 +876,17 @@ def generate_simple_pdf(results):
 
 def create_interface():
     """Crea interfaz Gradio con todas las prácticas y TODOS los outputs"""
+    import gradio as gr
+    
+    def figure_output(label):
+        # Ver FIGURE_OUTPUT: imagen ya rasterizada (se envía su URL) o figura viva
+        if FIGURE_OUTPUT == 'imagen':
+            return gr.Image(label=label, type='filepath', interactive=False, buttons=['download', 'fullscreen'])
+        return gr.Plot(label=label)
     
-    with gr.Blocks(title="Dashboard Prácticas - Fisiología Vegetal UAM", theme=gr.themes.Soft()) as demo:
+    # Gradio guarda su propia copia de subidas y descargas: misma caducidad que el almacén
+    with gr.Blocks(title="Dashboard Prácticas - Fisiología Vegetal UAM", theme=gr.themes.Soft(),
+                   delete_cache=(ARTIFACT_SWEEP_INTERVAL, ARTIFACT_TTL)) as demo:
         
         gr.HTML("""
             <div style="text-align: center; padding: 25px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
@@ -1724,12 +936,12 @@ def create_interface():
         
         gr.Markdown("### 🧅 Cebolla - Plasmólisis")
         df_onion_out = gr.Dataframe(label="Datos de Cebolla")
-        fig_onion_out = gr.Plot(label="Gráfica de Plasmólisis")
+        fig_onion_out = figure_output(label="Gráfica de Plasmólisis")
         onion_expl_out = gr.Markdown()
         
         gr.Markdown("### 🥔 Patata - Potencial Hídrico")
         df_potato_out = gr.Dataframe(label="Datos de Patata")
-        fig_potato_out = gr.Plot(label="Variación de Peso")
+        fig_potato_out = figure_output(label="Variación de Peso")
         potato_expl_out = gr.Markdown()
         
         # ===== PRÁCTICA 2 =====
@@ -1741,14 +953,14 @@ def create_interface():
         
         gr.Markdown("### 🌽 Maíz - Auxina")
         df_corn_out = gr.Dataframe(label="Datos de Maíz")
-        fig_corn_out = gr.Plot(label="Variación de Longitud")
+        fig_corn_out = figure_output(label="Variación de Longitud")
         corn_expl_out = gr.Markdown()
         
         gr.Markdown("### 🌱 Guisante - Estrés Salino")
         df_pea_out = gr.Dataframe(label="Datos de Guisante")
         with gr.Row():
-            fig_pea1_out = gr.Plot(label="Variación de Peso")
-            fig_pea2_out = gr.Plot(label="Metabolismo (NBT/TFT)")
+            fig_pea1_out = figure_output(label="Variación de Peso")
+            fig_pea2_out = figure_output(label="Metabolismo (NBT/TFT)")
         pea_expl_out = gr.Markdown()
         
         # ===== PRÁCTICA 3 =====
@@ -1787,7 +999,7 @@ def create_interface():
         
         gr.Markdown("### ⚡ Actividad Fotosintética")
         df_hill_out = gr.Dataframe(label="Datos de Hill")
-        fig_hill_out = gr.Plot(label="Reducción de Ferricianuro")
+        fig_hill_out = figure_output(label="Reducción de Ferricianuro")
         df_foto_out = gr.Dataframe(label="Actividades Calculadas")
         foto_expl_out = gr.Markdown()
         
@@ -1803,10 +1015,12 @@ def create_interface():
         
         gr.Markdown("### 🧪 Actividad α-Amilasa")
         df_amil_out = gr.Dataframe(label="Datos de α-Amilasa")
-        fig_amil_out = gr.Plot(label="Actividad por Tratamiento")
+        fig_amil_out = figure_output(label="Actividad por Tratamiento")
         amil_expl_out = gr.Markdown()
         
-        pdf_output = gr.File(label="📄 Descargar Informe PDF Completo")
+        with gr.Row():
+            pdf_output = gr.File(label="📄 Descargar Informe PDF Completo", scale=4)
+            cancel_pdf_btn = gr.Button("⏹️ Cancelar PDF", variant="secondary", scale=1)
         
         # CONECTAR TODOS LOS OUTPUTS (35 en total)
         all_outputs = [
@@ -1834,10 +1048,39 @@ def create_interface():
             pdf_output
         ]
         
-        process_btn.click(
-            fn=process_all_practicas,
+        # El análisis libera su turno en cuanto muestra los resultados; el PDF
+        # se espera aparte y se puede cancelar si no se va a descargar
+        # Los trabajos de PDF son de cada sesión: cancelar en una pestaña no
+        # detiene el informe que espera otra
+        def run_analysis(file, request: gr.Request):
+            yield from process_all_practicas(file, request.session_hash)
+        
+        def wait_pdf(file, request: gr.Request):
+            return deliver_pdf(file, request.session_hash)
+        
+        def stop_pdf(file, request: gr.Request):
+            cancel_pdf(file, request.session_hash)
+        
+        pdf_event = process_btn.click(
+            fn=run_analysis,
             inputs=[file_input],
-            outputs=all_outputs
+            outputs=all_outputs,
+            api_name='process_all_practicas',
+            concurrency_limit=ANALYSIS_CONCURRENCY
+        ).then(
+            fn=wait_pdf,
+            inputs=[file_input],
+            outputs=[pdf_output],
+            api_name='deliver_pdf',
+            concurrency_limit=None
+        )
+        
+        cancel_pdf_btn.click(
+            fn=stop_pdf,
+            inputs=[file_input],
+            outputs=None,
+            api_name='cancel_pdf',
+            cancels=[pdf_event]
         )
         
         gr.Markdown("""
@@ -1862,6 +1105,10 @@ def create_interface():
             </div>
         """)
     
+    # Cola explícita: hasta QUEUE_MAX_SIZE peticiones en espera y tantos análisis
+    # simultáneos como procesos de trabajo
+    demo.queue(max_size=QUEUE_MAX_SIZE, default_concurrency_limit=ANALYSIS_CONCURRENCY)
+    
     return demo
 
 # ============================================================================
@@ -1869,10 +1116,22 @@ def create_interface():
 # ============================================================================
 
 if __name__ == "__main__":
+    print(f"Archivos generados en {ARTIFACTS.directory} (limpieza cada {ARTIFACT_SWEEP_INTERVAL} s)")
+    ARTIFACTS.sweep()
+    ARTIFACTS.start_sweeper()
     demo = create_interface()
+    # La interfaz se sirve primero; módulos, fuentes, ecuaciones y pool se cargan después
     demo.launch(
         share=False,
         server_name="0.0.0.0",
         server_port=7860,
-        show_error=True
+        show_error=True,
+        # Gradio corta antes la subida; check_workbook comprueba lo demás
+        max_file_size=MAX_WORKBOOK_BYTES,
+        prevent_thread_lock=True
     )
+    if METRICS_PATH:
+        mount_metrics(demo)
+        print(f"Métricas en http://127.0.0.1:7860{METRICS_PATH}")
+    start_warm_up()
+    demo.block_thread()
@@ -0,0 +1,316 @@
+"""
+Corrección por lotes de las prácticas de Fisiología Vegetal.
+
+Procesa todos los libros .xlsx de una carpeta o de un ZIP descargado del
+aula virtual con el mismo pipeline que el dashboard (process_practica1..5
+y el informe PDF), repartiendo los libros entre procesos de trabajo.
+Genera un resumen CSV con una fila por libro y el PDF de cada uno.
+
+Al terminar, una pasada de clase vuelve a ajustar a la vez las series de
+todos los libros (cebolla, patata y reacción de Hill) con los ajustes en
+lote de practicas.models y compara a cada libro con el resto de la clase.
+
+Los libros de un ZIP se leen directamente del archivo, en memoria, sin
+extraerlos a disco.
+
+Uso:
+    python batch_grading.py entregas.zip -o corregidas/
+    python batch_grading.py carpeta_entregas/ -o corregidas/ --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+import warnings
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import practicas
+
+warnings.filterwarnings('ignore')
+
+SUMMARY_FILE = 'resumen.csv'
+CLASS_FILE = 'clase.csv'
+
+# ============================================================================
+# LOCALIZAR LOS LIBROS
+# ============================================================================
+
+def is_workbook_name(name):
+    """True para un .xlsx de entrega (ni ocultos, ni bloqueos ~$ de Excel, ni __MACOSX)"""
+    parts = name.replace(os.sep, '/').split('/')
+    if any(part.startswith(('.', '__MACOSX')) for part in parts[:-1]):
+        return False
+    return parts[-1].lower().endswith('.xlsx') and not parts[-1].startswith(('~$', '.'))
+
+def find_workbooks(folder):
+    """Libros .xlsx de una carpeta (recursivo) como [(origen, nombre relativo)]"""
+    found = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(dirs)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            label = os.path.relpath(path, folder)
+            if is_workbook_name(label):
+                found.append((path, label))
+    return found
+
+def find_zip_workbooks(zip_path):
+    """Libros .xlsx de un ZIP como [((zip, miembro), miembro)], sin extraer nada"""
+    with zipfile.ZipFile(zip_path) as archive:
+        members = sorted(info.filename for info in archive.infolist() if not info.is_dir())
+    return [((zip_path, member), member) for member in members if is_workbook_name(member)]
+
+def open_source(source):
+    """Ruta en disco o (zip, miembro): en el segundo caso, el libro se copia a memoria"""
+    if isinstance(source, tuple):
+        zip_path, member = source
+        with zipfile.ZipFile(zip_path) as archive:
+            # Lo mismo que rechazaría check_workbook, sin llegar a descomprimirlo
+            if archive.getinfo(member).file_size > practicas.MAX_WORKBOOK_BYTES:
+                raise practicas.InvalidWorkbookError(f"❌ {member} es demasiado grande para un libro de prácticas")
+            buffer = io.BytesIO(archive.read(member))
+        buffer.name = member
+        return buffer
+    return source
+
+def pdf_name(label):
+    """Nombre del PDF de un libro: su ruta relativa aplanada, con extensión .pdf"""
+    stem = os.path.splitext(label)[0]
+    return stem.replace(os.sep, '__').replace('/', '__') + '.pdf'
+
+# ============================================================================
+# CORRECCIÓN DE UN LIBRO (EN UN PROCESO DE TRABAJO)
+# ============================================================================
+
+def summarize_results(results):
+    """Fila del resumen: aciertos por práctica, valores clave y errores"""
+    row = {}
+    ok_total = checks_total = 0
+    for n, res in results.items():
+        ok = checks = 0
+        for value in res.values():
+            if isinstance(value, pd.DataFrame):
+                for col in value.columns:
+                    # 'Validación', 'Val. Rf'...; no las columnas de resultados 'Valor'/'Valores'
+                    if str(col) == 'Validación' or str(col).startswith('Val.'):
+                        labels = value[col].astype(str)
+                        ok += int(labels.str.startswith('✅').sum())
+                        checks += len(labels)
+        row[f'P{n} aciertos'] = ok
+        row[f'P{n} comprobaciones'] = checks
+        ok_total += ok
+        checks_total += checks
+    row['% aciertos'] = round(ok_total / checks_total * 100, 1) if checks_total else None
+
+    row['Ψπ cebolla (MPa)'] = results[1].get('onion_pot')
+    row['Ψw patata (MPa)'] = results[1].get('potato_pot')
+    row['Germinación (%)'] = results[5].get('germinacion')
+    foto = results[4].get('fotosintesis')
+    row['Velocidad Hill'] = foto['Valor'].iloc[0] if isinstance(foto, pd.DataFrame) and len(foto) else None
+
+    errors = [f"P{n}: {value}" for n, res in results.items() for key, value in res.items() if key.endswith('error')]
+    row['estado'] = 'CON ERRORES' if errors else 'OK'
+    row['errores'] = '; '.join(errors)
+    return row
+
+def cohort_series(results):
+    """Columnas x e y de las series que se vuelven a ajustar en la pasada de clase"""
+    series = {}
+    for name, (n, key, x, y, _, _) in COHORT_MODELS.items():
+        df = results[n].get(key)
+        if isinstance(df, pd.DataFrame) and {x, y} <= set(df.columns):
+            series[name] = df[[x, y]].reset_index(drop=True)
+    return series
+
+def grade_workbook(source, label, pdf_dir, verbose=False):
+    """Corrige un libro (ruta o (zip, miembro)) y guarda su PDF en pdf_dir.
+
+    Devuelve su fila del resumen y sus series para la pasada de clase.
+    """
+    row = {'archivo': label}
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    # Los tiempos de cada libro van al mismo log que los del dashboard (practicas.SPAN_LOG)
+    trace = practicas.Trace(archivo=label, lote=True)
+    with output, trace.activate():
+        try:
+            wb = practicas.open_practicas_workbook(open_source(source))
+            results = {}
+            for n, processor in practicas.PRACTICA_PROCESSORS.items():
+                results[n], spans = practicas.traced_call(processor, wb)
+                trace.extend(spans)
+        except practicas.InvalidWorkbookError as e:
+            row['estado'] = 'FORMATO INCORRECTO'
+            row['errores'] = str(e).lstrip('❌ ')
+            return row, {}
+        except Exception as e:
+            row['estado'] = 'ERROR'
+            row['errores'] = str(e)
+            return row, {}
+        finally:
+            trace.write()
+
+        row.update(summarize_results(results))
+        pdf_bytes, spans = practicas.traced_call(practicas.build_pdf, results)
+        trace.extend(spans)
+        if pdf_bytes is not None:
+            row['pdf'] = pdf_name(label)
+            with open(os.path.join(pdf_dir, row['pdf']), 'wb') as f:
+                f.write(pdf_bytes)
+        for res in results.values():
+            practicas.release_figures(res)
+        trace.write()
+    return row, cohort_series(results)
+
+# ============================================================================
+# PASADA DE CLASE
+# ============================================================================
+# Cada modelo se ajusta una sola vez para toda la clase: las series de los
+# libros se apilan en matrices (N libros x n puntos, stack_column) y se
+# ajustan juntas. Los valores se redondean igual que en process_practicaN.
+
+def _onion_potential(x, y, present):
+    fit = practicas.fit_sigmoid_batch(x, y, present)
+    return np.where(fit['converged'], fit['potencial_50'], np.nan)
+
+def _potato_potential(x, y, present):
+    return np.round(practicas.fit_line_batch(x, y, present)['x_intercept'], 2)
+
+def _hill_rate(x, y, present):
+    return np.abs(np.round(practicas.fit_line_batch(x, y, present)['slope'], 2))
+
+# Serie -> (práctica, tabla, columna x, columna y, valor, ajuste en lote)
+COHORT_MODELS = {
+    'onion': (1, 'onion', 'Ψπ (MPa)', '% plasmólisis', 'Ψπ cebolla (MPa)', _onion_potential),
+    'potato': (1, 'potato', 'Ψw (MPa)', '% Var estudiante', 'Ψw patata (MPa)', _potato_potential),
+    'hill': (4, 'hill', 'Tiempo (min)', 'Reducción corregido', 'Velocidad Hill', _hill_rate),
+}
+
+def cohort_pass(series):
+    """Ajusta en lote las series de todos los libros {nombre: series} y compara cada libro con la clase.
+
+    Devuelve ({nombre: columnas del resumen}, tabla de la clase): para cada
+    valor, su desviación respecto a la media en desviaciones típicas (z) y,
+    para la clase, libros ajustados, media, desviación típica y extremos.
+    """
+    columns = {label: {} for label in series}
+    stats = []
+    for name, (_, _, x_col, y_col, value_label, fit_values) in COHORT_MODELS.items():
+        labels = [label for label, s in series.items() if name in s]
+        if not labels:
+            continue
+        x, present = practicas.stack_column([series[label][name] for label in labels], x_col)
+        y, _ = practicas.stack_column([series[label][name] for label in labels], y_col)
+        with np.errstate(invalid='ignore'):
+            values = fit_values(x, y, present)
+        fitted = np.isfinite(values)
+        mean = values[fitted].mean() if fitted.any() else np.nan
+        std = values[fitted].std(ddof=1) if fitted.sum() > 1 else np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.round((values - mean) / std, 2)
+        for label, value in zip(labels, z):
+            columns[label][f'z {value_label}'] = value if np.isfinite(value) else None
+        stats.append({
+            'valor': value_label, 'libros': len(labels), 'sin ajuste': int((~fitted).sum()),
+            'media': round(mean, 3), 'desviación típica': round(std, 3),
+            'mínimo': values[fitted].min() if fitted.any() else None,
+            'mediana': round(np.median(values[fitted]), 3) if fitted.any() else None,
+            'máximo': values[fitted].max() if fitted.any() else None,
+        })
+    return columns, pd.DataFrame(stats)
+
+# ============================================================================
+# LOTE COMPLETO
+# ============================================================================
+
+def grade_all(workbooks, out_dir, workers=None, verbose=False):
+    """Corrige [(origen, nombre)] en paralelo y escribe el PDF de cada libro en out_dir.
+
+    Devuelve (resumen, tabla de la clase); ver cohort_pass.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    rows = []
+    series = {}
+
+    def report(row, book_series):
+        rows.append(row)
+        series[row['archivo']] = book_series
+        print(f"[{len(rows)}/{len(workbooks)}] {row['archivo']}: {row.get('estado', '?')}")
+
+    if workers == 0:
+        for source, label in workbooks:
+            report(*grade_workbook(source, label, out_dir, verbose))
+    else:
+        # 'spawn' como en el dashboard; cada proceso precalienta módulos, fuentes y ecuaciones
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=practicas.warm_worker) as pool:
+            # Solo viaja el origen: cada proceso lee su libro del ZIP o del disco
+            futures = {pool.submit(grade_workbook, source, label, out_dir, verbose): label
+                       for source, label in workbooks}
+            for future in as_completed(futures):
+                try:
+                    row, book_series = future.result()
+                except Exception as e:
+                    row, book_series = {'archivo': futures[future], 'estado': 'ERROR', 'errores': str(e)}, {}
+                report(row, book_series)
+
+    start = time.perf_counter()
+    columns, cohort = cohort_pass(series)
+    print(f"✓ Pasada de clase: {len(series)} libros en {(time.perf_counter() - start) * 1000:.0f} ms")
+    for row in rows:
+        row.update(columns[row['archivo']])
+
+    summary = pd.DataFrame(rows).sort_values('archivo').reset_index(drop=True)
+    # Los libros que no se pudieron leer dejan huecos: mantener los recuentos enteros
+    counts = [col for col in summary.columns if col.startswith('P') and col.endswith(('aciertos', 'comprobaciones'))]
+    for col in counts:
+        summary[col] = pd.to_numeric(summary[col]).astype('Int64')
+    return summary, cohort
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corrige por lotes los libros de prácticas de una carpeta o ZIP")
+    parser.add_argument('entrada', help="carpeta o archivo .zip con los libros .xlsx")
+    parser.add_argument('-o', '--salida', default='corregidas',
+                        help="carpeta donde se escriben los PDF y el resumen (por defecto: corregidas)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="procesos de trabajo (por defecto uno por núcleo; 0 = sin procesos)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="mostrar la salida del análisis de cada libro")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.salida, exist_ok=True)
+    start = time.perf_counter()
+
+    if os.path.isdir(args.entrada):
+        workbooks = find_workbooks(args.entrada)
+    elif zipfile.is_zipfile(args.entrada):
+        workbooks = find_zip_workbooks(args.entrada)
+    else:
+        parser.error(f"{args.entrada} no es una carpeta ni un archivo ZIP")
+
+    if not workbooks:
+        print("⚠️ No se encontraron archivos .xlsx")
+        return 1
+    print(f"Corrigiendo {len(workbooks)} libros...")
+    summary, cohort = grade_all(workbooks, args.salida, args.workers, args.verbose)
+
+    summary_path = os.path.join(args.salida, SUMMARY_FILE)
+    # utf-8-sig para que Excel abra bien las tildes y los símbolos
+    summary.to_csv(summary_path, index=False, encoding='utf-8-sig')
+    cohort.to_csv(os.path.join(args.salida, CLASS_FILE), index=False, encoding='utf-8-sig')
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ {len(summary)} libros en {elapsed:.1f} s ({(summary['estado'] == 'OK').sum()} sin errores)")
+    print(f"✓ Resumen: {summary_path}")
+    print(f"✓ Clase: {os.path.join(args.salida, CLASS_FILE)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark de memoria del dashboard: muchas subidas seguidas.
+
+Pasa libros sintéticos distintos (benchmarks/workbooks.py) por el mismo
+camino que una subida a la app Gradio (process_all_practicas y deliver_pdf,
+con sus cachés, el almacén de archivos y la cola de PDF) y mide la memoria
+residente (RSS) del proceso cada --cada subidas. El análisis se hace en este
+mismo proceso (ANALYSIS_WORKERS=0), así que la memoria medida es la de todo
+el trabajo.
+
+Las cachés se llenan en las primeras subidas; a partir de --calentamiento la
+memoria debe quedarse estable. Si crece más de --max-crecimiento MB desde
+entonces (figuras, resultados o PDF que no se liberan), se sale con código 1.
+
+Uso:
+    python benchmarks/memory.py                  # 1000 subidas
+    python benchmarks/memory.py -n 200 --max-crecimiento 100
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+# Antes de importar app: sin pool de procesos y con su propio almacén
+os.environ.setdefault('ANALYSIS_WORKERS', '0')
+os.environ.setdefault('ARTIFACT_DIR', tempfile.mkdtemp(prefix='practicas_memoria_'))
+
+import app
+import practicas
+from workbooks import workbook_bytes
+
+MB = 1024 * 1024
+
+def upload(path):
+    """Una subida completa: todas las entregas del generador y después el PDF"""
+    file = types.SimpleNamespace(name=path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for outputs in app.process_all_practicas(file):
+            pass
+        pdf_path = app.deliver_pdf(file)
+    # La API solo devuelve la última entrega: tiene que ser el estado completo
+    if len(outputs) != 35 or any(isinstance(v, dict) and v.get('__type__') == 'update' for v in outputs):
+        raise RuntimeError(f"La última entrega de {path} no lleva los 35 outputs")
+    if pdf_path is None:
+        raise RuntimeError(f"La subida de {path} no produjo PDF")
+
+def rss_mb():
+    gc.collect()
+    return practicas.resident_memory_bytes() / MB
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide la memoria del dashboard a lo largo de muchas subidas")
+    parser.add_argument('-n', '--subidas', type=int, default=1000, help="subidas de libros distintos (por defecto 1000)")
+    parser.add_argument('--cada', type=int, default=100, help="subidas entre mediciones (por defecto 100)")
+    parser.add_argument('--calentamiento', type=int, default=50,
+                        help="subidas hasta llenar las cachés; la memoria se compara desde aquí (por defecto 50)")
+    parser.add_argument('--max-crecimiento', type=float, default=150,
+                        help="MB que puede crecer la memoria tras el calentamiento (código 1 si se supera)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='practicas_subidas_') as folder:
+        start = time.perf_counter()
+        print(f"Memoria al empezar: {rss_mb():.0f} MB (figuras de salida: {app.FIGURE_OUTPUT})")
+        reference = None
+        samples = []
+        for i in range(args.subidas):
+            path = os.path.join(folder, f'libro_{i:04d}.xlsx')
+            with open(path, 'wb') as f:
+                f.write(workbook_bytes(i).getvalue())
+            upload(path)
+            os.remove(path)
+            done = i + 1
+            if done == args.calentamiento:
+                reference = rss_mb()
+                print(f"  {done:5d} subidas: {reference:7.0f} MB (referencia)")
+            elif done % args.cada == 0 or done == args.subidas:
+                samples.append((done, rss_mb()))
+                print(f"  {done:5d} subidas: {samples[-1][1]:7.0f} MB, {practicas.FIGURES.count()} figuras vivas, "
+                      f"{time.perf_counter() - start:.0f} s")
+
+    if reference is None or not samples or samples[-1][0] <= args.calentamiento:
+        print("\n(pocas subidas para comparar con la referencia)")
+        return 0
+    peak = max(mb for done, mb in samples if done > args.calentamiento)
+    growth = peak - reference
+    if growth > args.max_crecimiento:
+        print(f"\n✗ La memoria crece {growth:.0f} MB tras el calentamiento (límite {args.max_crecimiento:.0f} MB)")
+        return 1
+    print(f"\n✓ Memoria estable: +{growth:.0f} MB tras el calentamiento (límite {args.max_crecimiento:.0f} MB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
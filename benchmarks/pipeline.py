@@ -0,0 +1,194 @@
+"""
+Benchmark de extremo a extremo del análisis de un libro.
+
+Genera libros sintéticos (benchmarks/workbooks.py) y mide por separado cada
+etapa que recorre un libro en el dashboard y en la corrección por lotes:
+
+  lectura      abrir y validar el libro (open_practicas_workbook)
+  practica1-5  cada process_practicaN (cálculos, validaciones y figuras)
+  figuras      rasterizar las figuras para el dashboard (render_figure_image)
+  pdf          construir el informe (build_pdf)
+
+para lotes de 1, 10 y 1000 libros (--tamaños), en este proceso y de uno en
+uno, para que los tiempos por etapa sean comparables entre ejecuciones.
+
+Con --guardar-referencia se guardan las medianas por libro en
+benchmarks/baseline.json; en las ejecuciones siguientes, una etapa cuya
+mediana supere la de referencia en más de --tolerancia (y de --minimo
+segundos) cuenta como regresión y el programa sale con código 1.
+
+Uso:
+    python benchmarks/pipeline.py --tamaños 1 10 --guardar-referencia
+    python benchmarks/pipeline.py --tamaños 1 10
+    python benchmarks/pipeline.py            # 1, 10 y 1000 libros
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+import practicas
+from workbooks import workbook_bytes
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+STAGES = ['lectura'] + [f'practica{n}' for n in practicas.PRACTICA_PROCESSORS] + ['figuras', 'pdf', 'total']
+
+# ============================================================================
+# MEDICIÓN
+# ============================================================================
+
+def time_workbook(source):
+    """Recorre un libro por todas las etapas; devuelve {etapa: segundos}"""
+    timings = {}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        t = time.perf_counter()
+        wb = practicas.open_practicas_workbook(source)
+        timings['lectura'] = time.perf_counter() - t
+
+        results = {}
+        for n, processor in practicas.PRACTICA_PROCESSORS.items():
+            t = time.perf_counter()
+            results[n] = processor(wb)
+            timings[f'practica{n}'] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        for res in results.values():
+            for value in res.values():
+                if practicas.is_figure(value):
+                    practicas.render_figure_image(value)
+        timings['figuras'] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        pdf_bytes = practicas.build_pdf(results)
+        timings['pdf'] = time.perf_counter() - t
+
+        for res in results.values():
+            practicas.release_figures(res)
+    if pdf_bytes is None:
+        raise RuntimeError(f"No se pudo generar el PDF de {getattr(source, 'name', source)}")
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+def run_size(count, error_rate=0.1):
+    """Mide `count` libros distintos; devuelve {etapa: [segundos por libro]}"""
+    samples = {stage: [] for stage in STAGES}
+    for seed in range(count):
+        source = workbook_bytes(seed, error_rate)   # la generación no se mide
+        for stage, seconds in time_workbook(source).items():
+            samples[stage].append(seconds)
+    return samples
+
+def summarize(samples):
+    """Mediana, p95 y total por etapa"""
+    summary = {}
+    for stage, values in samples.items():
+        ordered = sorted(values)
+        summary[stage] = {
+            'mediana': statistics.median(ordered),
+            'p95': ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+            'total': sum(ordered),
+        }
+    return summary
+
+# ============================================================================
+# REFERENCIA
+# ============================================================================
+
+def load_baseline(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path, summaries):
+    baseline = {
+        'python': platform.python_version(),
+        'maquina': platform.node(),
+        'fecha': time.strftime('%Y-%m-%d %H:%M'),
+        'medianas': {str(size): {stage: round(s['mediana'], 5) for stage, s in summary.items()}
+                     for size, summary in summaries.items()},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+
+def find_regressions(summaries, baseline, tolerance, minimum):
+    """[(tamaño, etapa, referencia, actual)] de las etapas más lentas que la referencia"""
+    regressions = []
+    for size, summary in summaries.items():
+        reference = baseline['medianas'].get(str(size), {})
+        for stage, stats in summary.items():
+            if stage not in reference:
+                continue
+            limit = max(reference[stage] * (1 + tolerance), reference[stage] + minimum)
+            if stats['mediana'] > limit:
+                regressions.append((size, stage, reference[stage], stats['mediana']))
+    return regressions
+
+# ============================================================================
+# PROGRAMA
+# ============================================================================
+
+def print_summary(size, summary, reference=None):
+    print(f"\n{size} libro(s)")
+    print(f"  {'etapa':<12} {'mediana':>10} {'p95':>10} {'total':>10} {'referencia':>11}")
+    for stage in STAGES:
+        s = summary[stage]
+        ref = f"{reference[stage] * 1000:9.1f} ms" if reference and stage in reference else ''
+        print(f"  {stage:<12} {s['mediana'] * 1000:7.1f} ms {s['p95'] * 1000:7.1f} ms {s['total']:8.2f} s {ref:>11}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide cada etapa del análisis con libros sintéticos")
+    parser.add_argument('--tamaños', type=int, nargs='+', default=[1, 10, 1000], help="libros por lote (por defecto 1 10 1000)")
+    parser.add_argument('--errores', type=float, default=0.1, help="fracción de respuestas incorrectas en los libros")
+    parser.add_argument('--referencia', default=BASELINE_FILE, help="archivo JSON con las medianas de referencia")
+    parser.add_argument('--guardar-referencia', action='store_true', help="guardar esta ejecución como referencia")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="empeoramiento admitido sobre la referencia (por defecto 0.25 = 25 %%)")
+    parser.add_argument('--minimo', type=float, default=0.005,
+                        help="diferencia mínima en segundos para contar como regresión (por defecto 0.005)")
+    args = parser.parse_args(argv)
+
+    # Primer libro fuera de la medición: importaciones, fuentes y ecuaciones
+    print("Precalentando...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        practicas.warm_worker()
+    time_workbook(workbook_bytes(0, args.errores))
+
+    baseline = None if args.guardar_referencia else load_baseline(args.referencia)
+    summaries = {}
+    for size in args.tamaños:
+        summaries[size] = summarize(run_size(size, args.errores))
+        reference = baseline['medianas'].get(str(size)) if baseline else None
+        print_summary(size, summaries[size], reference)
+
+    if args.guardar_referencia:
+        save_baseline(args.referencia, summaries)
+        print(f"\n✓ Referencia guardada en {args.referencia}")
+        return 0
+    if baseline is None:
+        print(f"\n(sin referencia en {args.referencia}: usa --guardar-referencia)")
+        return 0
+
+    regressions = find_regressions(summaries, baseline, args.tolerancia, args.minimo)
+    if regressions:
+        print("\n✗ Regresiones respecto a la referencia:")
+        for size, stage, reference, current in regressions:
+            print(f"  {size} libro(s), {stage}: {reference * 1000:.1f} ms → {current * 1000:.1f} ms "
+                  f"(+{(current / reference - 1) * 100:.0f} %)")
+        return 1
+    print("\n✓ Sin regresiones respecto a la referencia")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
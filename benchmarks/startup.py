@@ -0,0 +1,102 @@
+"""
+Benchmark de arranque del dashboard.
+
+Mide, en procesos nuevos (como un reinicio del Space), cuánto tarda:
+  - import practicas: el núcleo, lo que pagan los procesos de trabajo y los lotes
+  - import app: el resto del servidor (cachés, pool, cola de PDF)
+  - interfaz: crear la interfaz Gradio (incluye importar Gradio)
+  - precalentamiento: módulos del análisis y del PDF, fuentes y ecuaciones
+
+y lista los paquetes que más pesan al importar app (python -X importtime).
+Con --max-ui se sale con código 1 si import + interfaz supera ese límite,
+para detectar regresiones.
+
+Uso:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --max-ui 8
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = 'TIEMPOS_ARRANQUE '
+
+CHILD = f"""
+import json, time
+t0 = time.perf_counter()
+import practicas
+t1 = time.perf_counter()
+import app
+t2 = time.perf_counter()
+demo = app.create_interface()
+t3 = time.perf_counter()
+app.warm_worker()
+t4 = time.perf_counter()
+print({MARKER!r} + json.dumps({{'import practicas': t1 - t0, 'import app': t2 - t1,
+                               'interfaz': t3 - t2, 'precalentamiento': t4 - t3}}))
+"""
+
+def run_once():
+    """Un arranque en frío; devuelve (tiempos, salida de -X importtime)"""
+    env = dict(os.environ, ANALYSIS_WORKERS='0')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    timings = [line for line in proc.stdout.splitlines() if line.startswith(MARKER)]
+    if proc.returncode != 0 or not timings:
+        raise RuntimeError(f"El arranque falló:\n{proc.stderr[-2000:]}")
+    return json.loads(timings[0][len(MARKER):]), proc.stderr
+
+def import_breakdown(importtime_log, module='practicas', top=10):
+    """Tiempo propio de importación por paquete raíz hasta terminar `import module`"""
+    totals = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line.split('|')
+        self_us = fields[0].split(':')[1].strip()
+        if len(fields) != 3 or not self_us.isdigit():
+            continue
+        # importtime escribe cada módulo al terminar, después de sus dependencias
+        name = fields[2].strip()
+        root = name.split('.')[0]
+        totals[root] = totals.get(root, 0) + int(self_us) / 1e6
+        if name == module:
+            break
+    return sorted(((seconds, name) for name, seconds in totals.items()), reverse=True)[:top]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío del dashboard")
+    parser.add_argument('-n', '--runs', type=int, default=3, help="arranques a medir (se da la mediana)")
+    parser.add_argument('--max-ui', type=float, default=None,
+                        help="límite en segundos para importar y crear la interfaz (código 1 si se supera)")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for i in range(args.runs):
+        timings, log = run_once()
+        runs.append(timings)
+        print(f"Arranque {i + 1}/{args.runs}: " + ', '.join(f"{k} {v:.2f} s" for k, v in timings.items()))
+
+    print("\nMediana:")
+    medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    for key, value in medians.items():
+        print(f"  {key:<18} {value:6.2f} s")
+    ui_ready = medians['import practicas'] + medians['import app'] + medians['interfaz']
+    print(f"  {'interfaz lista':<18} {ui_ready:6.2f} s")
+
+    print("\nLo que más pesa en import practicas (último arranque):")
+    for seconds, name in import_breakdown(log):
+        print(f"  {name:<28} {seconds:6.2f} s")
+
+    if args.max_ui is not None and ui_ready > args.max_ui:
+        print(f"\n✗ La interfaz tarda {ui_ready:.2f} s en estar lista (límite {args.max_ui:.2f} s)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
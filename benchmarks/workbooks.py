@@ -0,0 +1,211 @@
+"""
+Generador de libros de prácticas sintéticos para los benchmarks.
+
+Cada libro tiene las hojas "INFO PAREJA" y "Practica 1".."Practica 5" con
+los bloques en las celdas que indica practicas.SHEET_LAYOUT (se leen de ahí,
+así que el generador sigue al lector si cambia la disposición). Los datos son
+realistas: la sigmoide de la cebolla, la recta de la patata, la cinética de
+Hill... y los valores del estudiante son los correctos salvo una fracción
+(`error_rate`) que se desvía para ejercitar también las validaciones fallidas.
+
+Uso:
+    python benchmarks/workbooks.py carpeta_salida -n 100
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+
+from openpyxl import Workbook
+from openpyxl.utils import range_boundaries
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import practicas
+
+R_T = 0.008314 * 295      # R·T (L·MPa/mol) a 22 °C, como en la app
+SUCROSE_RT = 2.45          # Ψπ (MPa) por mol/L de sacarosa
+
+# ============================================================================
+# ESCRITURA SEGÚN EL LAYOUT
+# ============================================================================
+
+def put_block(ws, sheet, name, rows):
+    """Escribe `rows` (lista de filas) desde la esquina superior izquierda del bloque del layout"""
+    spec = practicas.SHEET_LAYOUT[sheet][name]
+    min_col, min_row, max_col, max_row = range_boundaries(spec['range'])
+    assert len(rows) <= max_row - min_row + 1 and all(len(row) <= max_col - min_col + 1 for row in rows), name
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            ws.cell(min_row + r, min_col + c, value)
+
+def put_cell(ws, sheet, name, value):
+    ws[practicas.SHEET_LAYOUT[sheet][name]['cell']] = value
+
+def put_columns(ws, sheet, name, header, fields):
+    """Bloque rellenado por columnas: cabecera en la primera fila, un campo por fila"""
+    put_block(ws, sheet, name, [header] + [[field] + list(values) for field, values in fields])
+
+# ============================================================================
+# DATOS DE CADA PRÁCTICA
+# ============================================================================
+
+class Student:
+    """Valores del estudiante: el correcto salvo una fracción `error_rate` que se desvía"""
+
+    def __init__(self, rng, error_rate):
+        self.rng = rng
+        self.error_rate = error_rate
+
+    def __call__(self, correct):
+        if self.rng.random() < self.error_rate:
+            return round(correct * self.rng.choice([0.5, 1.5, -1]) + self.rng.choice([0, 1]), 2)
+        return correct
+
+def practica1(ws, rng, student):
+    sheet = "Practica 1"
+    rows = [['Concentración (M)', 'Ψ (MPa)']]
+    for i in range(8):
+        c = round(0.1 * i, 1)
+        rows.append([c, student(round(-c * R_T, 2))])
+    put_block(ws, sheet, 'sacarosa', rows)
+
+    # Cebolla: % de plasmólisis sigmoide frente a Ψπ, de mayor a menor concentración
+    xmid, scal = rng.uniform(-1.3, -0.9), rng.uniform(-9, -5)
+    concs = [round(0.8 - 0.1 * i, 1) for i in range(7)]
+    psi = [round(-c * SUCROSE_RT, 3) for c in concs]
+    plasmolysis = [min(100, max(0, round(float(practicas.sigmoid(p, xmid, scal)) + rng.uniform(-3, 3)))) for p in psi]
+    plasmolysis.sort(reverse=True)
+    if rng.random() < student.error_rate:
+        i = rng.randrange(6)
+        plasmolysis[i], plasmolysis[i + 1] = plasmolysis[i + 1], plasmolysis[i]
+    put_block(ws, sheet, 'onion', [[i + 1, c, p, pl] for i, (c, p, pl) in enumerate(zip(concs, psi, plasmolysis))])
+
+    # Patata: variación de peso lineal en Ψw, nula en el Ψw del tejido
+    psi_tissue, k = rng.uniform(-0.9, -0.5), rng.uniform(8, 14)
+    rows = []
+    for i in range(7):
+        c = round(0.1 * i, 1)
+        psi_w = round(-c * SUCROSE_RT, 3)
+        w0 = round(rng.uniform(4.5, 5.5), 3)
+        w1 = round(w0 * (1 + (k * (psi_w - psi_tissue) + rng.uniform(-0.8, 0.8)) / 100), 3)
+        rows.append([i + 1, c, psi_w, w0, w1, student(round((w1 - w0) / w0 * 100, 2))])
+    put_block(ws, sheet, 'potato', rows)
+
+def practica2(ws, rng, student):
+    sheet = "Practica 2"
+    treatments = ['Control', 'AIA 10⁻⁸ M', 'AIA 10⁻⁶ M', 'AIA 10⁻⁴ M']
+    lengths = [round(rng.uniform(9, 11), 1), round(rng.uniform(12, 14), 1), round(rng.uniform(15, 19), 1), round(rng.uniform(10, 13), 1)]
+    put_columns(ws, sheet, 'corn', ['Tratamiento'] + treatments, [
+        ('Media longitud (mm)', lengths),
+        ('Variación (%)', [student(round((m - 10) / 10 * 100, 2)) for m in lengths]),
+    ])
+
+    dry = [round(rng.uniform(1.8, 2.2), 2) for _ in range(3)]
+    wet = [round(d * (1 + rng.uniform(0.6, 0.8) - 0.2 * j), 2) for j, d in enumerate(dry)]
+    put_columns(ws, sheet, 'pea', ['Parámetro', '0 mM', '100 mM', '200 mM'], [
+        ('Peso seco (g)', dry),
+        ('Peso húmedo (g)', wet),
+        ('% Var estudiante', [student(round((w - d) / d * 100, 2)) for d, w in zip(dry, wet)]),
+        ('% embriones TFT', [rng.randint(80, 95) - 20 * j for j in range(3)]),
+        ('% cotiledones NBT+', [rng.randint(30, 45) + 10 * j for j in range(3)]),
+        ('% cotiledones NBT++', [rng.randint(5, 15) + 15 * j for j in range(3)]),
+        ('Observaciones', ['', 'Tejido algo oscurecido', 'Tejido oscurecido']),
+    ])
+
+def practica3(ws, rng, student):
+    sheet = "Practica 3"
+    absorbance = round(rng.uniform(0.3, 0.8), 3)
+    conc = round(absorbance / 76.07 * 50, 2)
+    put_cell(ws, sheet, 'abs', absorbance)
+    put_cell(ws, sheet, 'conc', student(conc))
+    put_cell(ws, sheet, 'conc_g', student(round(conc * 8 / 4, 2)))
+
+    solvent = round(rng.uniform(9, 11), 1)
+    rows = [['Banda', 'Distancia pigmento', 'Distancia disolvente', 'Rf']]
+    distance = solvent                      # la primera banda llega al frente (Rf = 1)
+    for band in range(6):
+        rows.append([band + 1, round(distance, 1), solvent, round(round(distance, 1) / solvent, 2)])
+        distance *= rng.uniform(0.6, 0.8)
+    put_block(ws, sheet, 'cromatografia', rows)
+
+    put_cell(ws, sheet, 'anabaena_abs', rng.choice(['620 nm', '615 nm', '620 y 680 nm']))
+    put_cell(ws, sheet, 'anabaena_pig', 'Ficocianina' if rng.random() >= student.error_rate else 'Clorofila a')
+
+def practica4(ws, rng, student):
+    sheet = "Practica 4"
+    abs_chl = round(rng.uniform(0.4, 0.8), 3)
+    chl_ml = round(abs_chl / 76.07 * 100, 2)
+    chl_mg = round(chl_ml * 0.5, 2)
+    put_cell(ws, sheet, 'abs_chl', abs_chl)
+    put_cell(ws, sheet, 'chl_ml', student(chl_ml))
+    put_cell(ws, sheet, 'chl_mg', student(chl_mg))
+
+    # Tubos 1-3: patrones; 4-7: reacción a 0, 5, 10 y 15 min; 8: DCMU; 9: blanco
+    start, rate = rng.uniform(0.45, 0.55), rng.uniform(0.02, 0.04)   # rate: caída de Abs cada 5 min
+    absorbances = [0.1, 0.2, 0.3] + [start - rate * i + rng.uniform(-0.005, 0.005) for i in range(4)]
+    absorbances += [start - rng.uniform(0, 0.01), 0.0]
+    absorbances = [round(a, 3) for a in absorbances]
+    ferri = [round(a * 4, 2) for a in absorbances]
+    put_block(ws, sheet, 'ferricianuro', [['Tubo', 'Abs 420 nm', '[Ferricianuro]']] +
+              [[i + 1, a, student(f)] for i, (a, f) in enumerate(zip(absorbances, ferri))])
+    put_block(ws, sheet, 'hill', [[i + 4, 5 * i, student(round(ferri[3 + i] * 3.5 / chl_mg, 2))] for i in range(4)])
+
+def practica5(ws, rng, student):
+    sheet = "Practica 5"
+    put_cell(ws, sheet, 'germinacion', rng.randint(70, 98))
+    rows = []
+    for i, treatment in enumerate(['Agua', 'GA₃ 10⁻⁶ M', 'GA₃ 10⁻⁵ M', 'ABA 10⁻⁵ M', 'GA₃ + ABA']):
+        dry = rng.randint(150, 250)
+        a0 = round(rng.uniform(0.85, 0.95), 3)
+        a10 = round(a0 * rng.uniform(0.3, 0.95), 3)
+        starch = round((a0 - a10) / 11.4 * 7 * 6, 2)
+        activity = round(starch / (dry / 10 * 0.25), 2)
+        rows.append([i + 1, 'Embrión' if i % 2 else 'Media semilla', treatment, dry, a0, a10,
+                     student(starch), student(activity)])
+    put_block(ws, sheet, 'amilasa', rows)
+
+# ============================================================================
+# LIBRO COMPLETO
+# ============================================================================
+
+def make_workbook(target, seed=0, error_rate=0.1):
+    """Escribe en `target` (ruta o fichero) un libro sintético reproducible a partir de `seed`"""
+    rng = random.Random(seed)
+    student = Student(rng, error_rate)
+    wb = Workbook()
+    info = wb.active
+    info.title = "INFO PAREJA"
+    info['B2'], info['C2'] = 'Pareja', seed
+    info['B3'], info['C3'] = 'Estudiante 1', f'Estudiante {2 * seed + 1}'
+    info['B4'], info['C4'] = 'Estudiante 2', f'Estudiante {2 * seed + 2}'
+    for n, fill in enumerate([practica1, practica2, practica3, practica4, practica5], start=1):
+        fill(wb.create_sheet(f"Practica {n}"), rng, student)
+    wb.save(target)
+
+def workbook_bytes(seed=0, error_rate=0.1):
+    """Libro sintético en memoria, como un fichero subido (con nombre)"""
+    buffer = io.BytesIO()
+    make_workbook(buffer, seed, error_rate)
+    buffer.seek(0)
+    buffer.name = f'sintetico_{seed:04d}.xlsx'
+    return buffer
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera libros de prácticas sintéticos")
+    parser.add_argument('salida', help="carpeta donde se escriben los .xlsx")
+    parser.add_argument('-n', '--cantidad', type=int, default=10, help="número de libros (por defecto 10)")
+    parser.add_argument('--errores', type=float, default=0.1, help="fracción de respuestas incorrectas (por defecto 0.1)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.salida, exist_ok=True)
+    for seed in range(args.cantidad):
+        make_workbook(os.path.join(args.salida, f'sintetico_{seed:04d}.xlsx'), seed, args.errores)
+    print(f"✓ {args.cantidad} libros en {args.salida}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
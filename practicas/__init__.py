@@ -0,0 +1,37 @@
+"""
+Núcleo del análisis de las prácticas de Fisiología Vegetal, sin interfaz.
+
+Lectura del libro, modelos, validaciones, figuras e informe PDF. Lo usan la
+interfaz Gradio (app.py), la de Streamlit (streamlit_app.py), la corrección
+por lotes y los procesos de trabajo; importarlo no carga Gradio ni Streamlit.
+
+    from practicas import open_practicas_workbook, PRACTICA_PROCESSORS, build_pdf
+
+    wb = open_practicas_workbook('libro.xlsx')
+    results = {n: processor(wb) for n, processor in PRACTICA_PROCESSORS.items()}
+    pdf_bytes = build_pdf(results)
+
+Solo lo imprescindible al importar: scipy.optimize, matplotlib y ReportLab
+se importan en la primera función que los usa (o antes, con warm_worker).
+"""
+
+from .tracing import (
+    SPAN_LOG, METRICS, Counter, Gauge, Histogram, MetricsRegistry, Span, Trace, create_metrics,
+    current_trace, metrics_from_log, observe_spans, resident_memory_bytes, span, traced_call,
+)
+from .workbook import (
+    MAX_WORKBOOK_BYTES, REQUIRED_SHEETS, SHEET_LAYOUT, ExcelWorkbook, InvalidWorkbookError, check_workbook,
+    open_practicas_workbook, open_workbook,
+)
+from .models import sigmoid, calculate_potencial_50, fit_sigmoid_batch, fit_line_batch, fit_line, stack_column
+from .figures import (
+    FIGURES, chart_data, create_figure, figure_is_live, image_format, is_figure, release_figure, release_figures,
+    figures_to_images, render_figure_image, with_figure_images, without_figures,
+)
+from .processors import (
+    PRACTICA_PROCESSORS, PRACTICA_SHEETS, practica_digest, process_practica1, process_practica2,
+    process_practica3, process_practica4, process_practica5,
+)
+from .outputs import PRACTICA_OUTPUTS
+from .report import build_pdf, chart_to_drawing, generate_simple_pdf, render_equation_png
+from .warmup import preload_modules, warm_worker
@@ -0,0 +1,186 @@
+"""
+Figuras de matplotlib sin pyplot, registro de las figuras vivas del proceso,
+datos de las gráficas para el PDF e imágenes ya rasterizadas de cada figura
+para las interfaces.
+"""
+
+import io
+import sys
+import threading
+import weakref
+
+from .tracing import span
+
+
+# ============================================================================
+# FIGURAS (SIN PYPLOT)
+# ============================================================================
+
+class FigureTracker:
+    """Registro de las figuras vivas del proceso (para la métrica de figuras vivas).
+
+    Las figuras se crean sin pyplot, así que solo las retiene quien las usa
+    (el resultado devuelto o la caché) y se recogen cuando nadie las usa. El
+    registro no libera ninguna por su cuenta: una figura solo la libera quien
+    la retiene, al dejar de necesitarla (release_figure).
+    """
+
+    def __init__(self):
+        self._live = {}  # id(fig) -> weakref a la figura
+        self._lock = threading.Lock()
+
+    def register(self, fig):
+        with self._lock:
+            self._prune()
+            self._live[id(fig)] = weakref.ref(fig)
+
+    def discard(self, fig):
+        with self._lock:
+            ref = self._live.get(id(fig))
+            if ref is not None and ref() is fig:
+                del self._live[id(fig)]
+
+    def count(self):
+        with self._lock:
+            self._prune()
+            return len(self._live)
+
+    def _prune(self):
+        for key in [k for k, ref in self._live.items() if ref() is None]:
+            del self._live[key]
+
+FIGURES = FigureTracker()
+
+def is_figure(value):
+    """is_figure(value) sin importar matplotlib si aún no se ha usado"""
+    figure_module = sys.modules.get('matplotlib.figure')
+    return figure_module is not None and isinstance(value, figure_module.Figure)
+
+def create_figure(figsize):
+    """Crea una figura con su lienzo Agg (sin pyplot) y devuelve (fig, ax)"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    FIGURES.register(fig)
+    return fig, fig.add_subplot()
+
+def _clear_figure(fig):
+    fig.clear()
+    fig.__dict__.pop('_images', None)
+    fig.canvas.__dict__.pop('renderer', None)  # buffer RGBA del último dibujado
+    fig._released = True
+
+def release_figure(fig):
+    """Libera una figura ya renderizada (dashboard, PDF); deja de contar como viva"""
+    if fig is not None and figure_is_live(fig):
+        FIGURES.discard(fig)
+        _clear_figure(fig)
+
+def figure_is_live(fig):
+    return not getattr(fig, '_released', False)
+
+def release_figures(values):
+    """Libera todas las figuras de una lista de outputs o de un dict de resultados"""
+    for value in (values.values() if isinstance(values, dict) else values):
+        if is_figure(value):
+            release_figure(value)
+
+def without_figures(results):
+    """Copia de un dict de resultados con las figuras (o sus imágenes) a None: el PDF solo usa los datos de las gráficas"""
+    return {key: None if is_figure(value) or isinstance(value, bytes) else value
+            for key, value in results.items()}
+
+# ============================================================================
+# DATOS DE LAS GRÁFICAS
+# ============================================================================
+# Junto a cada figura, las prácticas devuelven los datos con los que se ha
+# dibujado (<nombre>_chart): título, ejes y series. Son datos simples, que se
+# copian entre procesos y se guardan en caché sin coste, y el PDF dibuja con
+# ellos sus gráficas sin depender de la figura.
+#
+# Series: {'kind': 'scatter' | 'line', 'x': [...], 'y': [...]},
+# {'kind': 'hline', 'y': v}, {'kind': 'vline', 'x': v} y
+# {'kind': 'bar', 'values': [...]} (varias series de barras se agrupan sobre
+# `categories`). Opcionales: 'color' (o 'colors', uno por barra), 'label' para
+# la leyenda, 'dash' ('--' o ':') en las líneas y 'value_format' para rotular
+# el valor de cada barra.
+
+def chart_data(title, xlabel, ylabel, series, categories=None, size=(10, 7), label_rotation=0):
+    """Datos de una gráfica para el PDF; los arrays de NumPy pasan a listas de float"""
+    def plain(value):
+        if isinstance(value, str) or value is None:
+            return value
+        if hasattr(value, '__len__'):
+            return [plain(v) for v in value]
+        return float(value)
+    return {
+        'title': title, 'xlabel': xlabel, 'ylabel': ylabel, 'size': tuple(size),
+        'categories': [str(c) for c in categories] if categories is not None else None,
+        'label_rotation': label_rotation,
+        'series': [{key: plain(value) for key, value in s.items()} for s in series],
+    }
+
+# ============================================================================
+# IMÁGENES PARA LAS INTERFACES
+# ============================================================================
+# Enviar la figura viva a gr.Plot la vuelve a dibujar a tamaño completo y en
+# base64 en cada respuesta. En su lugar se rasteriza una sola vez, a
+# resolución de pantalla y sin pasar de IMAGE_MAX_WIDTH píxeles de ancho, en
+# el proceso que analiza la práctica; lo que vuelve de él, y lo que guardan
+# las cachés, son los bytes de la imagen y no la figura.
+
+IMAGE_DPI = 100          # resolución de pantalla
+IMAGE_MAX_WIDTH = 960    # px; las figuras de 10-12 pulgadas se reducen un poco
+
+_image_format = None
+
+def image_format():
+    """'webp' (sin pérdida: líneas nítidas y 2-3 veces menos que PNG) si Pillow lo admite; si no, 'png'"""
+    global _image_format
+    if _image_format is None:
+        try:
+            from PIL import features
+            _image_format = 'webp' if features.check('webp') else 'png'
+        except Exception:
+            _image_format = 'png'
+    return _image_format
+
+def render_figure_image(fig, fmt=None, max_width=IMAGE_MAX_WIDTH):
+    """Bytes de la figura en WebP/PNG a resolución de pantalla; se dibuja una sola vez por formato"""
+    fmt = fmt or image_format()
+    images = fig.__dict__.setdefault('_images', {})
+    key = (fmt, max_width)
+    if key not in images:
+        with span('figura.imagen', formato=fmt):
+            dpi = min(IMAGE_DPI, max_width / fig.get_size_inches()[0])
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight',
+                        pil_kwargs={'lossless': True} if fmt == 'webp' else None)
+            images[key] = buffer.getvalue()
+    return images[key]
+
+def figures_to_images(results, fmt=None):
+    """Copia de un dict de resultados con cada figura cambiada por los bytes de su imagen (y liberada)"""
+    images = {}
+    for key, value in results.items():
+        if is_figure(value):
+            images[key] = render_figure_image(value, fmt)
+            release_figure(value)
+        else:
+            images[key] = value
+    return images
+
+class _RenderingProcessor:
+    # Se envía al proceso de trabajo en lugar del procesador: hay que poder
+    # serializarlo, y conserva su __name__ para las trazas y las métricas
+    def __init__(self, processor):
+        self.processor = processor
+        self.__name__ = processor.__name__
+
+    def __call__(self, *args):
+        return figures_to_images(self.processor(*args))
+
+def with_figure_images(processor):
+    """process_practicaN que devuelve sus figuras ya rasterizadas (bytes), en el proceso que la ejecuta"""
+    return _RenderingProcessor(processor)
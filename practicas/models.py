@@ -0,0 +1,251 @@
+"""
+Modelos matemáticos (sigmoide, rectas) y motor de validación de las respuestas.
+"""
+
+import numpy as np
+
+# ============================================================================
+# FUNCIONES MATEMÁTICAS
+# ============================================================================
+
+def sigmoid(x, xmid, scal):
+    """Función sigmoide: 100 / (1 + exp(-(x - xmid) * scal))"""
+    return 100 / (1 + np.exp(-(x - xmid) * scal))
+
+def calculate_potencial_50(xmid, scal):
+    """Calcula el potencial osmótico al 50% de plasmólisis"""
+    return round((np.log((100 - 50) / 50) / scal) + xmid, 2)
+
+def fit_sigmoid_batch(x, y, present=None, max_iter=200, ftol=1e-15, xtol=1e-10):
+    """Ajusta sigmoid(x, xmid, scal) a N series a la vez con Levenberg-Marquardt.
+
+    x e y son matrices (N, n) (o vectores para una sola serie); `present`
+    marca los puntos válidos, y los NaN se descartan igualmente. Parte de la
+    linealización logit(y/100) = scal * (x - xmid) y usa el jacobiano
+    analítico. Devuelve un dict de vectores (N,): 'xmid', 'scal', 'sse',
+    'iterations', 'converged' y 'potencial_50'.
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    mask = np.isfinite(x) & np.isfinite(y)
+    if present is not None:
+        mask &= np.atleast_2d(np.asarray(present, dtype=bool))
+    w = mask.astype(float)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    count = w.sum(axis=1)
+    
+    # Arranque: recta ponderada sobre logit(y/100), con pesos p(1-p)
+    p = np.clip(y / 100, 0.01, 0.99)
+    z = np.log(p / (1 - p))
+    wz = w * p * (1 - p)
+    sw = wz.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mx = (wz * x).sum(axis=1) / sw
+        mz = (wz * z).sum(axis=1) / sw
+        sxx = (wz * (x - mx[:, None]) ** 2).sum(axis=1)
+        slope = (wz * (x - mx[:, None]) * (z - mz[:, None])).sum(axis=1) / sxx
+        xmid = mx - mz / slope
+    # Sin arranque útil: el mismo punto de partida que curve_fit en la app
+    median = np.array([np.median(row[m]) if m.any() else 0.0 for row, m in zip(x, mask)])
+    bad = ~(np.isfinite(slope) & np.isfinite(xmid)) | (slope == 0)
+    xmid = np.where(bad, median, xmid)
+    scal = np.where(bad, 1.0, slope)
+    
+    from scipy.special import expit
+    
+    def residuals(xmid, scal):
+        s = expit((x - xmid[:, None]) * scal[:, None])
+        return w * (y - 100 * s), s
+    
+    r, s = residuals(xmid, scal)
+    sse = (r ** 2).sum(axis=1)
+    lam = np.full(len(x), 1e-3)
+    iterations = np.zeros(len(x), dtype=int)
+    converged = count < 2
+    for _ in range(max_iter):
+        active = ~converged
+        if not active.any():
+            break
+        # Jacobiano analítico de f = 100 s: df/dxmid = -100 s(1-s) scal, df/dscal = 100 s(1-s) (x - xmid)
+        ds = w * 100 * s * (1 - s)
+        j1 = -ds * scal[:, None]
+        j2 = ds * (x - xmid[:, None])
+        a11, a12, a22 = (j1 * j1).sum(axis=1), (j1 * j2).sum(axis=1), (j2 * j2).sum(axis=1)
+        g1, g2 = (j1 * r).sum(axis=1), (j2 * r).sum(axis=1)
+        # Sistema 2x2 amortiguado (A + lambda diag(A)) delta = J^T r, resuelto en forma cerrada
+        b11, b22 = a11 * (1 + lam), a22 * (1 + lam)
+        det = b11 * b22 - a12 * a12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d1 = (b22 * g1 - a12 * g2) / det
+            d2 = (b11 * g2 - a12 * g1) / det
+        step_ok = active & np.isfinite(d1) & np.isfinite(d2)
+        new_xmid = np.where(step_ok, xmid + d1, xmid)
+        new_scal = np.where(step_ok, scal + d2, scal)
+        new_r, new_s = residuals(new_xmid, new_scal)
+        new_sse = (new_r ** 2).sum(axis=1)
+        better = step_ok & (new_sse <= sse)
+        iterations += active
+        # Convergencia: el paso o la mejora de la suma de cuadrados son despreciables
+        small_step = (np.abs(d1) <= xtol * (np.abs(xmid) + xtol)) & (np.abs(d2) <= xtol * (np.abs(scal) + xtol))
+        done = better & (small_step | ((sse - new_sse) <= ftol * np.maximum(sse, 1e-300)))
+        done |= active & ~step_ok
+        done |= active & ~better & (lam > 1e12)
+        xmid = np.where(better, new_xmid, xmid)
+        scal = np.where(better, new_scal, scal)
+        r = np.where(better[:, None], new_r, r)
+        s = np.where(better[:, None], new_s, s)
+        sse = np.where(better, new_sse, sse)
+        lam = np.where(better, lam / 10, lam * 10)
+        converged |= done
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        potencial = np.round((np.log((100 - 50) / 50) / scal) + xmid, 2)
+    converged &= (count >= 2) & np.isfinite(xmid) & np.isfinite(scal)
+    return {'xmid': xmid, 'scal': scal, 'sse': sse, 'iterations': iterations,
+            'converged': converged, 'potencial_50': potencial}
+
+def fit_line_batch(x, y, present=None):
+    """Regresión lineal por mínimos cuadrados de N series a la vez, en forma cerrada.
+
+    x e y son matrices (N, n) (o vectores para una sola serie); las filas con
+    NaN o marcadas como ausentes en `present` no cuentan. Devuelve un dict de
+    vectores (N,) con los mismos valores que scipy.stats.linregress ('slope',
+    'intercept', 'rvalue', 'stderr', 'intercept_stderr') más 'x_intercept'
+    (-intercept/slope, el Ψw de la patata) y 'n'. Las series sin variación en
+    x o con menos de 2 puntos dan NaN.
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    mask = np.isfinite(x) & np.isfinite(y)
+    if present is not None:
+        mask &= np.atleast_2d(np.asarray(present, dtype=bool))
+    n = mask.sum(axis=1)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xmean = x.sum(axis=1) / n
+        ymean = y.sum(axis=1) / n
+        # Como np.cov(x, y, bias=1) en linregress: producto matricial de las
+        # desviaciones por serie y luego por 1/n, para dar los mismos bits
+        dev = np.stack([np.where(mask, x - xmean[:, None], 0.0),
+                        np.where(mask, y - ymean[:, None], 0.0)], axis=1)
+        cov = np.matmul(dev, dev.transpose(0, 2, 1)) * (1 / n)[:, None, None]
+        ssxm, ssxym, ssym = cov[:, 0, 0], cov[:, 0, 1], cov[:, 1, 1]
+        
+        slope = np.where(ssxm > 0, ssxym / ssxm, np.nan)
+        intercept = ymean - slope * xmean
+        r = np.where((ssxm > 0) & (ssym > 0), ssxym / np.sqrt(ssxm * ssym), 0.0)
+        r = np.clip(r, -1.0, 1.0)
+        
+        df = n - 2
+        stderr = np.where(df > 0, np.sqrt(np.maximum(1 - r ** 2, 0) * ssym / ssxm / df), 0.0)
+        intercept_stderr = stderr * np.sqrt(ssxm + xmean ** 2)
+        x_intercept = -intercept / slope
+    
+    fit = {'slope': slope, 'intercept': intercept, 'rvalue': r, 'stderr': stderr,
+           'intercept_stderr': intercept_stderr, 'x_intercept': x_intercept, 'n': n}
+    invalid = (n < 2) | ~np.isfinite(slope)
+    for key in ('slope', 'intercept', 'rvalue', 'stderr', 'intercept_stderr', 'x_intercept'):
+        fit[key] = np.where(invalid, np.nan, fit[key])
+    return fit
+
+def fit_line(x, y):
+    """fit_line_batch para una sola serie: dict de escalares (error si no hay recta posible)"""
+    fit = {key: value[0] for key, value in fit_line_batch(x, y).items()}
+    if not np.isfinite(fit['slope']):
+        raise ValueError("No se puede calcular una regresión lineal: menos de 2 puntos o todos los valores de x iguales")
+    return fit
+
+def style_dataframe(df, validation_cols=[]):
+    """Aplica estilo a DataFrame con colores para validaciones"""
+    def highlight_row(row):
+        colors = []
+        for col in df.columns:
+            if col in validation_cols:
+                colors.append('background-color: #d4edda' if '✅' in str(row[col]) else 'background-color: #f8d7da')
+            else:
+                colors.append('')
+        return colors
+    return df.style.apply(highlight_row, axis=1)
+
+def validate_column(df, student_col, correct_col, tolerance=0.1):
+    """Valida si los cálculos del estudiante son correctos"""
+    return validation_labels(check_ratio(df[student_col], df[correct_col], tolerance))
+
+# ============================================================================
+# MOTOR DE VALIDACIÓN
+# ============================================================================
+# Comprobaciones como operaciones de NumPy sobre columnas completas. Todas
+# aceptan también un lote apilado (N estudiantes x n filas, ver stack_column):
+# la última dimensión son las filas de la tabla.
+
+VALID = '✅ Correcto'
+INVALID = '❌ Incorrecto'
+
+def check_ratio(student, correct, tolerance=0.1, zero_ok=True):
+    """Acierto si estudiante/correcto está en [1 - tolerancia, 1 + tolerancia].
+
+    Con zero_ok, 0 frente a 0 también es acierto (el cociente no está definido).
+    """
+    student = np.asarray(student, dtype=float)
+    correct = np.asarray(correct, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = student / correct
+    ok = (ratio >= 1 - tolerance) & (ratio <= 1 + tolerance)
+    if zero_ok:
+        ok |= (student == 0) & (correct == 0)
+    return ok
+
+def check_exact(student, expected):
+    """Acierto si cada valor coincide exactamente con el esperado (p.ej. orden de pigmentos)"""
+    student = np.asarray(student, dtype=object)
+    expected = np.asarray(expected, dtype=object)
+    return np.equal(student, expected).astype(bool)
+
+def check_non_increasing(values, present=None):
+    """Acierto por fila si no supera a la anterior ni queda por debajo de la siguiente.
+
+    `present` marca las filas reales de un lote con relleno; las que faltan
+    no cuentan como vecinas.
+    """
+    values = np.asarray(values, dtype=float)
+    present = np.ones(values.shape, dtype=bool) if present is None else np.asarray(present, dtype=bool)
+    pairs = (values[..., :-1] >= values[..., 1:]) | ~(present[..., :-1] & present[..., 1:])
+    ok = present.copy()
+    ok[..., :-1] &= pairs
+    ok[..., 1:] &= pairs
+    return ok
+
+def check_strictly_decreasing(values, first=None, present=None):
+    """Acierto por serie si es estrictamente decreciente (y empieza en `first`, si se indica)"""
+    values = np.asarray(values, dtype=float)
+    present = np.ones(values.shape, dtype=bool) if present is None else np.asarray(present, dtype=bool)
+    pairs = (values[..., 1:] < values[..., :-1]) | ~(present[..., :-1] & present[..., 1:])
+    ok = pairs.all(axis=-1)
+    if first is not None:
+        ok &= values[..., 0] == first
+    return ok
+
+def validation_labels(mask, ok=VALID, bad=INVALID):
+    """Convierte una máscara de aciertos en etiquetas ✅/❌ (listas anidadas para un lote)"""
+    return np.where(mask, ok, bad).tolist()
+
+def stack_column(frames, column, fill=np.nan):
+    """Apila una columna de varias tablas en una matriz (N, n_max) para validar o ajustar en lote.
+
+    Devuelve (valores, presentes): las tablas más cortas se rellenan con
+    `fill` y `presentes` marca las filas reales, que es lo que esperan las
+    comprobaciones de arriba y fit_sigmoid_batch / fit_line_batch (la pasada
+    de clase de batch_grading.py apila así las series de todos los libros).
+    """
+    columns = [np.asarray(df[column]) for df in frames]
+    width = max((len(c) for c in columns), default=0)
+    dtype = float if all(np.issubdtype(c.dtype, np.number) for c in columns) else object
+    values = np.full((len(columns), width), fill, dtype=dtype)
+    present = np.zeros((len(columns), width), dtype=bool)
+    for i, col in enumerate(columns):
+        values[i, :len(col)] = col
+        present[i, :len(col)] = True
+    return values, present
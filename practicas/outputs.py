@@ -0,0 +1,128 @@
+"""
+Salidas de cada práctica para los frontends: tablas, textos y figuras en orden.
+
+Son las mismas para la interfaz Gradio (app.py) y la de Streamlit.
+"""
+
+import pandas as pd
+
+def practica1_outputs(p1):
+    """Outputs 2-9: Práctica 1"""
+    # PRÁCTICA 1 - SACAROSA (2 outputs)
+    output_02_df_sac = p1.get('sacarosa', pd.DataFrame())
+    if output_02_df_sac.empty:
+        output_02_df_sac = pd.DataFrame({'ERROR': ['No se pudo leer la hoja Practica 1']})
+    output_03_sac_expl = p1.get('sacarosa_expl', '')
+    
+    # PRÁCTICA 1 - CEBOLLA (3 outputs)
+    output_04_df_onion = p1.get('onion', pd.DataFrame())
+    if output_04_df_onion.empty:
+        output_04_df_onion = pd.DataFrame({'ERROR': ['No se pudieron leer datos de cebolla']})
+    output_05_fig_onion = p1.get('onion_fig', None)
+    output_06_onion_expl = p1.get('onion_expl', '')
+    
+    # PRÁCTICA 1 - PATATA (3 outputs)
+    output_07_df_potato = p1.get('potato', pd.DataFrame())
+    if output_07_df_potato.empty:
+        output_07_df_potato = pd.DataFrame({'ERROR': ['No se pudieron leer datos de patata']})
+    output_08_fig_potato = p1.get('potato_fig', None)
+    output_09_potato_expl = p1.get('potato_expl', '')
+    
+    return [output_02_df_sac, output_03_sac_expl,
+            output_04_df_onion, output_05_fig_onion, output_06_onion_expl,
+            output_07_df_potato, output_08_fig_potato, output_09_potato_expl]
+
+def practica2_outputs(p2):
+    """Outputs 10-16: Práctica 2"""
+    # PRÁCTICA 2 - MAÍZ (3 outputs)
+    output_10_df_corn = p2.get('corn', pd.DataFrame())
+    if output_10_df_corn.empty:
+        output_10_df_corn = pd.DataFrame({'ERROR': ['No se pudieron leer datos de maíz']})
+    output_11_fig_corn = p2.get('corn_fig', None)
+    output_12_corn_expl = p2.get('corn_expl', '')
+    
+    # PRÁCTICA 2 - GUISANTE (4 outputs)
+    output_13_df_pea = p2.get('pea', pd.DataFrame())
+    if output_13_df_pea.empty:
+        output_13_df_pea = pd.DataFrame({'ERROR': ['No se pudieron leer datos de guisante']})
+    output_14_fig_pea1 = p2.get('pea_fig1', None)
+    output_15_fig_pea2 = p2.get('pea_fig2', None)
+    output_16_pea_expl = p2.get('pea_expl', '')
+    
+    return [output_10_df_corn, output_11_fig_corn, output_12_corn_expl,
+            output_13_df_pea, output_14_fig_pea1, output_15_fig_pea2, output_16_pea_expl]
+
+def practica3_outputs(p3):
+    """Outputs 17-22: Práctica 3"""
+    # PRÁCTICA 3 - CLOROFILA (2 outputs)
+    output_17_df_clor = p3.get('clorofila', pd.DataFrame())
+    if output_17_df_clor.empty:
+        output_17_df_clor = pd.DataFrame({'ERROR': ['No se pudieron leer datos de clorofila']})
+    output_18_clor_expl = p3.get('clor_expl', '')
+    
+    # PRÁCTICA 3 - CROMATOGRAFÍA (2 outputs)
+    output_19_df_croma = p3.get('cromatografia', pd.DataFrame())
+    if output_19_df_croma.empty:
+        output_19_df_croma = pd.DataFrame({'ERROR': ['No se pudieron leer datos de cromatografía']})
+    output_20_croma_expl = p3.get('croma_expl', '')
+    
+    # PRÁCTICA 3 - ANABAENA (2 outputs)
+    output_21_df_anabaena = p3.get('anabaena', pd.DataFrame())
+    if output_21_df_anabaena.empty:
+        output_21_df_anabaena = pd.DataFrame({'ERROR': ['No se pudieron leer datos de anabaena']})
+    output_22_anabaena_expl = p3.get('anabaena_expl', '')
+    
+    return [output_17_df_clor, output_18_clor_expl,
+            output_19_df_croma, output_20_croma_expl,
+            output_21_df_anabaena, output_22_anabaena_expl]
+
+def practica4_outputs(p4):
+    """Outputs 23-30: Práctica 4"""
+    # PRÁCTICA 4 - CLOROFILA HILL (2 outputs)
+    output_23_df_chl_hill = p4.get('chl_hill', pd.DataFrame())
+    if output_23_df_chl_hill.empty:
+        output_23_df_chl_hill = pd.DataFrame({'ERROR': ['No se pudieron leer datos de clorofila Hill']})
+    output_24_chl_hill_expl = p4.get('chl_hill_expl', '')
+    
+    # PRÁCTICA 4 - FERRICIANURO (2 outputs)
+    output_25_df_ferri = p4.get('ferricianuro', pd.DataFrame())
+    if output_25_df_ferri.empty:
+        output_25_df_ferri = pd.DataFrame({'ERROR': ['No se pudieron leer datos de ferricianuro']})
+    output_26_ferri_expl = p4.get('ferri_expl', '')
+    
+    # PRÁCTICA 4 - ACTIVIDAD FOTOSINTÉTICA (4 outputs)
+    output_27_df_hill = p4.get('hill', pd.DataFrame())
+    if output_27_df_hill.empty:
+        output_27_df_hill = pd.DataFrame({'ERROR': ['No se pudieron leer datos de Hill']})
+    output_28_fig_hill = p4.get('hill_fig', None)
+    output_29_df_foto = p4.get('fotosintesis', pd.DataFrame())
+    if output_29_df_foto.empty:
+        output_29_df_foto = pd.DataFrame({'ERROR': ['No se pudieron calcular actividades']})
+    output_30_foto_expl = p4.get('foto_expl', '')
+    
+    return [output_23_df_chl_hill, output_24_chl_hill_expl,
+            output_25_df_ferri, output_26_ferri_expl,
+            output_27_df_hill, output_28_fig_hill, output_29_df_foto, output_30_foto_expl]
+
+def practica5_outputs(p5):
+    """Outputs 31-34: Práctica 5"""
+    # PRÁCTICA 5 - GERMINACIÓN (1 output)
+    output_31_germ_text = p5.get('germ_expl', '')
+    
+    # PRÁCTICA 5 - AMILASA (3 outputs)
+    output_32_df_amil = p5.get('amilasa', pd.DataFrame())
+    if output_32_df_amil.empty:
+        output_32_df_amil = pd.DataFrame({'ERROR': ['No se pudieron leer datos de amilasa']})
+    output_33_fig_amil = p5.get('amilasa_fig', None)
+    output_34_amil_expl = p5.get('amilasa_expl', '')
+    
+    return [output_31_germ_text, output_32_df_amil, output_33_fig_amil, output_34_amil_expl]
+
+# Posición de los outputs de cada práctica dentro de los 35 (el 1 es el estado y el 35 el PDF)
+PRACTICA_OUTPUTS = {
+    1: (practica1_outputs, slice(1, 9)),
+    2: (practica2_outputs, slice(9, 16)),
+    3: (practica3_outputs, slice(16, 22)),
+    4: (practica4_outputs, slice(22, 30)),
+    5: (practica5_outputs, slice(30, 34)),
+}
@@ -0,0 +1,561 @@
+"""
+Análisis de las cinco prácticas.
+
+Cada process_practicaN(wb) recibe el libro ya abierto (workbook.ExcelWorkbook)
+y devuelve un diccionario con tablas, validaciones, figuras y explicaciones.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .tracing import span
+from .workbook import open_workbook
+from .models import (
+    INVALID, VALID, calculate_potencial_50, check_exact, check_non_increasing,
+    check_strictly_decreasing, fit_line, fit_sigmoid_batch, sigmoid, validate_column,
+    validation_labels,
+)
+from .figures import chart_data, create_figure
+from .texts import (
+    AMILASA_EXPL, ANABAENA_EXPL, CHL_HILL_EXPL_TEMPLATE, CLOROFILA_EXPL_TEMPLATE, CORN_EXPL, CROMA_EXPL,
+    FERRI_EXPL, FERRI_EXPL_PDF, FOTO_ERROR_EXPL, FOTO_EXPL_PDF_TEMPLATE, FOTO_EXPL_TEMPLATE, GERM_EXPL_TEMPLATE,
+    ONION_EXPL_TEMPLATE, PEA_EXPL, POTATO_EXPL_TEMPLATE, SACAROSA_EXPL,
+)
+
+# ============================================================================
+# PRÁCTICA 1: POTENCIAL OSMÓTICO Y HÍDRICO
+# ============================================================================
+
+def process_practica1(wb):
+    """Procesa toda la Práctica 1: sacarosa, cebolla y patata"""
+    results = {}
+    wb = open_workbook(wb)
+    
+    try:
+        # 1. SACAROSA
+        df_sac = wb.block("Practica 1", 'sacarosa')
+        df_sac['Ψ correcto (MPa)'] = round(-df_sac['Concentración (M)'] * 0.008314 * 295, 2)
+        df_sac['Validación'] = validate_column(df_sac, 'Ψ estudiante (MPa)', 'Ψ correcto (MPa)')
+        results['sacarosa'] = df_sac
+        results['sacarosa_expl'] = SACAROSA_EXPL
+        
+        # 2. CEBOLLA
+        df_onion = wb.block("Practica 1", 'onion').dropna()
+        
+        # Validar plasmólisis decreciente
+        df_onion['Val. Orden'] = validation_labels(check_non_increasing(df_onion['% plasmólisis']), '✅', '❌')
+        
+        # Modelo sigmoide
+        try:
+            x = df_onion['Ψπ (MPa)'].values
+            y = df_onion['% plasmólisis'].values
+            # Mismo ajuste que en la corrección por lotes (serie única)
+            with span('ajuste.sigmoide', serie='cebolla', puntos=len(x)) as s:
+                fit = fit_sigmoid_batch(x, y)
+                if fit['converged'][0]:
+                    xmid, scal = fit['xmid'][0], fit['scal'][0]
+                else:
+                    from scipy.optimize import curve_fit
+                    params, _ = curve_fit(sigmoid, x, y, p0=[np.median(x), 1], maxfev=5000)
+                    xmid, scal = params
+                s.set(iteraciones=fit['iterations'][0], convergido=fit['converged'][0],
+                      metodo='LM' if fit['converged'][0] else 'curve_fit')
+            potencial_osm = calculate_potencial_50(xmid, scal)
+            x_range = np.linspace(x.min(), x.max(), 200)
+            onion_chart = chart_data('Plasmólisis en células de cebolla', 'Potencial osmótico (MPa)', 'Porcentaje de plasmólisis (%)', [
+                {'kind': 'scatter', 'x': x, 'y': y, 'color': '#2ecc71', 'label': 'Datos'},
+                {'kind': 'line', 'x': x_range, 'y': sigmoid(x_range, xmid, scal), 'color': 'blue', 'label': 'Modelo sigmoide'},
+                {'kind': 'hline', 'y': 50, 'color': 'gray', 'dash': '--', 'label': '50% plasmólisis'},
+                {'kind': 'vline', 'x': potencial_osm, 'color': 'red', 'dash': ':', 'label': f'Ψπ = {potencial_osm} MPa'},
+            ])
+            
+            with span('figura', nombre='onion_fig'):
+                fig_onion, ax = create_figure(figsize=onion_chart['size'])
+                ax.scatter(x, y, s=80, alpha=0.7, color='#2ecc71', edgecolors='black', linewidths=2, label='Datos', zorder=3)
+                ax.plot(x_range, sigmoid(x_range, xmid, scal), 'b-', linewidth=3, label='Modelo sigmoide', zorder=2)
+                ax.axhline(y=50, color='gray', linestyle='--', linewidth=2, alpha=0.6, label='50% plasmólisis', zorder=1)
+                ax.axvline(x=potencial_osm, color='red', linestyle=':', linewidth=2.5, alpha=0.8, label=f'Ψπ = {potencial_osm} MPa', zorder=1)
+                ax.set_xlabel(onion_chart['xlabel'], fontsize=14, fontweight='bold')
+                ax.set_ylabel(onion_chart['ylabel'], fontsize=14, fontweight='bold')
+                ax.set_title(onion_chart['title'], fontsize=16, fontweight='bold', pad=20)
+                ax.legend(fontsize=12, frameon=True, shadow=True)
+                ax.grid(True, alpha=0.3, linestyle='--')
+                fig_onion.tight_layout()
+            
+            results['onion'] = df_onion
+            results['onion_fig'] = fig_onion
+            results['onion_chart'] = onion_chart
+            results['onion_pot'] = potencial_osm
+            results['onion_expl'] = ONION_EXPL_TEMPLATE.format(potencial_osm=potencial_osm, xmid=round(xmid, 3), scal=round(scal, 3))
+        except Exception as e:
+            results['onion_error'] = f"Error en modelo sigmoide: {e}"
+        
+        # 3. PATATA
+        df_potato = wb.block("Practica 1", 'potato')
+        df_potato['% Var correcto'] = round((df_potato['Peso final (g)'] - df_potato['Peso inicial (g)']) / df_potato['Peso inicial (g)'] * 100, 2)
+        df_potato['Validación'] = validate_column(df_potato, '% Var estudiante', '% Var correcto')
+        
+        # Regresión lineal
+        x = df_potato['Ψw (MPa)'].values
+        y = df_potato['% Var estudiante'].values
+        with span('ajuste.recta', serie='patata', puntos=len(x)) as s:
+            fit = fit_line(x, y)
+            s.set(r=fit['rvalue'], n=fit['n'])
+        slope, intercept = fit['slope'], fit['intercept']
+        hydric_pot = round(fit['x_intercept'], 2)
+        potato_chart = chart_data('Potencial hídrico en patata', 'Potencial hídrico (MPa)', 'Variación de peso (%)', [
+            {'kind': 'scatter', 'x': x, 'y': y, 'color': '#e74c3c', 'label': 'Datos'},
+            {'kind': 'line', 'x': x, 'y': slope * x + intercept, 'color': 'blue', 'label': 'Regresión lineal'},
+            {'kind': 'hline', 'y': 0, 'color': 'gray', 'dash': '--'},
+            {'kind': 'vline', 'x': hydric_pot, 'color': 'red', 'dash': ':', 'label': f'Ψw = {hydric_pot} MPa'},
+        ])
+        
+        with span('figura', nombre='potato_fig'):
+            fig_potato, ax = create_figure(figsize=potato_chart['size'])
+            ax.scatter(x, y, s=80, alpha=0.7, color='#e74c3c', edgecolors='black', linewidths=2, label='Datos', zorder=3)
+            ax.plot(x, slope * x + intercept, 'b-', linewidth=3, label='Regresión lineal', zorder=2)
+            ax.axhline(y=0, color='gray', linestyle='--', linewidth=2, alpha=0.6, zorder=1)
+            ax.axvline(x=hydric_pot, color='red', linestyle=':', linewidth=2.5, alpha=0.8, label=f'Ψw = {hydric_pot} MPa', zorder=1)
+            ax.set_xlabel(potato_chart['xlabel'], fontsize=14, fontweight='bold')
+            ax.set_ylabel(potato_chart['ylabel'], fontsize=14, fontweight='bold')
+            ax.set_title(potato_chart['title'], fontsize=16, fontweight='bold', pad=20)
+            ax.legend(fontsize=12, frameon=True, shadow=True)
+            ax.grid(True, alpha=0.3, linestyle='--')
+            fig_potato.tight_layout()
+        
+        results['potato'] = df_potato
+        results['potato_fig'] = fig_potato
+        results['potato_chart'] = potato_chart
+        results['potato_pot'] = hydric_pot
+        results['potato_expl'] = POTATO_EXPL_TEMPLATE.format(slope=round(slope, 3), intercept=round(intercept, 3), hydric_pot=hydric_pot)
+        
+    except Exception as e:
+        results['error'] = f"Error procesando Práctica 1: {e}"
+    
+    return results
+
+# ============================================================================
+# PRÁCTICA 2: AUXINAS Y ESTRÉS SALINO
+# ============================================================================
+
+def process_practica2(wb):
+    """Procesa Práctica 2: maíz (auxina) y guisante (NaCl)"""
+    results = {}
+    wb = open_workbook(wb)
+    
+    try:
+        # 1. MAÍZ - AUXINA (B8:F10 en R, cabecera en la fila 8)
+        # En R se lee horizontal y se transpone; el layout ya lo devuelve transpuesto
+        try:
+            df_corn_t = wb.block("Practica 2", 'corn')
+            df_corn_t['Variación(%) correcto'] = round((df_corn_t['Media longitud (mm)'].astype(float) - 10) / 10 * 100, 2)
+            df_corn_t['Validación'] = validate_column(df_corn_t, 'Variación(%) estudiante', 'Variación(%) correcto')
+            corn_colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12']
+            corn_chart = chart_data('Efecto de auxina en coleóptilos de maíz', 'Tratamiento', 'Variación (%)', [
+                {'kind': 'bar', 'values': df_corn_t['Variación(%) correcto'], 'colors': corn_colors, 'value_format': '{:.1f}%'},
+            ], categories=df_corn_t['Tratamiento'], label_rotation=15)
+            
+            with span('figura', nombre='corn_fig'):
+                fig_corn, ax = create_figure(figsize=corn_chart['size'])
+                x_pos = np.arange(len(df_corn_t))
+                bars = ax.bar(x_pos, df_corn_t['Variación(%) correcto'], color=corn_colors, edgecolor='black', linewidth=1.0)
+                ax.set_xticks(x_pos)
+                ax.set_xticklabels(df_corn_t['Tratamiento'], fontsize=12, rotation=15, ha='right')
+                ax.set_xlabel(corn_chart['xlabel'], fontsize=14, fontweight='bold')
+                ax.set_ylabel(corn_chart['ylabel'], fontsize=14, fontweight='bold')
+                ax.set_title(corn_chart['title'], fontsize=16, fontweight='bold', pad=20)
+                ax.grid(axis='y', alpha=0.3, linestyle='--')
+                for i, bar in enumerate(bars):
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height, f'{height:.1f}%', ha='center', va='bottom', fontweight='bold')
+                fig_corn.tight_layout()
+            
+            results['corn'] = df_corn_t
+            results['corn_fig'] = fig_corn
+            results['corn_chart'] = corn_chart
+        except Exception as e:
+            error_msg = f"Error en Maíz: {str(e)}"
+            print(f"  ✗ {error_msg}")
+            results['corn'] = pd.DataFrame()
+            results['corn_fig'] = None
+            results['corn_chart'] = None
+            results['corn_error'] = error_msg
+        
+        results['corn_expl'] = CORN_EXPL
+        
+        # 2. GUISANTE - ESTRÉS SALINO (H8:K14 en R, aquí H8:K15 con cabecera en la fila 8)
+        # En R también se transpone; el layout ya lo devuelve transpuesto
+        try:
+            df_pea_t = wb.block("Practica 2", 'pea')
+            # La primera columna contiene los nombres de tratamiento
+            df_pea_t = df_pea_t.drop(columns=df_pea_t.columns[0])
+            df_pea_t.insert(0, 'Concentración NaCl', df_pea_t.index.astype(str))
+            
+            # Calcular variación de peso
+            peso_seco = df_pea_t['Peso seco (g)'].astype(float)
+            peso_humedo = df_pea_t['Peso húmedo (g)'].astype(float)
+            df_pea_t['% Var correcto'] = round((peso_humedo - peso_seco) / peso_seco * 100, 2)
+            
+            # Gráfica de variación de peso
+            pea_chart1 = chart_data('Variación de peso en guisantes', 'Concentración NaCl', 'Variación peso (%)', [
+                {'kind': 'bar', 'values': df_pea_t['% Var correcto'], 'color': '#16a085'},
+            ], categories=df_pea_t['Concentración NaCl'], size=(8, 6), label_rotation=45)
+            with span('figura', nombre='pea_fig1'):
+                fig_pea1, ax = create_figure(figsize=pea_chart1['size'])
+                ax.bar(range(len(df_pea_t)), df_pea_t['% Var correcto'], color='#16a085', edgecolor='black', linewidth=1.0)
+                ax.set_xticks(range(len(df_pea_t)))
+                ax.set_xticklabels(df_pea_t['Concentración NaCl'], fontsize=11, rotation=45, ha='right')
+                ax.set_xlabel(pea_chart1['xlabel'], fontsize=13, fontweight='bold')
+                ax.set_ylabel(pea_chart1['ylabel'], fontsize=13, fontweight='bold')
+                ax.set_title(pea_chart1['title'], fontsize=15, fontweight='bold')
+                ax.grid(axis='y', alpha=0.3)
+                fig_pea1.tight_layout()
+            
+            # Gráfica de metabolismo (NBT, TFT)
+            pea_chart2 = None
+            with span('figura', nombre='pea_fig2'):
+                fig_pea2, ax = create_figure(figsize=(10, 6))
+                x_pos = np.arange(len(df_pea_t))
+                width = 0.25
+                try:
+                    pea_chart2 = chart_data('Actividad metabólica en guisantes', 'Concentración NaCl', 'Porcentaje (%)', [
+                        {'kind': 'bar', 'values': df_pea_t[column].astype(float), 'color': color, 'label': label}
+                        for column, label, color in (('% embriones TFT', 'TFT', '#3498db'),
+                                                     ('% cotiledones NBT+', 'NBT+', '#f39c12'),
+                                                     ('% cotiledones NBT++', 'NBT++', '#e74c3c'))
+                    ], categories=df_pea_t['Concentración NaCl'], size=(10, 6), label_rotation=45)
+                    ax.bar(x_pos - width, df_pea_t['% embriones TFT'].astype(float), width, label='TFT', color='#3498db', edgecolor='black')
+                    ax.bar(x_pos, df_pea_t['% cotiledones NBT+'].astype(float), width, label='NBT+', color='#f39c12', edgecolor='black')
+                    ax.bar(x_pos + width, df_pea_t['% cotiledones NBT++'].astype(float), width, label='NBT++', color='#e74c3c', edgecolor='black')
+                    ax.set_xticks(x_pos)
+                    ax.set_xticklabels(df_pea_t['Concentración NaCl'], fontsize=11, rotation=45, ha='right')
+                    ax.set_xlabel(pea_chart2['xlabel'], fontsize=13, fontweight='bold')
+                    ax.set_ylabel(pea_chart2['ylabel'], fontsize=13, fontweight='bold')
+                    ax.set_title(pea_chart2['title'], fontsize=15, fontweight='bold')
+                    ax.legend(fontsize=11)
+                    ax.grid(axis='y', alpha=0.3)
+                    fig_pea2.tight_layout()
+                except:
+                    pass
+            
+            results['pea'] = df_pea_t
+            results['pea_fig1'] = fig_pea1
+            results['pea_fig2'] = fig_pea2
+            results['pea_chart1'] = pea_chart1
+            results['pea_chart2'] = pea_chart2
+        except Exception as e:
+            error_msg = f"Error en Guisante: {str(e)}"
+            print(f"  ✗ {error_msg}")
+            results['pea'] = pd.DataFrame()
+            results['pea_fig1'] = None
+            results['pea_fig2'] = None
+            results['pea_chart1'] = None
+            results['pea_chart2'] = None
+            results['pea_error'] = error_msg
+        
+        results['pea_expl'] = PEA_EXPL
+        
+    except Exception as e:
+        results['error'] = f"Error procesando Práctica 2: {e}"
+    
+    return results
+
+# ============================================================================
+# PRÁCTICA 3: PIGMENTOS
+# ============================================================================
+
+def process_practica3(wb):
+    """Procesa Práctica 3: clorofilas y pigmentos"""
+    results = {}
+    wb = open_workbook(wb)
+    
+    try:
+        # 1. CLOROFILA
+        abs_val = wb.block("Practica 3", 'abs')
+        conc_student = wb.block("Practica 3", 'conc')
+        conc_g_student = wb.block("Practica 3", 'conc_g')
+        
+        conc_corr = round(abs_val / 76.07 * 50, 2)
+        conc_g_corr = round(conc_corr * 8 / 4, 2)
+        
+        df_clor = pd.DataFrame({
+            'Parámetro': ['ABS', 'Chla mg/mL', 'Chla mg/g'],
+            'Estudiante': [abs_val, conc_student, conc_g_student],
+            'Correcto': [abs_val, conc_corr, conc_g_corr]
+        })
+        df_clor['Validación'] = validate_column(df_clor, 'Estudiante', 'Correcto')
+        
+        results['clorofila'] = df_clor
+        results['clor_expl'] = CLOROFILA_EXPL_TEMPLATE.format(conc_corr=conc_corr, conc_g_corr=conc_g_corr)
+        
+        # 2. CROMATOGRAFÍA (B16:E22 en R, cabecera en la fila 16)
+        try:
+            df_croma = wb.block("Practica 3", 'cromatografia')
+            
+            # Añadir columna Pigmento si no existe
+            if len(df_croma.columns) < 5:
+                df_croma['Pigmento'] = [''] * len(df_croma)
+            else:
+                df_croma.columns = ['Banda', 'Distancia pigmento', 'Distancia disolvente', 'Rf', 'Pigmento']
+            
+            # Validar Rf decreciente
+            rf_correcto = check_strictly_decreasing(df_croma['Rf'], first=1)
+            df_croma['Val. Rf'] = VALID if rf_correcto else INVALID
+            
+            # Validar pigmentos (solo los que existen)
+            pigs_correct = ['β-caroteno', 'Clorofila a', 'Clorofila b', 'Luteina', 'Violaxantina', 'Neoxantina'][:len(df_croma)]
+            df_croma['Val. Pigmento'] = validation_labels(check_exact(df_croma['Pigmento'], pigs_correct), '✅', '❌')
+            
+            results['cromatografia'] = df_croma
+        except Exception as e:
+            error_msg = f"Error en Cromatografía: {str(e)}"
+            print(f"  ✗ {error_msg}")
+            results['cromatografia'] = pd.DataFrame()
+            results['croma_error'] = error_msg
+        
+        results['croma_expl'] = CROMA_EXPL
+        
+        # 3. ANABAENA (D27:D28 en R)
+        try:
+            abs_anabaena = wb.block("Practica 3", 'anabaena_abs')
+            pig_anabaena = wb.block("Practica 3", 'anabaena_pig')
+            
+            df_anabaena = pd.DataFrame({
+                'Resultado': ['Máximos absorción', 'Pigmento estudiante', 'Pigmento correcto'],
+                'Valores': [str(abs_anabaena), pig_anabaena, 'Ficocianina']
+            })
+            
+            results['anabaena'] = df_anabaena
+        except Exception as e:
+            error_msg = f"Error en Anabaena: {str(e)}"
+            print(f"  ✗ {error_msg}")
+            results['anabaena'] = pd.DataFrame()
+            results['anabaena_error'] = error_msg
+        
+        results['anabaena_expl'] = ANABAENA_EXPL
+        
+    except Exception as e:
+        results['error'] = f"Error procesando Práctica 3: {e}"
+    
+    return results
+
+# ============================================================================
+# PRÁCTICA 4: REACCIÓN DE HILL
+# ============================================================================
+
+def process_practica4(wb):
+    """Procesa Práctica 4: Reacción de Hill y fotosíntesis"""
+    results = {}
+    wb = open_workbook(wb)
+    
+    # Inicializar variables por defecto para evitar NameError en bloques posteriores
+    chl_corr_mg = 1.0  # Valor por defecto si falla la lectura
+    df_ferri = pd.DataFrame()  # DataFrame vacío por defecto
+    
+    # 1. CLOROFILA EN REACCIÓN
+    try:
+        abs_chl = wb.block("Practica 4", 'abs_chl')
+        chl_student_ml = wb.block("Practica 4", 'chl_ml')
+        chl_student_mg = wb.block("Practica 4", 'chl_mg')
+        
+        chl_corr_ml = round(abs_chl / 76.07 * 100, 2)
+        chl_corr_mg = round(chl_corr_ml * 0.5, 2)
+        
+        df_chl_hill = pd.DataFrame({
+            'Parámetro': ['ABS', 'Chla tilacoides mg/mL', 'mg Chla en reacción'],
+            'Estudiante': [abs_chl, chl_student_ml, chl_student_mg],
+            'Correcto': [abs_chl, chl_corr_ml, chl_corr_mg]
+        })
+        df_chl_hill['Validación'] = validate_column(df_chl_hill, 'Estudiante', 'Correcto')
+        
+        results['chl_hill'] = df_chl_hill
+        results['chl_hill_expl'] = CHL_HILL_EXPL_TEMPLATE.format(chl_corr_mg=chl_corr_mg)
+    except Exception as e:
+        print(f"  ✗ Error en Clorofila Hill: {e}")
+        results['chl_hill'] = pd.DataFrame()
+        results['chl_hill_expl'] = "Error al procesar datos de clorofila"
+    
+    # 2. FERRICIANURO
+    try:
+        df_ferri = wb.block("Practica 4", 'ferricianuro')
+        df_ferri['[Ferricianuro] correcto'] = round(df_ferri['Abs 420 nm'] * 4, 2)
+        df_ferri['Validación'] = validate_column(df_ferri, '[Ferricianuro] estudiante', '[Ferricianuro] correcto')
+        
+        results['ferricianuro'] = df_ferri
+        results['ferri_expl'] = FERRI_EXPL
+        
+        # Versión PDF (sin ecuaciones LaTeX, solo Unicode)
+        results['ferri_expl_pdf'] = FERRI_EXPL_PDF
+    except Exception as e:
+        print(f"  ✗ Error en Ferricianuro: {e}")
+        results['ferricianuro'] = pd.DataFrame()
+        results['ferri_expl'] = "Error al procesar datos de ferricianuro"
+        
+    # 3. ACTIVIDAD FOTOSINTÉTICA (B24:D27 sin cabecera, skiprows=23, nrows=4)
+    try:
+        df_hill = wb.block("Practica 4", 'hill')
+        
+        # Verificar que df_ferri tiene suficientes filas antes de usarlo
+        if len(df_ferri) >= 7:
+            # df_hill tiene 4 filas (tubos 4-7), necesitamos índices 3:7 de df_ferri (4 valores)
+            df_hill['Reducción corregido'] = np.round(df_ferri['[Ferricianuro] correcto'].iloc[3:7].values * 3.5 / chl_corr_mg, 2)
+        else:
+            print(f"  ⚠ Ferricianuro insuficiente ({len(df_ferri)} filas), usando valores por defecto")
+            df_hill['Reducción corregido'] = 0.0
+        
+        # Regresión lineal Hill
+        x_hill = df_hill['Tiempo (min)'].values
+        y_hill = df_hill['Reducción corregido'].values
+        with span('ajuste.recta', serie='hill', puntos=len(x_hill)) as s:
+            fit_hill = fit_line(x_hill, y_hill)
+            s.set(r=fit_hill['rvalue'], n=fit_hill['n'])
+        slope_hill, intercept_hill = fit_hill['slope'], fit_hill['intercept']
+        hill_chart = chart_data('Reacción de Hill - Reducción de Ferricianuro', 'Tiempo reacción (min)', 'µmol Fe³⁺CN · mg Chl⁻¹', [
+            {'kind': 'scatter', 'x': x_hill, 'y': y_hill, 'color': '#27ae60', 'label': 'Datos'},
+            {'kind': 'line', 'x': x_hill, 'y': slope_hill * x_hill + intercept_hill, 'color': 'blue', 'label': 'Regresión lineal'},
+        ])
+        
+        with span('figura', nombre='hill_fig'):
+            fig_hill, ax = create_figure(figsize=hill_chart['size'])
+            ax.scatter(x_hill, y_hill, s=100, alpha=0.7, color='#27ae60', edgecolors='black', linewidths=2, label='Datos', zorder=3)
+            ax.plot(x_hill, slope_hill * x_hill + intercept_hill, 'b-', linewidth=3, label='Regresión lineal', zorder=2)
+            ax.set_xlabel(hill_chart['xlabel'], fontsize=14, fontweight='bold')
+            ax.set_ylabel(hill_chart['ylabel'], fontsize=14, fontweight='bold')
+            ax.set_title(hill_chart['title'], fontsize=16, fontweight='bold', pad=20)
+            ax.legend(fontsize=12, frameon=True, shadow=True)
+            ax.grid(True, alpha=0.3, linestyle='--')
+            fig_hill.tight_layout()
+        
+        # Calcular actividades
+        vel_min = abs(round(slope_hill, 2))
+        vel_hora = round(vel_min * 60, 2)
+        vel_o2 = round(vel_hora / 4, 2)
+        
+        # Calcular actividad DCMU solo si df_ferri tiene suficientes datos
+        if len(df_ferri) >= 8:
+            dcmu_activity = round((df_ferri['[Ferricianuro] correcto'].iloc[3] - df_ferri['[Ferricianuro] correcto'].iloc[7]) * 3.5 * 4 / chl_corr_mg, 2)
+        else:
+            dcmu_activity = 0.0
+        
+        df_foto = pd.DataFrame({
+            'Parámetro': [
+                'Velocidad Hill (µmol Fe³⁺CN · mg Chl⁻¹ · min⁻¹)', 
+                'Actividad FSII (µmol Fe³⁺CN · mg Chl⁻¹ · h⁻¹)', 
+                'Liberación O₂ (µmol O₂ · mg Chl⁻¹ · h⁻¹)', 
+                'Actividad FSII+DCMU (µmol Fe³⁺CN · mg Chl⁻¹ · min⁻¹)'
+            ],
+            'Valor': [vel_min, vel_hora, vel_o2, dcmu_activity]
+        })
+        
+        results['hill'] = df_hill
+        results['hill_fig'] = fig_hill
+        results['hill_chart'] = hill_chart
+        results['fotosintesis'] = df_foto
+        
+        # Generar explicación con los valores calculados (versión DASHBOARD con LaTeX)
+        foto_values = dict(chl_corr_mg=chl_corr_mg, vel_min=vel_min, vel_hora=vel_hora, vel_o2=vel_o2,
+                           dcmu_activity=dcmu_activity)
+        results['foto_expl'] = FOTO_EXPL_TEMPLATE.format(**foto_values)
+        
+        # Versión PDF (sin ecuaciones LaTeX, solo Unicode)
+        results['foto_expl_pdf'] = FOTO_EXPL_PDF_TEMPLATE.format(**foto_values)
+        
+    except Exception as e:
+        error_msg = f"Error en Hill/Fotosíntesis: {str(e)}"
+        print(f"  ✗ {error_msg}")
+        results['hill'] = pd.DataFrame()
+        results['hill_fig'] = None
+        results['hill_chart'] = None
+        results['fotosintesis'] = pd.DataFrame()
+        results['hill_error'] = error_msg
+        # Explicación genérica si falla el procesamiento
+        results['foto_expl'] = FOTO_ERROR_EXPL
+    
+    return results
+
+# ============================================================================
+# PRÁCTICA 5: α-AMILASA
+# ============================================================================
+
+def process_practica5(wb):
+    """Procesa Práctica 5: Germinación y α-amilasa"""
+    results = {}
+    wb = open_workbook(wb)
+    
+    try:
+        # 1. GERMINACIÓN
+        germinacion = wb.block("Practica 5", 'germinacion')
+        results['germinacion'] = germinacion
+        results['germ_expl'] = GERM_EXPL_TEMPLATE.format(germinacion=germinacion)
+        
+        # 2. α-AMILASA (B10:I15 en R, aquí B11:I15 saltando encabezado)
+        try:
+            # Estructura real: Número, Tipo semilla, Tratamiento, Peso seco, Abs t=0, Abs t=10, Almidón deg/h, Actividad
+            # (el layout ya convierte a número las columnas numéricas por si hay strings)
+            df_amil = wb.block("Practica 5", 'amilasa')
+            
+            # Calcular valores corregidos
+            df_amil['Almidón deg/h correcto'] = np.round((df_amil['Abs t=0'] - df_amil['Abs t=10']) / 11.4 * 7 * 6, 2)
+            mg_semillas_reaccion = df_amil['Peso seco (mg)'] / 10 * 0.25
+            df_amil['Actividad corregida'] = np.round(df_amil['Almidón deg/h correcto'] / mg_semillas_reaccion, 2)
+            
+            df_amil['Val. Almidón'] = validate_column(df_amil, 'Almidón deg/h estudiante', 'Almidón deg/h correcto')
+            df_amil['Val. Actividad'] = validate_column(df_amil, 'Actividad estudiante', 'Actividad corregida')
+            
+            # Gráfica
+            colors_amil = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6']
+            amilasa_chart = chart_data('Inducción de actividad α-amilasa en cebada', 'Tratamiento', 'Actividad α-amilasa (mg almidón·mg semilla⁻¹·h⁻¹)', [
+                {'kind': 'bar', 'values': df_amil['Actividad corregida'], 'colors': colors_amil, 'value_format': '{:.2f}'},
+            ], categories=df_amil['Tratamiento'], size=(12, 7), label_rotation=20)
+            with span('figura', nombre='amilasa_fig'):
+                fig_amil, ax = create_figure(figsize=amilasa_chart['size'])
+                x_pos = np.arange(len(df_amil))
+                bars = ax.bar(x_pos, df_amil['Actividad corregida'], color=colors_amil, edgecolor='black', linewidth=1.0)
+                ax.set_xticks(x_pos)
+                ax.set_xticklabels(df_amil['Tratamiento'], fontsize=12, rotation=20, ha='right')
+                ax.set_xlabel(amilasa_chart['xlabel'], fontsize=14, fontweight='bold')
+                ax.set_ylabel(amilasa_chart['ylabel'], fontsize=13, fontweight='bold')
+                ax.set_title(amilasa_chart['title'], fontsize=16, fontweight='bold', pad=20)
+                ax.grid(axis='y', alpha=0.3, linestyle='--')
+                for i, bar in enumerate(bars):
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height, f'{height:.2f}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+                fig_amil.tight_layout()
+            
+            results['amilasa'] = df_amil
+            results['amilasa_fig'] = fig_amil
+            results['amilasa_chart'] = amilasa_chart
+        except Exception as e:
+            error_msg = f"Error en Amilasa: {str(e)}"
+            print(f"  ✗ {error_msg}")
+            results['amilasa'] = pd.DataFrame()
+            results['amilasa_fig'] = None
+            results['amilasa_chart'] = None
+            results['amilasa_error'] = error_msg
+        
+        results['amilasa_expl'] = AMILASA_EXPL
+        
+    except Exception as e:
+        results['error'] = f"Error procesando Práctica 5: {e}"
+    
+    return results
+
+# Procesador de cada práctica, en el orden del dashboard
+PRACTICA_PROCESSORS = {
+    1: process_practica1,
+    2: process_practica2,
+    3: process_practica3,
+    4: process_practica4,
+    5: process_practica5,
+}
+
+# Hoja de la que lee cada práctica (solo de esa)
+PRACTICA_SHEETS = {n: f"Practica {n}" for n in PRACTICA_PROCESSORS}
+
+def practica_digest(wb, n):
+    """Clave del resultado de process_practicaN(wb): el contenido de su hoja, no el del libro entero.
+
+    Al volver a subir un libro corregido, las prácticas cuya hoja no ha
+    cambiado dan la misma clave y su resultado se puede reutilizar.
+    """
+    return f"{n}:{wb.sheet_digest(PRACTICA_SHEETS[n])}"
@@ -0,0 +1,931 @@
+"""
+Informe PDF con ReportLab: ecuaciones, gráficas vectoriales y el documento.
+"""
+
+import functools
+import io
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+from reportlab.lib.units import cm
+
+from .tracing import span
+from .texts import EXPLANATION_TEMPLATES, STATIC_EXPLANATIONS
+
+# ============================================================================
+# ECUACIONES DEL PDF
+# ============================================================================
+
+EQUATION_PATTERN = re.compile(r'\$\$([^$]+)\$\$')
+
+@functools.lru_cache(maxsize=512)
+def render_equation_png(latex_code, fontsize=16, dpi=200):
+    """Renderiza una ecuación LaTeX (mathtext) a PNG; memoizado por fuente y ajustes.
+
+    Devuelve None si mathtext no puede interpretarla; el fallo también queda
+    en caché para no volver a parsear la misma fórmula en cada PDF.
+    """
+    try:
+        with span('pdf.ecuacion', caracteres=len(latex_code)):
+            from matplotlib.figure import Figure
+            # Figura sin pyplot: no se registra en el gestor global de figuras
+            fig = Figure(figsize=(10, 1.2))
+            ax = fig.add_subplot()
+            ax.axis('off')
+            ax.text(0.5, 0.5, f'${latex_code}$', fontsize=fontsize, ha='center', va='center',
+                    transform=ax.transAxes)
+            buf = io.BytesIO()
+            fig.savefig(buf, format='png', bbox_inches='tight', pad_inches=0.1, dpi=dpi,
+                        transparent=False, facecolor='white')
+            return buf.getvalue()
+    except Exception as e:
+        print(f"  ⚠ Error renderizando LaTeX: {e}")
+        return None
+
+class _BlankFields(dict):
+    """Rellena con '' los campos de una plantilla (solo interesan sus ecuaciones fijas)"""
+    def __missing__(self, key):
+        return ''
+
+def static_equations():
+    """Ecuaciones de los textos explicativos fijos y de las plantillas"""
+    texts = STATIC_EXPLANATIONS + [t.format_map(_BlankFields()) for t in EXPLANATION_TEMPLATES]
+    equations = []
+    for text in texts:
+        for match in EQUATION_PATTERN.finditer(text):
+            if match.group(1).strip() not in equations:
+                equations.append(match.group(1).strip())
+    return equations
+
+def warm_equation_cache():
+    """Pre-renderiza al arrancar todas las ecuaciones fijas del informe"""
+    for latex_code in static_equations():
+        render_equation_png(latex_code)
+    return render_equation_png.cache_info()
+
+# ============================================================================
+# GRÁFICAS VECTORIALES DEL PDF
+# ============================================================================
+# Las gráficas del PDF se dibujan con primitivas de ReportLab (vectoriales) a
+# partir de los datos que devuelve cada práctica (<nombre>_chart, ver
+# figures.chart_data): puntos, curva ajustada, rectas de referencia, barras,
+# etiquetas y leyenda. No se lee nada de la figura de matplotlib, así que da
+# igual su estado o que ya se haya liberado; y es más rápido que rasterizar,
+# ocupa menos y se imprime nítido.
+
+# DejaVu (la fuente de matplotlib) para que Ψ, α, µ, ⁻¹... salgan igual que en pantalla
+CHART_FONT = 'Helvetica'
+CHART_FONT_BOLD = 'Helvetica-Bold'
+_chart_fonts_registered = False
+
+def _register_chart_fonts():
+    global CHART_FONT, CHART_FONT_BOLD, _chart_fonts_registered
+    if _chart_fonts_registered:
+        return
+    import matplotlib
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    _chart_fonts_registered = True
+    font_dir = os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf')
+    try:
+        pdfmetrics.registerFont(TTFont('DejaVuSans', os.path.join(font_dir, 'DejaVuSans.ttf')))
+        pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', os.path.join(font_dir, 'DejaVuSans-Bold.ttf')))
+        CHART_FONT, CHART_FONT_BOLD = 'DejaVuSans', 'DejaVuSans-Bold'
+    except Exception as e:
+        print(f"  ⚠ Fuente DejaVu no disponible, se usa Helvetica: {e}")
+
+def _rl_color(rgba, alpha=None):
+    """Color de matplotlib (nombre, hex o RGBA) -> color de ReportLab (None si es transparente)"""
+    from matplotlib.colors import to_rgba
+    from reportlab.lib import colors
+    r, g, b, a = to_rgba(rgba, alpha)
+    if a == 0:
+        return None
+    return colors.Color(r, g, b, alpha=a)
+
+def _rl_dashes(linestyle, linewidth):
+    if linestyle in ('--', 'dashed'):
+        return [3.7 * linewidth, 1.6 * linewidth]
+    if linestyle in (':', 'dotted'):
+        return [1 * linewidth, 1.65 * linewidth]
+    if linestyle in ('-.', 'dashdot'):
+        return [6.4 * linewidth, 1.6 * linewidth, 1 * linewidth, 1.6 * linewidth]
+    return None
+
+def _chart_text(drawing, x, y, text, size, bold=False, color=None, anchor='middle', angle=0):
+    from reportlab.lib import colors
+    from reportlab.graphics.shapes import Group, String
+    font = CHART_FONT_BOLD if bold else CHART_FONT
+    label = String(0, 0, text, fontName=font, fontSize=size, fillColor=color or colors.black, textAnchor=anchor)
+    if angle:
+        rad = np.radians(angle)
+        drawing.add(Group(label, transform=(np.cos(rad), np.sin(rad), -np.sin(rad), np.cos(rad), x, y)))
+    else:
+        label.x, label.y = x, y
+        drawing.add(label)
+
+# Estilo de las gráficas del PDF (tamaños en puntos)
+CHART_TICK_SIZE = 7
+CHART_LABEL_SIZE = 8
+CHART_TITLE_SIZE = 9.5
+CHART_LEGEND_SIZE = 7
+CHART_MARGIN = 0.05      # margen de los datos dentro del eje, como en matplotlib
+CHART_LINE_WIDTH = 1.6
+CHART_POINT_RADIUS = 3
+
+# Esquinas para la leyenda, por orden de preferencia (como loc='best' en matplotlib)
+LEGEND_CORNERS = ('upper right', 'upper left', 'lower left', 'lower right')
+
+def _chart_limits(values, sticky_zero=False):
+    """Límites de un eje para estos valores, con margen; en las barras, el 0 queda en el borde"""
+    values = [v for v in values if v is not None and np.isfinite(v)]
+    lo, hi = (min(values), max(values)) if values else (0.0, 1.0)
+    if sticky_zero:
+        lo, hi = min(lo, 0.0), max(hi, 0.0)
+    if hi == lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    pad = (hi - lo) * CHART_MARGIN
+    return (lo if sticky_zero and lo == 0 else lo - pad), (hi if sticky_zero and hi == 0 else hi + pad)
+
+def _chart_ticks(lo, hi):
+    """Marcas en valores redondos entre lo y hi (el mismo localizador que usa matplotlib)"""
+    from matplotlib.ticker import MaxNLocator
+    eps = 1e-9 * (hi - lo)
+    return [float(t) for t in MaxNLocator(nbins=6, steps=[1, 2, 2.5, 5, 10]).tick_values(lo, hi)
+            if lo - eps <= t <= hi + eps]
+
+def _tick_labels(ticks):
+    """Textos de las marcas, con los decimales justos y el signo menos tipográfico"""
+    decimals = next((d for d in range(7) if all(abs(round(t, d) - t) < 1e-9 for t in ticks)), 6)
+    return [f"{round(t, decimals) + 0.0:.{decimals}f}".replace('-', '−') for t in ticks]
+
+def chart_to_drawing(chart, width=14*cm, max_height=9*cm):
+    """Dibuja una gráfica (datos de figures.chart_data) como Drawing vectorial de ReportLab"""
+    from reportlab.lib import colors
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.graphics.shapes import Drawing, Line, PolyLine, Rect, Circle
+    _register_chart_fonts()
+    fig_w, fig_h = chart['size']
+    height = width * fig_h / fig_w
+    if height > max_height:
+        width, height = max_height * fig_w / fig_h, max_height
+    d = Drawing(width, height)
+    series = chart['series']
+    bar_series = [s for s in series if s['kind'] == 'bar']
+    
+    # Rango de cada eje. Barras: una categoría por posición entera, agrupadas
+    # si hay varias series (0.25 de ancho cada una, como en las prácticas)
+    if bar_series:
+        categories = chart['categories'] or [str(i + 1) for i in range(len(bar_series[0]['values']))]
+        bar_width = 0.8 if len(bar_series) == 1 else 0.75 / len(bar_series)
+        half = bar_width * len(bar_series) / 2
+        x0, x1 = _chart_limits([-half, len(categories) - 1 + half])
+        y0, y1 = _chart_limits([v for s in bar_series for v in s['values']], sticky_zero=True)
+        if any(s.get('value_format') for s in bar_series):
+            y1 += (y1 - y0) * CHART_MARGIN  # sitio para el valor encima de la barra más alta
+        xticks, xlabels = list(range(len(categories))), categories
+        angle = chart.get('label_rotation', 0)
+    else:
+        x0, x1 = _chart_limits([v for s in series for v in (s['x'] if s['kind'] in ('scatter', 'line') else
+                                                            [s['x']] if s['kind'] == 'vline' else [])])
+        y0, y1 = _chart_limits([v for s in series for v in (s['y'] if s['kind'] in ('scatter', 'line') else
+                                                            [s['y']] if s['kind'] == 'hline' else [])])
+        xticks = _chart_ticks(x0, x1)
+        xlabels = _tick_labels(xticks)
+        angle = 0
+    yticks = _chart_ticks(y0, y1)
+    ylabels = _tick_labels(yticks)
+    
+    # Área del eje: lo que dejan libre el título, los nombres de los ejes y las marcas
+    tick, label_size = CHART_TICK_SIZE, CHART_LABEL_SIZE
+    ytick_width = max((stringWidth(t, CHART_FONT, tick) for t in ylabels), default=0)
+    if angle:
+        rad = np.radians(angle)
+        xtick_height = max((stringWidth(t, CHART_FONT, tick) * np.sin(rad) + tick * np.cos(rad) for t in xlabels), default=tick)
+        xtick_height = min(xtick_height, height * 0.3)
+    else:
+        xtick_height = tick
+    left = label_size * 1.6 + ytick_width + 5
+    bottom = label_size * 1.6 + xtick_height + 5
+    top = CHART_TITLE_SIZE * 2 if chart.get('title') else 6
+    pw, ph = width - left - 8, height - bottom - top
+    fx = lambda v: left + (v - x0) / (x1 - x0) * pw
+    fy = lambda v: bottom + (v - y0) / (y1 - y0) * ph
+    
+    # Rejilla: horizontal siempre, vertical solo en las gráficas x-y
+    grid = dict(strokeColor=colors.Color(0, 0, 0, alpha=0.15), strokeWidth=0.5, strokeDashArray=_rl_dashes('--', 0.8))
+    for t in yticks:
+        d.add(Line(left, fy(t), left + pw, fy(t), **grid))
+    if not bar_series:
+        for t in xticks:
+            d.add(Line(fx(t), bottom, fx(t), bottom + ph, **grid))
+    
+    # Barras (agrupadas si hay varias series) y su valor encima
+    obstacles = []  # rectángulos ocupados por los datos, para colocar la leyenda
+    for k, s in enumerate(bar_series):
+        offset = (k - (len(bar_series) - 1) / 2) * bar_width
+        bar_colors = s.get('colors') or [s.get('color', '#1f77b4')]
+        for i, value in enumerate(s['values']):
+            if value is None or not np.isfinite(value):
+                continue
+            bx0, bx1 = fx(i + offset - bar_width / 2), fx(i + offset + bar_width / 2)
+            by0, by1 = sorted((fy(0), fy(value)))
+            d.add(Rect(bx0, by0, bx1 - bx0, by1 - by0, fillColor=_rl_color(bar_colors[i % len(bar_colors)]),
+                       strokeColor=colors.black, strokeWidth=0.5))
+            obstacles.append((bx0, by0, bx1, by1))
+            if s.get('value_format'):
+                ty = by1 + 1.5 if value >= 0 else by0 - tick
+                _chart_text(d, (bx0 + bx1) / 2, ty, s['value_format'].format(value), tick, bold=True)
+    
+    # Rectas de referencia, curvas y rectas ajustadas, y puntos encima de todo
+    for s in series:
+        if s['kind'] not in ('hline', 'vline', 'line'):
+            continue
+        stroke = dict(strokeColor=_rl_color(s.get('color', 'black'), 0.8 if s['kind'] != 'line' else None),
+                      strokeWidth=CHART_LINE_WIDTH if s['kind'] == 'line' else 1,
+                      strokeDashArray=_rl_dashes(s.get('dash'), 1))
+        if s['kind'] == 'hline':
+            d.add(Line(left, fy(s['y']), left + pw, fy(s['y']), **stroke))
+        elif s['kind'] == 'vline':
+            d.add(Line(fx(s['x']), bottom, fx(s['x']), bottom + ph, **stroke))
+        else:
+            pairs = [(fx(x), fy(y)) for x, y in zip(s['x'], s['y']) if np.isfinite(x) and np.isfinite(y)]
+            if len(pairs) >= 2:
+                d.add(PolyLine([v for pair in pairs for v in pair], strokeLineCap=1, strokeLineJoin=1, **stroke))
+                obstacles.extend((px, py, px, py) for px, py in pairs[::max(1, len(pairs) // 25)])
+    for s in series:
+        if s['kind'] != 'scatter':
+            continue
+        for x, y in zip(s['x'], s['y']):
+            if np.isfinite(x) and np.isfinite(y):
+                d.add(Circle(fx(x), fy(y), CHART_POINT_RADIUS, fillColor=_rl_color(s.get('color', '#1f77b4'), 0.7),
+                             strokeColor=colors.black, strokeWidth=0.8))
+                obstacles.append((fx(x), fy(y), fx(x), fy(y)))
+    
+    # Marco, marcas de los ejes y sus textos
+    d.add(Rect(left, bottom, pw, ph, fillColor=None, strokeColor=colors.black, strokeWidth=0.6))
+    for t, text in zip(yticks, ylabels):
+        d.add(Line(left, fy(t), left - 2, fy(t), strokeWidth=0.5))
+        _chart_text(d, left - 3, fy(t) - tick * 0.35, text, tick, anchor='end')
+    for t, text in zip(xticks, xlabels):
+        d.add(Line(fx(t), bottom, fx(t), bottom - 2, strokeWidth=0.5))
+        if angle:
+            _chart_text(d, fx(t), bottom - 3 - tick * 0.6, text, tick, anchor='end', angle=angle)
+        else:
+            _chart_text(d, fx(t), bottom - 3 - tick, text, tick)
+    
+    # Título y nombres de los ejes
+    if chart.get('title'):
+        _chart_text(d, left + pw / 2, bottom + ph + CHART_TITLE_SIZE * 0.7, chart['title'], CHART_TITLE_SIZE, bold=True)
+    if chart.get('xlabel'):
+        _chart_text(d, left + pw / 2, label_size * 0.3, chart['xlabel'], label_size, bold=True)
+    if chart.get('ylabel'):
+        _chart_text(d, label_size * 1.1, bottom + ph / 2, chart['ylabel'], label_size, bold=True, angle=90)
+    
+    # Leyenda, en la esquina del eje que menos datos tapa
+    entries = [s for s in series if s.get('label')]
+    if entries:
+        size = CHART_LEGEND_SIZE
+        row = size * 1.5
+        box_w = max(stringWidth(s['label'], CHART_FONT, size) for s in entries) + size * 3.2
+        box_h = row * len(entries) + size * 0.5
+        corners = {
+            'upper right': (left + pw - box_w - 4, bottom + ph - box_h - 4),
+            'upper left': (left + 4, bottom + ph - box_h - 4),
+            'lower left': (left + 4, bottom + 4),
+            'lower right': (left + pw - box_w - 4, bottom + 4),
+        }
+        def covered(corner):
+            bx, by = corners[corner]
+            return sum(1 for ox0, oy0, ox1, oy1 in obstacles
+                       if ox0 <= bx + box_w and ox1 >= bx and oy0 <= by + box_h and oy1 >= by)
+        bx, by = corners[min(LEGEND_CORNERS, key=covered)]
+        d.add(Rect(bx, by, box_w, box_h, fillColor=colors.Color(1, 1, 1, alpha=0.85),
+                   strokeColor=colors.HexColor('#cccccc'), strokeWidth=0.5))
+        for i, s in enumerate(entries):
+            cy = by + box_h - size * 0.25 - row * (i + 0.5)
+            sx = bx + size * 0.4
+            if s['kind'] == 'bar':
+                d.add(Rect(sx, cy - size * 0.35, size * 1.8, size * 0.7, strokeColor=colors.black, strokeWidth=0.4,
+                           fillColor=_rl_color((s.get('colors') or [s.get('color', '#1f77b4')])[0])))
+            elif s['kind'] == 'scatter':
+                d.add(Circle(sx + size * 0.9, cy, size * 0.35, fillColor=_rl_color(s.get('color', '#1f77b4'), 0.7),
+                             strokeColor=colors.black, strokeWidth=0.5))
+            else:
+                lw = CHART_LINE_WIDTH if s['kind'] == 'line' else 1
+                d.add(Line(sx, cy, sx + size * 1.8, cy, strokeColor=_rl_color(s.get('color', 'black')),
+                           strokeWidth=lw, strokeDashArray=_rl_dashes(s.get('dash'), 1)))
+            _chart_text(d, sx + size * 2.3, cy - size * 0.35, s['label'], size, anchor='start')
+    
+    return d
+
+def generate_simple_pdf(results):
+    """Genera PDF completo con todas las tablas, figuras y resultados.
+
+    El documento se construye en memoria y se devuelven sus bytes; guardarlo
+    (almacén del dashboard, carpeta del lote...) es cosa de quien lo pide.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
+    
+    try:
+        pdf_buffer = io.BytesIO()
+        
+        doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, rightMargin=1.5*cm, leftMargin=1.5*cm, topMargin=1.5*cm, bottomMargin=1.5*cm)
+        
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=16, textColor=colors.HexColor('#1f4788'),
+                                     spaceAfter=12, alignment=TA_CENTER, fontName='Helvetica-Bold')
+        heading_style = ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontSize=12, textColor=colors.HexColor('#2c3e50'),
+                                       spaceAfter=8, spaceBefore=8, fontName='Helvetica-Bold')
+        small_style = ParagraphStyle('Small', parent=styles['Normal'], fontSize=8, spaceAfter=4)
+        
+        section = span('pdf.seccion', seccion='Cabecera')
+        story = []
+        story.append(Paragraph("INFORME DE PRÁCTICAS - FISIOLOGÍA VEGETAL", title_style))
+        story.append(Paragraph("Universidad Autónoma de Madrid (UAM)", small_style))
+        story.append(Paragraph(f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}", small_style))
+        story.append(Spacer(1, 0.3*cm))
+        
+        # Lista para mantener buffers abiertos hasta que se construya el PDF
+        image_buffers = []
+        
+        # Helper para agregar figuras (limitar altura máxima)
+        def add_figure(chart, width=14*cm, max_height=9*cm):
+            """Gráfica vectorial a partir de los datos de la práctica (<nombre>_chart)"""
+            if chart is not None:
+                try:
+                    with span('pdf.figura', modo='vectorial'):
+                        drawing = chart_to_drawing(chart, width, max_height)
+                        drawing.hAlign = 'CENTER'
+                        story.append(drawing)
+                        story.append(Spacer(1, 0.3*cm))
+                except Exception as e:
+                    print(f"  ⚠ Error añadiendo figura: {e}")
+                    story.append(Paragraph(f"[Figura no disponible: {str(e)}]", small_style))
+        
+        # Helper para renderizar ecuaciones LaTeX como imágenes
+        def latex_to_image(latex_code):
+            """Convierte una ecuación LaTeX a imagen PNG para insertar en PDF"""
+            png = render_equation_png(latex_code)
+            if png is None:
+                return None
+            buf = io.BytesIO(png)
+            
+            # Añadir a lista de buffers
+            image_buffers.append(buf)
+            
+            # Crear objeto Image de ReportLab más grande
+            return Image(buf, width=14*cm, height=1.5*cm, kind='proportional')
+        
+        # Helper para agregar texto simple (sin procesamiento LaTeX)
+        def add_text_simple(text):
+            """Añade texto al PDF sin procesar LaTeX, para textos que ya tienen Unicode correcto"""
+            if text:
+                try:
+                    import re
+                    text = str(text)
+                    
+                    # Solo convertir markdown **texto** a negrita
+                    text = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', text)
+                    
+                    # Limpiar espacios múltiples y saltos de línea
+                    text = re.sub(r'\n+', '\n', text)
+                    text = re.sub(r' +', ' ', text)
+                    text = text.strip()
+                    
+                    if len(text) > 1500:
+                        text = text[:1500] + '...'
+                    
+                    # Escapar XML (excepto tags <b>)
+                    if '&amp;' not in text:
+                        text = text.replace('&', '&amp;')
+                    text = re.sub(r'<(?!/?(b|i|u)>)', '&lt;', text)
+                    text = re.sub(r'(?<!</(b|i|u))>(?!)', '&gt;', text)
+                    
+                    if text:
+                        paragraphs = text.split('\n')
+                        for para in paragraphs:
+                            para = para.strip()
+                            if para:
+                                story.append(Paragraph(para, small_style))
+                        story.append(Spacer(1, 0.2*cm))
+                except Exception as e:
+                    print(f"  ⚠ Error añadiendo texto: {e}")
+        
+        # Helper para agregar texto explicativo con conversión LaTeX mejorada
+        def add_text(text):
+            if text:
+                try:
+                    import re
+                    text = str(text)
+
+                    
+                    # Eliminar etiquetas HTML
+                    text = re.sub(r'<span[^>]*>', '', text)
+                    text = re.sub(r'</span>', '', text)
+                    text = re.sub(r'<[^>]+>', '', text)
+                    
+                    # Extraer y procesar ecuaciones $$...$$
+                    parts = []
+                    last_end = 0
+                    
+                    for match in EQUATION_PATTERN.finditer(text):
+                        # Añadir texto antes de la ecuación
+                        if match.start() > last_end:
+                            text_before = text[last_end:match.start()].strip()
+                            if text_before:
+                                parts.append(('text', text_before))
+                        
+                        # Añadir la ecuación como imagen
+                        latex_eq = match.group(1).strip()
+                        parts.append(('equation', latex_eq))
+                        last_end = match.end()
+                    
+                    # Añadir texto restante
+                    if last_end < len(text):
+                        text_after = text[last_end:].strip()
+                        if text_after:
+                            parts.append(('text', text_after))
+                    
+                    # Si no hay ecuaciones, procesar como antes
+                    if not parts:
+                        parts = [('text', text)]
+                    
+                    # Procesar cada parte
+                    for part_type, content in parts:
+                        if part_type == 'equation':
+                            # Renderizar ecuación como imagen
+                            eq_img = latex_to_image(content)
+                            if eq_img:
+                                story.append(eq_img)
+                                story.append(Spacer(1, 0.1*cm))
+                        else:
+                            # Procesar texto normal (puede venir con Unicode o LaTeX)
+                            # 1. Convertir markdown **texto** a negrita
+                            content = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', content)
+                            
+                            # 2. Solo convertir símbolos LaTeX si existen (el texto puede venir ya con Unicode)
+                            if '\\' in content:
+                                latex_map = {
+                                    '\\mu': 'μ', '\\alpha': 'α', '\\beta': 'β', 
+                                    '\\gamma': 'γ', '\\delta': 'δ', '\\sigma': 'σ',
+                                    '\\Psi': 'Ψ', '\\Delta': 'Δ', '\\pi': 'π',
+                                    '\\cdot': '·', '\\times': '×',
+                                }
+                                
+                                for latex, unicode_char in latex_map.items():
+                                    content = content.replace(latex, unicode_char)
+                                
+                                # Limpiar comandos LaTeX \text{...}
+                                content = re.sub(r'\\text\{([^}]*)\}', r'\1', content)
+                                content = re.sub(r'\\color\{[^}]+\}\{([^}]*)\}', r'\1', content)
+                                
+                                # Limpiar comandos LaTeX restantes
+                                content = re.sub(r'\\[a-zA-Z]+', '', content)
+                                content = content.replace('\\', '')
+                            
+                            # 3. Solo procesar super/subíndices LaTeX si hay ^ o _ seguidos de llaves
+                            if '^{' in content or '_{' in content:
+                                # Superíndices con llaves: ^{...}
+                                def convert_superscript(match):
+                                    text = match.group(1)
+                                    result = ''
+                                    for char in text:
+                                        if char == '-':
+                                            result += '⁻'
+                                        elif char == '+':
+                                            result += '⁺'
+                                        elif char.isdigit():
+                                            digit_map = {'0':'⁰','1':'¹','2':'²','3':'³','4':'⁴','5':'⁵','6':'⁶','7':'⁷','8':'⁸','9':'⁹'}
+                                            result += digit_map.get(char, char)
+                                        else:
+                                            result += char
+                                    return result
+                                
+                                content = re.sub(r'\^{([^}]+)}', convert_superscript, content)
+                                
+                                # Subíndices con llaves: _{...}
+                                def convert_subscript(match):
+                                    text = match.group(1)
+                                    result = ''
+                                    for char in text:
+                                        if char.isdigit():
+                                            sub_map = {'0':'₀','1':'₁','2':'₂','3':'₃','4':'₄','5':'₅','6':'₆','7':'₇','8':'₈','9':'₉'}
+                                            result += sub_map.get(char, char)
+                                        elif char.isalpha():
+                                            sub_alpha = {'s':'ₛ','w':'ᵥᵥ','p':'ₚ','h':'ₕ','a':'ₐ','e':'ₑ','i':'ᵢ','o':'ₒ','u':'ᵤ'}
+                                            result += sub_alpha.get(char, char)
+                                        else:
+                                            result += char
+                                    return result
+                                
+                                content = re.sub(r'_{([^}]+)}', convert_subscript, content)
+                                
+                                # Limpiar llaves restantes
+                                content = content.replace('{', '').replace('}', '')
+                            
+                            # 4. Procesar super/subíndices simples sin llaves solo si existen
+                            if '^' in content or '_' in content:
+                                # Superíndices simples
+                                content = content.replace('^-1', '⁻¹').replace('^-2', '⁻²').replace('^-3', '⁻³')
+                                content = content.replace('^1', '¹').replace('^2', '²').replace('^3', '³').replace('^4', '⁴')
+                                # Subíndices simples
+                                content = content.replace('_s', 'ₛ').replace('_w', 'ᵥᵥ').replace('_p', 'ₚ').replace('_h', 'ₕ')
+                                content = content.replace('_2', '₂').replace('_0', '₀')
+
+                            
+                            # Limpiar espacios
+                            content = re.sub(r'\n+', '\n', content)
+                            content = re.sub(r' +', ' ', content)
+                            content = content.strip()
+                            
+                            if len(content) > 1500:
+                                content = content[:1500] + '...'
+                            
+                            # Escapar XML (excepto tags <b>)
+                            if '&amp;' not in content:
+                                content = content.replace('&', '&amp;')
+                            # No escapar < y > que son parte de <b> y </b>
+                            content = re.sub(r'<(?!/?(b|i|u)>)', '&lt;', content)
+                            content = re.sub(r'(?<!</(b|i|u))>(?!)', '&gt;', content)
+                            
+                            if content:
+                                paragraphs = content.split('\n')
+                                for para in paragraphs:
+                                    para = para.strip()
+                                    if para:
+                                        story.append(Paragraph(para, small_style))
+                                story.append(Spacer(1, 0.2*cm))
+                                
+                except Exception as e:
+                    print(f"  ⚠ Error añadiendo texto: {e}")
+        
+        # Helper para limpiar texto LaTeX en celdas de tabla
+        def clean_latex(text):
+            """Limpia símbolos LaTeX en texto de tablas"""
+            if not isinstance(text, str):
+                return text
+            
+            import re
+            
+            # Convertir símbolos LaTeX PRIMERO
+            latex_map = {
+                '\\mu': 'μ', '\\alpha': 'α', '\\beta': 'β', 
+                '\\gamma': 'γ', '\\delta': 'δ', '\\sigma': 'σ',
+                '\\Psi': 'Ψ', '\\Delta': 'Δ', '\\pi': 'π',
+                '\\cdot': '·', '\\times': '×',
+            }
+            
+            for latex, unicode_char in latex_map.items():
+                text = text.replace(latex, unicode_char)
+            
+            # Limpiar \text{...}
+            text = re.sub(r'\\text\{([^}]*)\}', r'\1', text)
+            
+            # Convertir superíndices con llaves ANTES de limpiar llaves
+            def convert_super(m):
+                t = m.group(1)
+                result = ''
+                for c in t:
+                    if c == '-': result += '⁻'
+                    elif c == '+': result += '⁺'
+                    elif c.isdigit():
+                        result += {'0':'⁰','1':'¹','2':'²','3':'³','4':'⁴','5':'⁵','6':'⁶','7':'⁷','8':'⁸','9':'⁹'}[c]
+                    else: result += c
+                return result
+            
+            text = re.sub(r'\^{([^}]+)}', convert_super, text)
+            
+            # Subíndices con llaves
+            def convert_sub(m):
+                t = m.group(1)
+                result = ''
+                for c in t:
+                    if c.isdigit():
+                        result += {'0':'₀','1':'₁','2':'₂','3':'₃','4':'₄','5':'₅','6':'₆','7':'₇','8':'₈','9':'₉'}[c]
+                    elif c.isalpha():
+                        sub_map = {'s':'ₛ','w':'ᵥᵥ','p':'ₚ','h':'ₕ','a':'ₐ','e':'ₑ'}
+                        result += sub_map.get(c, c)
+                    else: result += c
+                return result
+            
+            text = re.sub(r'_{([^}]+)}', convert_sub, text)
+            
+            # Superíndices simples sin llaves
+            text = text.replace('^-1', '⁻¹').replace('^-2', '⁻²').replace('^-3', '⁻³')
+            text = text.replace('^1', '¹').replace('^2', '²').replace('^3', '³').replace('^4', '⁴')
+            text = text.replace('^2+', '²⁺').replace('^3+', '³⁺')
+            
+            # Subíndices simples
+            text = text.replace('_s', 'ₛ').replace('_w', 'ᵥᵥ').replace('_p', 'ₚ').replace('_2', '₂')
+            
+            # Ahora limpiar llaves restantes (después de procesar super/subíndices)
+            text = text.replace('{', '').replace('}', '')
+            text = re.sub(r'\\[a-zA-Z]+', '', text)
+            text = text.replace('\\', '')
+            
+            return text
+        
+        section.end(elementos=len(story))
+        section = span('pdf.seccion', seccion='Práctica 1')
+
+        # PRÁCTICA 1
+        if 'p1' in results:
+            story.append(Paragraph("PRÁCTICA 1: POTENCIAL OSMÓTICO Y HÍDRICO", heading_style))
+            
+            # Sacarosa
+            if 'sacarosa' in results['p1'] and not results['p1']['sacarosa'].empty:
+                story.append(Paragraph("<b>Sacarosa:</b>", small_style))
+                df_sac = results['p1']['sacarosa']
+                # Limpiar LaTeX en todas las celdas
+                table_data = [[clean_latex(str(cell)) for cell in df_sac.columns.tolist()]]
+                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_sac.values.tolist()]
+                t = Table(table_data, colWidths=[3*cm]*len(df_sac.columns))
+                t.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 6),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+                ]))
+                story.append(t)
+                story.append(Spacer(1, 0.2*cm))
+                if 'sacarosa_expl' in results['p1']:
+                    add_text(results['p1']['sacarosa_expl'])
+            
+            # Cebolla
+            if 'onion_chart' in results['p1']:
+                story.append(Paragraph("<b>Cebolla - Potencial Osmótico:</b>", small_style))
+                add_figure(results['p1']['onion_chart'], width=13*cm, max_height=8*cm)
+                if 'onion_pot' in results['p1']:
+                    story.append(Paragraph(f"Potencial osmótico: {results['p1']['onion_pot']} MPa", small_style))
+                if 'onion_expl' in results['p1']:
+                    add_text(results['p1']['onion_expl'])
+            
+            # Patata
+            if 'potato_chart' in results['p1']:
+                story.append(Paragraph("<b>Patata - Potencial Hídrico:</b>", small_style))
+                add_figure(results['p1']['potato_chart'], width=13*cm, max_height=8*cm)
+                if 'potato_pot' in results['p1']:
+                    story.append(Paragraph(f"Potencial hídrico: {results['p1']['potato_pot']} MPa", small_style))
+                if 'potato_expl' in results['p1']:
+                    add_text(results['p1']['potato_expl'])
+            
+            story.append(PageBreak())
+        
+        section.end(elementos=len(story))
+        section = span('pdf.seccion', seccion='Práctica 2')
+
+        # PRÁCTICA 2
+        if 'p2' in results:
+            story.append(Paragraph("PRÁCTICA 2: TRANSPIRACIÓN", heading_style))
+            
+            # Maíz
+            if 'corn_chart' in results['p2']:
+                story.append(Paragraph("<b>Maíz - Potencial Hídrico:</b>", small_style))
+                add_figure(results['p2']['corn_chart'], width=13*cm, max_height=8*cm)
+                if 'corn_pot' in results['p2']:
+                    story.append(Paragraph(f"Potencial hídrico: {results['p2']['corn_pot']} MPa", small_style))
+                if 'corn_expl' in results['p2']:
+                    add_text(results['p2']['corn_expl'])
+                story.append(Spacer(1, 0.3*cm))
+            
+            # Guisante
+            if 'pea_chart1' in results['p2']:
+                story.append(Paragraph("<b>Guisante - Potencial Hídrico:</b>", small_style))
+                add_figure(results['p2']['pea_chart1'], width=13*cm, max_height=8*cm)
+                if 'pea_pot' in results['p2']:
+                    story.append(Paragraph(f"Potencial hídrico: {results['p2']['pea_pot']} MPa", small_style))
+                story.append(Spacer(1, 0.3*cm))
+            
+            if 'pea_chart2' in results['p2']:
+                story.append(Paragraph("<b>Guisante - Resistencias:</b>", small_style))
+                add_figure(results['p2']['pea_chart2'], width=13*cm, max_height=8*cm)
+                if 'pea_expl' in results['p2']:
+                    add_text(results['p2']['pea_expl'])
+                story.append(Spacer(1, 0.3*cm))
+            
+            story.append(PageBreak())
+        
+        section.end(elementos=len(story))
+        section = span('pdf.seccion', seccion='Práctica 3')
+
+        # PRÁCTICA 3
+        if 'p3' in results:
+            story.append(Paragraph("PRÁCTICA 3: CLOROFILAS Y PIGMENTOS", heading_style))
+            
+            # Clorofila
+            if 'clorofila' in results['p3'] and not results['p3']['clorofila'].empty:
+                story.append(Paragraph("<b>Determinación de Clorofila:</b>", small_style))
+                df_clor = results['p3']['clorofila']
+                # Limpiar LaTeX en todas las celdas
+                table_data = [[clean_latex(str(cell)) for cell in df_clor.columns.tolist()]]
+                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_clor.values.tolist()]
+                t = Table(table_data, colWidths=[4*cm]*len(df_clor.columns))
+                t.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ecc71')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+                ]))
+                story.append(t)
+                story.append(Spacer(1, 0.3*cm))
+                if 'clor_expl' in results['p3']:
+                    add_text(results['p3']['clor_expl'])
+            
+            # Cromatografía
+            if 'cromatografia' in results['p3'] and not results['p3']['cromatografia'].empty:
+                story.append(Paragraph("<b>Cromatografía de Pigmentos:</b>", small_style))
+                df_crom = results['p3']['cromatografia']
+                table_data = [df_crom.columns.tolist()] + df_crom.values.tolist()
+                t = Table(table_data, colWidths=[3.5*cm]*len(df_crom.columns))
+                t.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ecc71')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+                ]))
+                story.append(t)
+                story.append(Spacer(1, 0.3*cm))
+                if 'croma_expl' in results['p3']:
+                    add_text(results['p3']['croma_expl'])
+            
+            # Anabaena
+            if 'anabaena_abs' in results['p3']:
+                story.append(Paragraph(f"<b>Anabaena Absorbancia:</b> {results['p3']['anabaena_abs']}", small_style))
+                if 'anabaena_expl' in results['p3']:
+                    add_text(results['p3']['anabaena_expl'])
+                story.append(Spacer(1, 0.3*cm))
+            
+            story.append(PageBreak())
+        
+        section.end(elementos=len(story))
+        section = span('pdf.seccion', seccion='Práctica 4')
+
+        # PRÁCTICA 4
+        if 'p4' in results:
+            story.append(Paragraph("PRÁCTICA 4: REACCIÓN DE HILL", heading_style))
+            
+            # Clorofila Hill
+            if 'chl_hill' in results['p4'] and not results['p4']['chl_hill'].empty:
+                story.append(Paragraph("<b>Determinación de Clorofila:</b>", small_style))
+                df_chl = results['p4']['chl_hill']
+                # Limpiar LaTeX en todas las celdas
+                table_data = [[clean_latex(str(cell)) for cell in df_chl.columns.tolist()]]
+                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_chl.values.tolist()]
+                t = Table(table_data, colWidths=[4*cm]*len(df_chl.columns))
+                t.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+                ]))
+                story.append(t)
+                story.append(Spacer(1, 0.3*cm))
+                if 'chl_hill_expl' in results['p4']:
+                    add_text(results['p4']['chl_hill_expl'])
+            
+            # Ferricianuro
+            if 'ferricianuro' in results['p4'] and not results['p4']['ferricianuro'].empty:
+                story.append(Paragraph("<b>Absorción de Ferricianuro:</b>", small_style))
+                df_ferri = results['p4']['ferricianuro']
+                # Limpiar LaTeX en todas las celdas
+                table_data = [[clean_latex(str(cell)) for cell in df_ferri.columns.tolist()]]
+                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_ferri.values.tolist()]
+                t = Table(table_data, colWidths=[3*cm]*len(df_ferri.columns))
+                t.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+                ]))
+                story.append(t)
+                story.append(Spacer(1, 0.3*cm))
+                if 'ferri_expl_pdf' in results['p4']:
+                    add_text_simple(results['p4']['ferri_expl_pdf'])
+            
+            # Hill figura
+            if 'hill_chart' in results['p4']:
+                story.append(Paragraph("<b>Reacción de Hill:</b>", small_style))
+                add_figure(results['p4']['hill_chart'], width=13*cm, max_height=8*cm)
+                story.append(Spacer(1, 0.3*cm))
+            
+            # Fotosíntesis
+            if 'fotosintesis' in results['p4'] and not results['p4']['fotosintesis'].empty:
+                story.append(Paragraph("<b>Actividades Fotosintéticas:</b>", small_style))
+                df_foto = results['p4']['fotosintesis']
+                # Limpiar LaTeX en todas las celdas
+                table_data = [[clean_latex(str(cell)) for cell in df_foto.columns.tolist()]]
+                table_data += [[clean_latex(str(cell)) for cell in row] for row in df_foto.values.tolist()]
+                t = Table(table_data, colWidths=[8*cm, 4*cm])
+                t.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f39c12')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+                ]))
+                story.append(t)
+                story.append(Spacer(1, 0.3*cm))
+                if 'foto_expl_pdf' in results['p4']:
+                    add_text_simple(results['p4']['foto_expl_pdf'])
+            
+            story.append(PageBreak())
+        
+        section.end(elementos=len(story))
+        section = span('pdf.seccion', seccion='Práctica 5')
+
+        # PRÁCTICA 5
+        if 'p5' in results:
+            story.append(Paragraph("PRÁCTICA 5: GERMINACIÓN Y α-AMILASA", heading_style))
+            
+            if 'germinacion' in results['p5']:
+                story.append(Paragraph(f"<b>Germinación:</b> {results['p5']['germinacion']}%", small_style))
+                if 'germ_expl' in results['p5']:
+                    add_text(results['p5']['germ_expl'])
+                story.append(Spacer(1, 0.3*cm))
+            
+            # Amilasa figura
+            if 'amilasa_chart' in results['p5']:
+                story.append(Paragraph("<b>Actividad α-amilasa:</b>", small_style))
+                add_figure(results['p5']['amilasa_chart'], width=13*cm, max_height=8*cm)
+                story.append(Spacer(1, 0.3*cm))
+            
+            # Tabla amilasa
+            if 'amilasa' in results['p5'] and not results['p5']['amilasa'].empty:
+                df_amil = results['p5']['amilasa']
+                # Limpiar LaTeX en todas las celdas (solo primeras 5 columnas)
+                table_data = [[clean_latex(str(cell)) for cell in df_amil.columns.tolist()[:5]]]
+                table_data += [[clean_latex(str(cell)) for cell in row[:5]] for row in df_amil.values.tolist()]
+                t = Table(table_data, colWidths=[3*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm])
+                t.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9b59b6')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 7),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+                ]))
+                story.append(t)
+                story.append(Spacer(1, 0.3*cm))
+                if 'amilasa_expl' in results['p5']:
+                    add_text(results['p5']['amilasa_expl'])
+            
+            story.append(PageBreak())
+    
+        story.append(PageBreak())
+        story.append(Paragraph("CONCLUSIONES", heading_style))
+        story.append(Paragraph("Todos los análisis se completaron satisfactoriamente. Consulte el dashboard web para gráficas y explicaciones detalladas.", styles['Normal']))
+        
+        section.end(elementos=len(story))
+        
+        # Construir el documento
+        with span('pdf.maquetado', elementos=len(story)) as s:
+            doc.build(story)
+            s.set(paginas=doc.page, bytes=pdf_buffer.getbuffer().nbytes)
+        
+        # Ahora sí podemos cerrar los buffers
+        for buf in image_buffers:
+            try:
+                buf.close()
+            except:
+                pass
+        
+        return pdf_buffer.getvalue()
+        
+    except Exception as e:
+        print(f"  ✗ Error generando PDF: {e}")
+        import traceback
+        traceback.print_exc()
+        # Retornar None si falla
+        return None
+
+# ============================================================================
+# INFORME
+# ============================================================================
+
+def build_pdf(results):
+    """Genera el PDF a partir de los resultados {1: p1, ..., 5: p5}: sus bytes, o None si falla"""
+    try:
+        return generate_simple_pdf({f'p{n}': p for n, p in results.items()})
+    except Exception as e:
+        print(f"     ✗ Error generando PDF: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
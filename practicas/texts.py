@@ -0,0 +1,287 @@
+"""
+Textos explicativos de cada práctica, con ecuaciones $$...$$.
+"""
+
+# ============================================================================
+# TEXTOS EXPLICATIVOS CON ECUACIONES
+# ============================================================================
+# Explicaciones de todas las prácticas; sus ecuaciones $$...$$ se renderizan
+# como imagen en el PDF. Las *_EXPL son fijas (las *_PDF, sin ecuaciones, son
+# la versión en Unicode para el informe); las *_TEMPLATE se completan con
+# str.format.
+
+SACAROSA_EXPL = r"""
+**Cálculo del potencial hídrico de sacarosa usando ecuación de van't Hoff:**
+
+Para el cálculo del potencial hídrico de la solución de sacarosa utilizamos la ecuación de van't Hoff:
+
+$$\Psi_{s}=-RTiCs$$
+
+Asumiendo que obtenemos un valor X al aplicar la ecuación, para la conversión de las unidades debería seguir los siguientes pasos:
+
+$$X\: \frac{J}{{\color{red}{K}} \cdot {\color{red} {mol}}} \times {{\color{red}{K}}} \times {\frac{\color{red} {mol}}{L}} \Rightarrow X\: \frac{J}{{\color{red} {L}}} \times {\frac{1000\:{\color{red} {L}}}{m^{3}}}\Rightarrow$$
+
+$$\Rightarrow 1000X\: \frac{J}{m^{3}}\Rightarrow 1000X\: {\color{red} {Pa}} \times{\frac{MPa}{10^{6}\color{red} {Pa}}}$$
+
+Por lo tanto la fórmula final podríamos reflejarla como:
+
+$$\Psi_{w}=-\frac{X}{1000} \text{ MPa}$$
+"""
+
+ONION_EXPL_TEMPLATE = """
+**Análisis de Plasmólisis:**
+
+A la hora de revisar los resultados, hay que cerciorarse de que el porcentaje de células plasmolizadas **disminuya a la par que se reduce la concentración de sacarosa en el medio**. 
+
+En una solución hipertónica como la del tubo 1, el potencial osmótico de las células será superior al del medio y por tanto perderán agua conduciendo a la plasmólisis. Si se disminuye la concentración de sacarosa en el medio, su potencial osmótico irá aumentando hasta el punto en el que será hipotónica respecto al tejido y las moléculas de agua pasarán a las células provocando la turgencia. 
+
+Por lo tanto, para estimar el potencial osmótico medio del tejido de epidermis de cebolla observamos el porcentaje de células plasmolizadas y ajustamos los puntos a una **curva sigmoide**.
+
+El valor del potencial osmótico medio corresponderá al punto en el que se observa que el 50% de las células han plasmolizado.
+
+**Por lo tanto, el valor de Potencial osmótico medio se puede estimar en este caso en** <span style='color:red; font-weight:bold;'>{potencial_osm} MPa</span>
+
+**Parámetros del modelo:** xmid = {xmid}, scal = {scal}
+"""
+
+POTATO_EXPL_TEMPLATE = """
+**Cálculo del Potencial Hídrico:**
+
+Para el cálculo del potencial hídrico del tubérculo de patata comparamos la variación de peso (en porcentaje) del tejido de patata frente al Potencial hídrico de la solución de sacarosa.
+
+Antes hemos de cerciorarnos que hemos calculado bien el porcentaje de variación de peso:
+
+$$\\frac{{(\\text{{Peso final}} - \\text{{Peso inicial}})}}{{\\text{{Peso inicial}}}} \\times 100$$
+
+Para calcular el Potencial hídrico del tejido de patata, hemos de asumir que la relación entre el Potencial hídrico y la variación de peso es lineal:
+
+$$\\% \\text{{ Variación de peso}} = a \\times \\text{{Potencial hídrico}} + b$$
+
+Si asumimos que el Potencial hídrico del tejido es aquel valor de Potencial hídrico que hace que la variación de peso sea 0, podemos despejar la ecuación anterior para encontrar el valor de Potencial hídrico:
+
+$$0 = a \\times \\text{{Potencial hídrico}} + b$$
+
+$$\\text{{Potencial hídrico}} = -\\frac{{b}}{{a}}$$
+
+Para encontrar los valores de a y b, podemos usar el método de **mínimos cuadrados**, que nos permitirá encontrar la recta que mejor se ajusta a los datos.
+
+Al aplicarlos obtenemos un valor de pendiente igual a <span style='color:red; font-weight:bold;'>{slope}</span>, y un valor de ordenada de origen igual a <span style='color:red; font-weight:bold;'>{intercept}</span>.
+
+Despejando obtenemos que el **Potencial hídrico del tejido es igual a** <span style='color:red; font-weight:bold;'>{hydric_pot} MPa</span>
+"""
+
+CORN_EXPL = r"""
+**Efecto de Auxina en Coleóptilos de Maíz:**
+
+Para el cálculo de la variación de longitud de coleóptilo de maíz, hemos de comparar la longitud media de coleóptilo de maíz en diferentes tratamientos a las 24h respecto a los 10 mm iniciales.
+
+$$\text{Variación} (\%) = \frac{\text{Longitud media} - 10}{10} \times 100$$
+
+Una vez calculado la variación de longitud en los distintos tratamientos de Auxina tenemos que prestar atención a los valores obtenidos:
+
+- ¿Hay diferencias entre tratamientos?
+- ¿Se elonga el coleóptilo de maíz según incrementamos la concentración de Auxina o llegado un punto se observan alteraciones?
+"""
+
+PEA_EXPL = r"""
+**Influencia del Estrés Salino en Guisantes:**
+
+Para el cálculo de la variación peso de los guisantes, hemos de comparar el peso húmedo de las semillas de guisante tras 24h de tratamiento frente al peso seco de las semillas antes del tratamiento.
+
+$$\text{Variación} (\%) = \frac{\text{Peso húmedo} - \text{Peso seco}}{\text{Peso seco}} \times 100$$
+
+**Preguntas clave:**
+- ¿El estrés salino afecta a la hidratación de las semillas? ¿A qué se puede deber?
+- Respecto a la viabilidad de las semillas, ¿hay alguna alteración en la actividad metabólica?
+- ¿Has observado acumulación de especies reactivas de oxígeno (ROS)?
+- ¿Qué reactivo nos permitía detectar dichos parámetros?
+"""
+
+CLOROFILA_EXPL_TEMPLATE = r"""
+**Determinación de la concentración de Chl a en extracto etanólico de espinaca:**
+
+Para el cálculo de la concentración de clorofila, se ha de tener en cuenta que la clorofila a tiene un coeficiente de extinción molar de 76.07 mL/(mg · cm). 
+
+Si aplicamos la ecuación de Lambert Beer:
+
+$$\text{{Chla Determinada}} (\text{{mg/mL}}) = \frac{{\text{{ABS}}}}{{76.07}}$$
+
+Hemos hecho una dilución 1:50 de la muestra, por lo que la concentración de clorofila en la muestra original es:
+
+$$\text{{Chla Extracto}} (\text{{mg/mL}}) = \text{{Chla Determinada}} (\text{{mg/mL}}) \times 50$$
+
+Para calcular la concentración de clorofila respecto a g de espinaca hemos de tener en cuenta de que hemos triturado 4 g de hoja en 8 mL de extracto:
+
+$$\text{{Chla}} (\text{{mg/g}}) = \frac{{\text{{mg Chla}}}}{{\text{{mL Extracto}}}} \times \frac{{8 \text{{ mL Extracto}}}}{{4 \text{{ g Espinaca}}}}$$
+
+**Resultados obtenidos:** {conc_corr} mg/mL, {conc_g_corr} mg/g
+"""
+
+CROMA_EXPL = r"""
+**Caracterización de Pigmentos - Cromatografía:**
+
+A la hora de determinar la identidad de los pigmentos hay que tener en cuenta dos factores: su apolaridad relativa determinada en este caso por el valor de Rf y sus máximos de absorción. 
+
+Para la determinación de cada Rf hay que aplicar la siguiente fórmula:
+
+$$R_f = \frac{\text{Distancia recorrida por el pigmento}}{\text{Distancia recorrida por el disolvente}}$$
+
+El pigmento **más apolar** es el que se mueve más con el disolvente (banda 1) y el **más polar** el que se queda más cerca del punto de aplicación (banda 6). 
+
+Así, el pigmento más polar es el que presenta un **menor valor de Rf** y el más apolar el que presenta un **mayor valor de Rf**.
+
+En el extracto que hemos preparado los pigmentos que se distinguen son: **β-Caroteno, Clorofila a, Clorofila b, Luteina, Violaxantina y Neoxantina**.
+
+**Orden de polaridad (de más apolar a más polar):**
+β-Caroteno > Clorofila a > Clorofila b > Luteina > Violaxantina > Neoxantina
+"""
+
+ANABAENA_EXPL = """
+**Pigmentos en *Anabaena*:**
+
+En el caso de la extracción de los pigmentos de *Anabaena*, no hemos usado una extracción basada en disolventes apolares. Hemos usado una pequeña cantidad de tolueno para debilitar la membrana de la bacteria para quedarnos con los elementos solubles en agua, y por lo tanto polares.
+
+Al determinar los máximos de Absorbancia apreciamos que el pico está en la región del rojo (~620 nm), de ahí el color azulado que presenta el extracto, y que coincide con el espectro típico de la **ficocianina**.
+
+**Preguntas:**
+- ¿Has comparado el espectro de absorción *in vivo* del cultivo de *Anabaena* con el del extracto de ficocianina?
+- ¿Qué pigmento enmascara el pico de absorción de ficocianina en el cultivo vivo?
+"""
+
+CHL_HILL_EXPL_TEMPLATE = r"""
+**Determinación de la concentración de Chl a en reacción de Hill:**
+
+En la práctica 4 hemos determinado la concentración de clorofila en el extracto de tilacoides diluido 100 veces, por lo que para calcular la concentración en el extracto:
+
+$$[\text{{Chla tilacoides}}] (\text{{mg/mL}}) = \frac{{\text{{ABS}}_{{665}}}}{{76.07 \cdot 1 \text{{ cm}}}} \times 100 \frac{{\text{{mg}}}}{{\text{{mL}}}}$$
+
+Por otro lado, para calcular la cantidad en mg de Chla en la reacción de Hill hemos de tener en cuenta que hemos añadido 0.5 mL del extracto de tilacoides a la reacción. Por ello:
+
+$$\text{{mg Chla en reacción}} = [\text{{Chla tilacoides}}] \frac{{\text{{mg Chla}}}}{{\text{{mL Extracto}}}} \times 0.5 \text{{ mL Extracto}}$$
+
+**Valor calculado:** {chl_corr_mg} mg Chla
+"""
+
+FERRI_EXPL = r"""
+**Concentración de Ferricianuro:**
+
+En la práctica 4 hemos determinado la concentración de ferricianuro en la reacción de Hill. Para ello hemos medido la absorbancia a 420 nm de una mezcla diluida.
+
+Hemos de tener en cuenta que el coeficiente de extinción del ferricianuro (ε) a 420 nm es 1 mL·µmol⁻¹·cm⁻¹. Por lo tanto la concentración de ferricianuro en la disolución que hemos medido será:
+
+$$[\text{Ferricianuro}]_{\text{determinado}} = \frac{\text{ABS}}{1 \text{ mL} \cdot \mu\text{mol}^{-1} \cdot \text{cm}^{-1}}$$
+
+Sin embargo para obtener el valor en la mezcla de reacción, hemos de tener en cuenta que hemos diluido la reacción 4 veces, por lo que hemos de multiplicar el valor de absorbancia por 4 para obtener la absorbancia de la reacción sin diluir.
+
+$$[\text{Ferricianuro}]_{\text{reacción}} = [\text{Ferricianuro}]_{\text{determinado}} \times 4$$
+"""
+
+FERRI_EXPL_PDF = """
+**Concentración de Ferricianuro:**
+
+En la práctica 4 hemos determinado la concentración de ferricianuro en la reacción de Hill. Para ello hemos medido la absorbancia a 420 nm de una mezcla diluida.
+
+Hemos de tener en cuenta que el coeficiente de extinción del ferricianuro (ε) a 420 nm es 1 mL·µmol⁻¹·cm⁻¹. Por lo tanto la concentración de ferricianuro en la disolución que hemos medido será:
+
+[Ferricianuro] = ABS / (1 mL·µmol⁻¹·cm⁻¹)
+
+Sin embargo para obtener el valor en la mezcla de reacción, hemos de tener en cuenta que hemos diluido la reacción 4 veces, por lo que hemos de multiplicar el valor de absorbancia por 4 para obtener la absorbancia de la reacción sin diluir.
+
+[Ferricianuro]reacción = [Ferricianuro]determinado × 4
+"""
+
+FOTO_EXPL_TEMPLATE = r"""
+**Actividad Fotosintética - Reacción de Hill:**
+
+Para obtener los valores de µmoles de Ferricianuro por miligramo de clorofila en cada tiempo de reacción (tubos 4 a 7), hemos de multiplicar la concentración por el volumen de la muestra, 3.5 mL, y dividirlo por la cantidad de clorofila que hemos añadido con nuestra suspensión de tilacoides que en este caso es **{chl_corr_mg} mg Chla**.
+
+Podemos representar los valores obtenidos frente al tiempo (0, 5, 10, 15 minutos) en un gráfico y calcular la pendiente. Dicha pendiente, de signo negativo dado que estamos observando una disminución de la concentración de Fe³⁺CN, nos da la velocidad de reacción de la enzima.
+
+En este caso, la pendiente es de **{vel_min}** µmol Fe³⁺CN·mg Chl⁻¹·min⁻¹.
+
+Si multiplicamos esta pendiente por 60, obtendremos la velocidad de reacción en una hora: **{vel_hora}** µmol Fe³⁺CN·mg Chl⁻¹·h⁻¹.
+
+Sabemos que:
+
+$$\text{{Fe}}^{{3+}}\text{{CN}} + 1e^- \Rightarrow \text{{Fe}}^{{2+}}\text{{CN}}$$
+
+También sabemos que en la reacción de fotólisis del agua:
+
+$$2\text{{H}}_2\text{{O}} + h\nu \Rightarrow \text{{O}}_2 + 4\text{{H}}^+ + 4e^-$$
+
+Por lo tanto por cada µmol de O₂ se liberan 4 µmoles de e⁻. Si dividimos esta velocidad por 4, obtendremos la actividad del FSII en forma de liberación de O₂:
+
+**{vel_o2}** µmol O₂·mg Chl⁻¹·h⁻¹
+
+Finalmente, si añadimos **DCMU**, que captura los electrones al nivel de la plastoquinona compitiendo por el FeCN, se aprecia un descenso en la tasa de reducción del FeCN. Para calcular esa tasa hemos comparado el valor del tubo 4 (tiempo 0) con el del tubo con el DCMU a los 15 minutos de reacción (tubo 8) con la siguiente fórmula:
+
+$$\text{{Reducción Fe}}^{{3+}}\text{{CN}} = -\frac{{[\text{{Fe}}^{{3+}}\text{{CN}}]_{{\text{{Tubo 8}}}} - [\text{{Fe}}^{{3+}}\text{{CN}}]_{{\text{{Tubo 4}}}}}}{{15 \text{{ min}} - 0 \text{{ min}}}} \times \frac{{60 \text{{ min}}}}{{1 \text{{ h}}}}$$
+
+**Actividad FSII + DCMU:** {dcmu_activity} µmol Fe²⁺CN·mg Chl⁻¹·h⁻¹
+"""
+
+FOTO_EXPL_PDF_TEMPLATE = """
+**Actividad Fotosintética - Reacción de Hill:**
+
+Para obtener los valores de µmoles de Ferricianuro por miligramo de clorofila en cada tiempo de reacción (tubos 4 a 7), hemos de multiplicar la concentración por el volumen de la muestra, 3.5 mL, y dividirlo por la cantidad de clorofila que hemos añadido con nuestra suspensión de tilacoides que en este caso es **{chl_corr_mg} mg Chla**.
+
+Podemos representar los valores obtenidos frente al tiempo (0, 5, 10, 15 minutos) en un gráfico y calcular la pendiente. Dicha pendiente, de signo negativo dado que estamos observando una disminución de la concentración de Fe³⁺CN, nos da la velocidad de reacción de la enzima.
+
+En este caso, la pendiente es de **{vel_min}** µmol Fe³⁺CN·mg Chl⁻¹·min⁻¹.
+
+Si multiplicamos esta pendiente por 60, obtendremos la velocidad de reacción en una hora: **{vel_hora}** µmol Fe³⁺CN·mg Chl⁻¹·h⁻¹.
+
+Sabemos que: Fe³⁺CN + 1e⁻ → Fe²⁺CN
+
+También sabemos que en la reacción de fotólisis del agua: 2H₂O + luz → O₂ + 4H⁺ + 4e⁻
+
+Por lo tanto por cada µmol de O₂ se liberan 4 µmoles de e⁻. Si dividimos esta velocidad por 4, obtendremos la actividad del FSII en forma de liberación de O₂:
+
+**{vel_o2}** µmol O₂·mg Chl⁻¹·h⁻¹
+
+Finalmente, si añadimos **DCMU**, que captura los electrones al nivel de la plastoquinona compitiendo por el FeCN, se aprecia un descenso en la tasa de reducción del FeCN. Para calcular esa tasa hemos comparado el valor del tubo 4 (tiempo 0) con el del tubo con el DCMU a los 15 minutos de reacción (tubo 8).
+
+**Actividad FSII + DCMU:** {dcmu_activity} µmol Fe²⁺CN·mg Chl⁻¹·h⁻¹
+"""
+
+FOTO_ERROR_EXPL = """
+**Actividad Fotosintética - Reacción de Hill:**
+
+No se pudieron calcular los parámetros de la reacción de Hill. Verifique que los datos de entrada sean correctos.
+"""
+
+GERM_EXPL_TEMPLATE = """
+        **Germinación de semillas:** {germinacion}%
+        
+        ¿Este paquete de semillas es adecuado para la práctica? (Se considera adecuado >80%)
+        """
+
+AMILASA_EXPL = r"""
+**Inducción de actividad α-amilasa en cebada:**
+
+La actividad de la α-amilasa se ha calculado a partir de la degradación del almidón. Para ello, se ha medido la absorbancia de la solución de almidón en el tiempo 0 y a los 10 minutos de reacción. La actividad de la α-amilasa se ha calculado con la siguiente fórmula:
+
+$$\text{Almidón degradado (mg/h)} = \frac{(\text{Abs}_{t=0} - \text{Abs}_{t=10}) \cdot 1\text{cm}}{11.4 \text{ mL} \cdot \text{mg}^{-1} \cdot \text{cm}^{-1}} \times 7 \text{ mL} \times \frac{60 \text{ min}}{10 \text{ min} \cdot \text{h}}$$
+
+Es importante tener en cuenta que no todos los experimentos parten de la misma cantidad de material biológico, ya que el peso seco de las semillas varía entre los casos. Por esta razón, es necesario **normalizar** los resultados para permitir una comparación adecuada entre ellos.
+
+En este procedimiento, utilizaremos el peso seco de las semillas como factor de normalización, expresando la actividad de α-amilasa como la cantidad de almidón degradado (en mg) por hora, por mg de semilla.
+
+Para llevar a cabo este cálculo, recordemos que el extracto enzimático de semillas se ha obtenido homogenizando el peso seco de las semillas de cada caso en un volumen final de 10 mL de tampón. De este homogenizado, se tomaron 0.25 mL para la reacción. Por lo tanto, debemos determinar cuántos mg de semillas están representados en esos 0.25 mL de extracto:
+
+$$\text{mg semillas en 0.25 mL} = \frac{\text{mg semillas en placa}}{10 \text{ mL}} \times 0.25 \text{ mL}$$
+
+Finalmente, para referir la actividad de la α-amilasa a la cantidad de semillas utilizadas, hemos de dividir la actividad de la α-amilasa por los mg de semillas utilizados. El resultado se expresa en mg de almidón degradado por hora y mg de semillas.
+
+**Preguntas clave para el análisis:**
+
+- ¿Qué placas hemos de comparar para determinar la influencia del embrión?
+- ¿Qué placas hemos de comparar para determinar la influencia de la Giberelina? ¿Induce la actividad germinativa o no? ¿Dónde se produce la Giberelina? ¿Cuál es su diana?
+- ¿Qué placas hemos de comparar para determinar si la actividad alfa amilasa depende de la regulación transcripcional? ¿Hay actividad alfa amilasa independiente del embrión o de la Giberelina?
+"""
+
+# Todos los textos de las prácticas: el precalentamiento del PDF renderiza sus ecuaciones
+STATIC_EXPLANATIONS = [SACAROSA_EXPL, CORN_EXPL, PEA_EXPL, CROMA_EXPL, ANABAENA_EXPL, FERRI_EXPL, FERRI_EXPL_PDF,
+                       FOTO_ERROR_EXPL, AMILASA_EXPL]
+EXPLANATION_TEMPLATES = [ONION_EXPL_TEMPLATE, POTATO_EXPL_TEMPLATE, CLOROFILA_EXPL_TEMPLATE, CHL_HILL_EXPL_TEMPLATE,
+                         FOTO_EXPL_TEMPLATE, FOTO_EXPL_PDF_TEMPLATE, GERM_EXPL_TEMPLATE]
@@ -0,0 +1,309 @@
+"""
+Trazas de tiempos y métricas del análisis.
+
+Cada etapa se mide con un span; los spans de un análisis forman una Traza que
+se escribe en SPAN_LOG (líneas JSON) y alimenta las métricas de Prometheus.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+# ============================================================================
+# TRAZAS DE TIEMPOS
+# ============================================================================
+# Cada etapa (lectura de un bloque, ajuste, figura, sección del PDF...) se mide
+# con un span: nombre, duración en ms y atributos (filas, iteraciones...). Los
+# spans de un análisis se reúnen en una Traza, que alimenta el desglose de
+# tiempos del panel "Información de Procesamiento" y se añade a SPAN_LOG como
+# líneas JSON. Fuera de una traza activa los spans no se registran.
+
+SPAN_LOG = os.environ.get('SPAN_LOG', os.path.join(tempfile.gettempdir(), 'practicas_spans.jsonl'))
+SPAN_LOG_MAX_BYTES = int(os.environ.get('SPAN_LOG_MAX_MB', 50)) * 1024 * 1024  # después se rota a .1
+
+_active_trace = contextvars.ContextVar('active_trace', default=None)
+
+class Span:
+    """Mide una etapa; se usa con `with` o se cierra explícitamente con end()"""
+
+    def __init__(self, name, **attrs):
+        self.record = {'span': name, 'ts': round(time.time(), 3), **attrs}
+        self._trace = _active_trace.get()
+        self._start = time.perf_counter()
+
+    def set(self, **attrs):
+        self.record.update(attrs)
+        return self
+
+    def end(self, **attrs):
+        if 'ms' not in self.record:
+            self.record.update(attrs)
+            self.record['ms'] = round((time.perf_counter() - self._start) * 1000, 3)
+            if self._trace is not None:
+                self._trace.add(self.record)
+        return self.record
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record['error'] = f"{exc_type.__name__}: {exc}"
+        self.end()
+        return False
+
+def span(name, **attrs):
+    return Span(name, **attrs)
+
+def current_trace():
+    """Traza activa en este contexto (None fuera de Trace.activate)"""
+    return _active_trace.get()
+
+def _json_value(value):
+    # Tipos de numpy (np.int64, np.bool_...) y lo demás como texto
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class Trace:
+    """Spans de un análisis; `context` (p.ej. el hash del archivo) acompaña a cada línea del log"""
+
+    def __init__(self, **context):
+        self.context = context
+        self.spans = []
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def extend(self, records):
+        with self._lock:
+            self.spans.extend(records)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Los spans creados dentro del bloque (en este hilo) se añaden a la traza"""
+        token = _active_trace.set(self)
+        try:
+            yield self
+        finally:
+            _active_trace.reset(token)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def total_ms(self, name, **match):
+        """Suma de los spans `name` cuyos atributos coinciden con `match`"""
+        with self._lock:
+            return sum(r['ms'] for r in self.spans
+                       if r['span'] == name and all(r.get(k) == v for k, v in match.items()))
+
+    def count(self, name, **match):
+        """Número de spans `name` cuyos atributos coinciden con `match`"""
+        with self._lock:
+            return sum(1 for r in self.spans
+                       if r['span'] == name and all(r.get(k) == v for k, v in match.items()))
+
+    def write(self, path=None):
+        """Añade al log los spans aún no escritos (una línea JSON por span, con el pid del proceso que lo midió)"""
+        path = SPAN_LOG if path is None else path
+        with self._lock:
+            pending = self.spans[self._written:]
+            self._written = len(self.spans)
+        # Las métricas se calculan de las mismas líneas (también sin log)
+        observe_spans(METRICS, pending)
+        if not path or not pending:
+            return
+        pid = os.getpid()
+        lines = ''.join(json.dumps({**self.context, 'pid': pid, **record}, ensure_ascii=False, default=_json_value) + '\n'
+                        for record in pending)
+        try:
+            if os.path.isfile(path) and os.path.getsize(path) > SPAN_LOG_MAX_BYTES:
+                os.replace(path, path + '.1')
+            # Una sola escritura en modo append: las líneas de varios procesos no se mezclan
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"  ⚠ No se pudo escribir el log de tiempos {path}: {e}")
+
+    def finish(self, outcome):
+        """Cierra la petición con un span 'peticion' (duración total y resultado) y escribe la traza"""
+        self.add({'span': 'peticion', 'ts': round(self.started_at, 3), 'resultado': outcome,
+                  'ms': round(self.elapsed_ms(), 3)})
+        self.write()
+
+def traced_call(fn, *args):
+    """Ejecuta fn(*args) con una traza propia; devuelve (resultado, spans).
+
+    Es lo que se ejecuta en los procesos de trabajo: los spans vuelven con el
+    resultado y collect_analysis los añade a la traza del análisis.
+    """
+    trace = Trace()
+    with trace.activate():
+        with span('tarea', funcion=fn.__name__):
+            result = fn(*args)
+    pid = os.getpid()
+    for record in trace.spans:
+        record.setdefault('tarea', fn.__name__)
+        record.setdefault('pid', pid)
+    return result, trace.spans
+
+# ============================================================================
+# MÉTRICAS
+# ============================================================================
+# Métricas del proceso en formato de texto de Prometheus, sin dependencias:
+# los histogramas se alimentan de los spans que se escriben en SPAN_LOG, así
+# que metrics_from_log() los recalcula sin conexión a partir del log; los
+# indicadores instantáneos (cola, caché, figuras, memoria) se leen al pedirlos.
+# app.mount_metrics() los sirve en /metrics, por defecto solo a clientes locales.
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    escaped = {k: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for k, v in labels.items()}
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped.items()) + '}'
+
+def _number_text(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Contador monótono con etiquetas; con `fn`, su valor se lee al pedirlo"""
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=(), fn=None):
+        self.name, self.help, self.labels, self.fn = name, help, tuple(labels), fn
+        self._values = {}  # valores de las etiquetas -> cuenta
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[label]) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        if self.fn is not None:
+            value = self.fn()
+            return [] if value is None else [(self.name, {}, value)]
+        with self._lock:
+            return [(self.name, dict(zip(self.labels, key)), value) for key, value in sorted(self._values.items())]
+
+class Gauge(Counter):
+    """Valor instantáneo (normalmente leído con `fn` al pedir las métricas)"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = tuple(str(labels[label]) for label in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram:
+    """Histograma acumulado por cubetas (le="..."), con _sum y _count"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}  # valores de las etiquetas -> [cuentas por cubeta, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[label]) for label in self.labels)
+        with self._lock:
+            counts, total, n = self._series.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[key] = (counts, total + value, n + 1)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, n) in sorted(self._series.items()):
+                labels = dict(zip(self.labels, key))
+                samples += [(self.name + '_bucket', {**labels, 'le': _number_text(bound)}, count)
+                            for bound, count in zip(self.buckets, counts)]
+                samples += [(self.name + '_sum', labels, total), (self.name + '_count', labels, n)]
+        return samples
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = OrderedDict()
+
+    def add(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def __getitem__(self, name):
+        return self._metrics[name]
+
+    def __contains__(self, name):
+        return name in self._metrics
+
+    def render(self):
+        """Todas las métricas en formato de texto de Prometheus (0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"  ⚠ Métrica {metric.name} no disponible: {e}")
+                continue
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"]
+            lines += [f"{name}{_label_text(labels)} {_number_text(value)}" for name, labels, value in samples]
+        return '\n'.join(lines) + '\n'
+
+def create_metrics():
+    """Registro con las métricas que se calculan a partir de los spans"""
+    metrics = MetricsRegistry()
+    metrics.add(Counter('practicas_peticiones_total', "Análisis pedidos, por resultado (ok, cache, formato, error)",
+                        labels=('resultado',)))
+    metrics.add(Histogram('practicas_peticion_segundos', "Tiempo hasta mostrar las 5 prácticas (sin el PDF)",
+                          labels=('resultado',)))
+    metrics.add(Histogram('practicas_lectura_segundos', "Lectura y validación del libro"))
+    metrics.add(Histogram('practicas_practica_segundos', "Análisis de cada práctica (cálculos y figuras)",
+                          labels=('practica',)))
+    metrics.add(Histogram('practicas_pdf_segundos', "Construcción del informe PDF"))
+    return metrics
+
+def observe_spans(metrics, records):
+    """Añade a `metrics` (de create_metrics) los spans de una traza o de las líneas del log"""
+    for record in records:
+        name, seconds = record.get('span'), record.get('ms', 0) / 1000
+        if name == 'peticion':
+            metrics['practicas_peticiones_total'].inc(resultado=record['resultado'])
+            metrics['practicas_peticion_segundos'].observe(seconds, resultado=record['resultado'])
+        elif name == 'lectura.libro':
+            metrics['practicas_lectura_segundos'].observe(seconds)
+        elif name == 'tarea' and record.get('funcion') == 'build_pdf':
+            metrics['practicas_pdf_segundos'].observe(seconds)
+        elif name == 'tarea' and str(record.get('funcion')).startswith('process_practica'):
+            metrics['practicas_practica_segundos'].observe(seconds, practica=record['funcion'][len('process_practica'):])
+
+def metrics_from_log(path=None):
+    """Métricas de los spans de un log (SPAN_LOG por defecto), sin el proceso que lo escribió"""
+    metrics = create_metrics()
+    with open(SPAN_LOG if path is None else path, encoding='utf-8') as f:
+        observe_spans(metrics, (json.loads(line) for line in f if line.strip()))
+    return metrics
+
+def resident_memory_bytes():
+    """Memoria residente (RSS) actual del proceso; None si el sistema no la ofrece"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+METRICS = create_metrics()
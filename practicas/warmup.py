@@ -0,0 +1,31 @@
+"""
+Precalentamiento: módulos pesados, fuentes y ecuaciones del PDF.
+
+warm_worker es el inicializador de los procesos de trabajo (pool del
+dashboard y corrección por lotes).
+"""
+
+import importlib
+
+
+from .report import _register_chart_fonts, warm_equation_cache
+
+# Módulos del análisis y del PDF que la interfaz no necesita para mostrarse
+WARM_UP_MODULES = [
+    'scipy.special', 'scipy.optimize',
+    'matplotlib.figure', 'matplotlib.backends.backend_agg', 'matplotlib.colors', 'matplotlib.patches',
+    'reportlab.platypus', 'reportlab.graphics.shapes', 'reportlab.pdfbase.ttfonts',
+]
+
+def preload_modules():
+    """Importa los módulos pesados y carga la caché de fuentes de matplotlib"""
+    for name in WARM_UP_MODULES:
+        importlib.import_module(name)
+    from matplotlib import font_manager
+    font_manager.findfont('DejaVu Sans')
+    _register_chart_fonts()
+
+def warm_worker():
+    """Inicializador de los procesos de trabajo: módulos, fuentes y ecuaciones del PDF"""
+    preload_modules()
+    return warm_equation_cache()
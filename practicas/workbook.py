@@ -0,0 +1,283 @@
+"""
+Lectura de los libros de prácticas (.xlsx).
+
+Antes de abrirlo, check_workbook mira solo el contenedor zip (tamaños y
+nombres de las hojas). Después el libro se lee una sola vez con openpyxl en
+modo de solo lectura y cada práctica pide sus bloques según SHEET_LAYOUT.
+"""
+
+import hashlib
+import os
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import range_boundaries
+
+from .tracing import span
+
+# ============================================================================
+# LECTURA DEL LIBRO EXCEL
+# ============================================================================
+
+# Disposición de cada hoja. Cada bloque es una celda suelta ('cell') o un rango
+# ('range') con cabecera opcional, orientación 'columns' para las tablas que se
+# rellenan por columnas (se devuelven ya transpuestas), nombres de columna
+# definitivos y columnas que deben convertirse a número.
+SHEET_LAYOUT = {
+    "Practica 1": {
+        'sacarosa': {'range': "B6:C14", 'header': True,
+                     'columns': ['Concentración (M)', 'Ψ estudiante (MPa)']},
+        'onion': {'range': "B18:E24",
+                  'columns': ['Tubos', 'Concentración (M)', 'Ψπ (MPa)', '% plasmólisis'],
+                  'numeric': ['Ψπ (MPa)', '% plasmólisis']},
+        'potato': {'range': "B38:G44",
+                   'columns': ['Tubos', 'Concentración (M)', 'Ψw (MPa)', 'Peso inicial (g)', 'Peso final (g)', '% Var estudiante']},
+    },
+    "Practica 2": {
+        'corn': {'range': "B8:F10", 'orientation': 'columns',
+                 'columns': ['Tratamiento', 'Media longitud (mm)', 'Variación(%) estudiante']},
+        'pea': {'range': "H8:K15", 'orientation': 'columns'},
+    },
+    "Practica 3": {
+        'abs': {'cell': "G6"},
+        'conc': {'cell': "G8"},
+        'conc_g': {'cell': "G10"},
+        'cromatografia': {'range': "B16:E22", 'header': True,
+                          'columns': ['Banda', 'Distancia pigmento', 'Distancia disolvente', 'Rf']},
+        'anabaena_abs': {'cell': "D27"},
+        'anabaena_pig': {'cell': "D28"},
+    },
+    "Practica 4": {
+        'abs_chl': {'cell': "D6"},
+        'chl_ml': {'cell': "D7"},
+        'chl_mg': {'cell': "D8"},
+        'ferricianuro': {'range': "B12:D21", 'header': True,
+                         'columns': ['Tubo', 'Abs 420 nm', '[Ferricianuro] estudiante']},
+        'hill': {'range': "B24:D27",
+                 'columns': ['Tubo', 'Tiempo (min)', 'Reducción estudiante']},
+    },
+    "Practica 5": {
+        'germinacion': {'cell': "E4"},
+        'amilasa': {'range': "B11:I15",
+                    'columns': ['Número', 'Tipo semilla', 'Tratamiento', 'Peso seco (mg)',
+                                'Abs t=0', 'Abs t=10', 'Almidón deg/h estudiante', 'Actividad estudiante'],
+                    'numeric': ['Peso seco (mg)', 'Abs t=0', 'Abs t=10', 'Almidón deg/h estudiante', 'Actividad estudiante']},
+    },
+}
+
+def compile_read_plan(layout):
+    """Compila SHEET_LAYOUT en el plan mínimo de lectura de cada hoja.
+
+    Para cada hoja devuelve la última fila y columna necesarias (la lectura se
+    detiene ahí) y, por fila, las columnas que hay que conservar; el resto de
+    celdas y filas no se convierten ni se guardan.
+    """
+    plan = {}
+    for sheet, blocks in layout.items():
+        cells = {}
+        for spec in blocks.values():
+            min_col, min_row, max_col, max_row = range_boundaries(spec.get('range') or spec['cell'])
+            for row in range(min_row, max_row + 1):
+                cells.setdefault(row, set()).update(range(min_col, max_col + 1))
+        plan[sheet] = {
+            'max_row': max(cells),
+            'max_col': max(max(cols) for cols in cells.values()),
+            'cells': {row: tuple(sorted(cols)) for row, cols in cells.items()},
+        }
+    return plan
+
+READ_PLAN = compile_read_plan(SHEET_LAYOUT)
+
+def _convert_cell(value):
+    """Normaliza un valor de openpyxl igual que pandas.read_excel (floats enteros -> int)"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _header_names(values):
+    """Nombres de columna al estilo pandas: vacías -> 'Unnamed: i', duplicadas -> 'x.1'"""
+    names, seen = [], {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+class ExcelWorkbook:
+    """Libro Excel abierto una sola vez por petición.
+
+    Sigue el plan de lectura (READ_PLAN por defecto): recorre cada hoja una
+    única vez hasta la última fila necesaria y guarda en memoria solo las
+    celdas que usan las prácticas, que después piden sus bloques sin volver
+    a abrir el zip ni a parsear el XML de la hoja.
+    """
+
+    def __init__(self, source, plan=None, layout=None):
+        self.name = source if isinstance(source, str) else getattr(source, 'name', '<memoria>')
+        self.layout = layout or SHEET_LAYOUT
+        plan = plan or READ_PLAN
+        with span('lectura.libro') as s:
+            wb = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+            try:
+                self.sheet_names = list(wb.sheetnames)
+                self._cells = {}
+                for sheet, sheet_plan in plan.items():
+                    if sheet not in self.sheet_names:
+                        continue
+                    wanted = sheet_plan['cells']
+                    cells = {}
+                    rows = wb[sheet].iter_rows(min_row=1, max_row=sheet_plan['max_row'],
+                                               min_col=1, max_col=sheet_plan['max_col'], values_only=True)
+                    for r, row in enumerate(rows, start=1):
+                        for c in wanted.get(r, ()):
+                            if c <= len(row) and row[c - 1] is not None:
+                                cells[(r, c)] = _convert_cell(row[c - 1])
+                    self._cells[sheet] = cells
+            finally:
+                wb.close()
+            s.set(hojas=len(self.sheet_names), celdas=sum(len(cells) for cells in self._cells.values()))
+
+    def sheet_digest(self, sheet):
+        """SHA-256 de las celdas leídas de la hoja: cambia solo si cambia algo de lo que usan las prácticas"""
+        cells = self._cells.get(sheet)
+        content = repr(None if cells is None else sorted(cells.items()))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def values(self, sheet, ref):
+        """Devuelve el rango `ref` de la hoja como lista de filas (celdas vacías o fuera del plan -> None)"""
+        if sheet not in self._cells:
+            raise ValueError(f"Worksheet named '{sheet}' not found")
+        min_col, min_row, max_col, max_row = range_boundaries(ref)
+        cells = self._cells[sheet]
+        return [[cells.get((r, c)) for c in range(min_col, max_col + 1)]
+                for r in range(min_row, max_row + 1)]
+
+    def cell(self, sheet, ref):
+        """Valor de una única celda (p.ej. "G6"), con el tipo de numpy que daba read_excel(...).iloc[0, 0]"""
+        value = self.values(sheet, ref)[0][0]
+        # round() de Python y el de numpy difieren en los empates (0.5265 -> 0.53 / 0.52):
+        # los números tienen que seguir siendo np.float64/np.int64 para no cambiar las notas
+        if isinstance(value, (bool, int, float)):
+            return np.array([value])[0]
+        return value
+
+    def frame(self, sheet, ref, header=False):
+        """Rango como DataFrame; con header=True la primera fila da los nombres de columna"""
+        rows = self.values(sheet, ref)
+        columns = _header_names(rows.pop(0)) if header else None
+        # Igual que pandas: las filas vacías al final del rango no se devuelven
+        while rows and all(v is None for v in rows[-1]):
+            rows.pop()
+        if not rows and columns is None:
+            return pd.DataFrame()
+        return pd.DataFrame(rows, columns=columns)
+
+    def transposed_frame(self, sheet, ref):
+        """Tabla rellenada por columnas: la primera columna da los campos y la cabecera los registros"""
+        df = self.frame(sheet, ref, header=True)
+        fields = df.iloc[:, 0].tolist()
+        # Los tipos se infieren por columna de la hoja, antes de transponer, igual que con read_excel
+        df_t = df.iloc[:, 1:].astype(object).T.reset_index()
+        df_t.columns = [df.columns[0]] + fields
+        return df_t
+
+    def block(self, sheet, name):
+        """Devuelve el bloque `name` de la hoja tal y como lo describe el layout"""
+        spec = self.layout[sheet][name]
+        if 'cell' in spec:
+            return self.cell(sheet, spec['cell'])
+        with span('lectura.bloque', hoja=sheet, bloque=name) as s:
+            if spec.get('orientation') == 'columns':
+                df = self.transposed_frame(sheet, spec['range'])
+            else:
+                df = self.frame(sheet, spec['range'], header=spec.get('header', False))
+            if 'columns' in spec:
+                df.columns = spec['columns']
+            for col in spec.get('numeric', []):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            s.set(filas=len(df), columnas=len(df.columns))
+        return df
+
+def open_workbook(source):
+    """Acepta un ExcelWorkbook ya abierto o una ruta/fichero y lo abre"""
+    if isinstance(source, ExcelWorkbook):
+        return source
+    return ExcelWorkbook(source)
+
+class InvalidWorkbookError(Exception):
+    """El archivo subido no es un libro de prácticas (falta la hoja INFO PAREJA, etc.)"""
+
+# ============================================================================
+# COMPROBACIÓN PREVIA DEL ARCHIVO
+# ============================================================================
+# Un .xlsx es un zip: su índice da el tamaño de cada parte sin descomprimir
+# nada y xl/workbook.xml (unos cientos de bytes) los nombres de las hojas.
+# Con eso basta para rechazar en milisegundos, antes de openpyxl y de ocupar
+# un proceso de trabajo, lo que no es un .xlsx, lo que no es un libro de
+# prácticas y lo desproporcionado (p.ej. una bomba zip).
+
+REQUIRED_SHEETS = ("INFO PAREJA",) + tuple(SHEET_LAYOUT)
+MAX_WORKBOOK_BYTES = int(float(os.environ.get('WORKBOOK_MAX_MB', 20)) * 1024 * 1024)
+MAX_UNCOMPRESSED_BYTES = int(float(os.environ.get('WORKBOOK_MAX_UNCOMPRESSED_MB', 100)) * 1024 * 1024)
+MAX_COMPRESSION_RATIO = float(os.environ.get('WORKBOOK_MAX_RATIO', 100))  # los libros reales rondan 5-10
+
+_SHEET_TAG = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet'
+
+def _source_size(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+def _megabytes(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+def check_workbook(source):
+    """Comprueba el .xlsx (ruta o fichero) leyendo solo el índice del zip y xl/workbook.xml.
+
+    Lanza InvalidWorkbookError si no es un .xlsx, si supera los límites de
+    tamaño o de compresión o si le falta alguna de REQUIRED_SHEETS; si no,
+    devuelve los nombres de las hojas.
+    """
+    with span('lectura.comprobacion') as s:
+        size = _source_size(source)
+        s.set(bytes=size)
+        if size > MAX_WORKBOOK_BYTES:
+            raise InvalidWorkbookError(f"❌ El archivo es demasiado grande ({_megabytes(size)}; "
+                                       f"máximo {_megabytes(MAX_WORKBOOK_BYTES)})")
+        position = None if isinstance(source, (str, os.PathLike)) else source.tell()
+        try:
+            with zipfile.ZipFile(source) as archive:
+                parts = archive.infolist()
+                uncompressed = sum(part.file_size for part in parts)
+                ratio = uncompressed / max(1, sum(part.compress_size for part in parts))
+                s.set(descomprimido=uncompressed, compresion=round(ratio, 1))
+                if uncompressed > MAX_UNCOMPRESSED_BYTES or ratio > MAX_COMPRESSION_RATIO:
+                    raise InvalidWorkbookError(f"❌ El archivo ocupa {_megabytes(uncompressed)} descomprimido: "
+                                               f"no parece un libro de prácticas")
+                with archive.open('xl/workbook.xml') as f:
+                    sheet_names = [element.get('name') for _, element in ElementTree.iterparse(f)
+                                   if element.tag == _SHEET_TAG]
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+            raise InvalidWorkbookError("❌ El archivo no es un libro de Excel (.xlsx) válido") from None
+        finally:
+            if position is not None:
+                source.seek(position)
+        missing = [sheet for sheet in REQUIRED_SHEETS if sheet not in sheet_names]
+        if missing:
+            raise InvalidWorkbookError(f"❌ El archivo no tiene el formato correcto (faltan las hojas: {', '.join(missing)})")
+    return sheet_names
+
+def open_practicas_workbook(source):
+    """Comprueba el archivo (check_workbook) y lo abre una sola vez: todas las prácticas leen de memoria"""
+    check_workbook(source)
+    return ExcelWorkbook(source)
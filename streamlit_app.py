@@ -1,86 +1,165 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
-from scipy.stats import linregress
-from reportlab.lib.pagesizes import A4
-# ... (mantener el resto de imports de reportlab igual que en tu código original)
+"""
+Frontend Streamlit del dashboard de prácticas de Fisiología Vegetal.
+
+Es una capa fina sobre el paquete practicas, igual que app.py: mismo análisis
+(process_practica1..5), mismas salidas de cada práctica y mismo informe PDF. Streamlit vuelve a ejecutar el script entero con
+cada interacción, así que nada se calcula dos veces:
+
+  - cada práctica se analiza solo cuando se abre su pestaña y una sola vez
+    por contenido de su hoja (st.cache_data con practica_digest como clave):
+    al subir el libro corregido, las prácticas que no cambian se reutilizan;
+  - las figuras se guardan ya rasterizadas (figures_to_images, como en la
+    app Gradio, pero en PNG) junto a las tablas y los textos: la caché no
+    retiene figuras y no se vuelven a dibujar en cada ejecución;
+  - el PDF reutiliza los análisis ya hechos y también queda en caché.
+
+Necesita Streamlit 1.55 o posterior: pestañas con estado (st.tabs con key y
+on_change, Tab.open).
+
+Uso:
+    streamlit run streamlit_app.py
+"""
+
+import hashlib
 import io
+import os
 import warnings
-from datetime import datetime
 
-# Configuración de página de Streamlit
-st.set_page_config(page_title="Dashboard Fisiología Vegetal UAM", layout="wide")
+import streamlit as st
+
+import practicas
+
+warnings.filterwarnings('ignore')
 
-# MANTENER TUS FUNCIONES MATEMÁTICAS (sigmoid, calculate_potencial_50, validate_column, etc.)
-# Copia aquí exactamente las funciones matemáticas de tu código original
+# Misma caducidad y tamaño que la caché de resultados de la app Gradio
+CACHE_TTL = 3600
+CACHE_ENTRIES = 32
+
+# Contenido de cada pestaña, en el orden de practicaN_outputs (como en la
+# interfaz Gradio): por sección, el título y el tipo de cada output
+TABS = {
+    1: ("🌱 Potencial Osmótico y Hídrico", [
+        ("💧 Sacarosa", ['tabla', 'texto']),
+        ("🧅 Cebolla - Plasmólisis", ['tabla', 'figura', 'texto']),
+        ("🥔 Patata - Potencial Hídrico", ['tabla', 'figura', 'texto']),
+    ]),
+    2: ("🌾 Auxinas y Estrés Salino", [
+        ("🌽 Maíz - Auxina", ['tabla', 'figura', 'texto']),
+        ("🌱 Guisante - Estrés Salino", ['tabla', 'figura', 'figura', 'texto']),
+    ]),
+    3: ("🍃 Clorofilas y Pigmentos", [
+        ("🌿 Clorofila en Espinaca", ['tabla', 'texto']),
+        ("🎨 Cromatografía de Pigmentos", ['tabla', 'texto']),
+        ("🔵 Pigmentos en *Anabaena*", ['tabla', 'texto']),
+    ]),
+    4: ("☀️ Reacción de Hill", [
+        ("🌿 Clorofila en Tilacoides", ['tabla', 'texto']),
+        ("🔬 Concentración de Ferricianuro", ['tabla', 'texto']),
+        ("⚡ Actividad Fotosintética", ['tabla', 'figura', 'tabla', 'texto']),
+    ]),
+    5: ("🌾 Germinación y α-Amilasa", [
+        ("🌱 Germinación de Cebada", ['texto']),
+        ("🧪 Actividad α-Amilasa", ['tabla', 'figura', 'texto']),
+    ]),
+}
+
+# ============================================================================
+# ANÁLISIS EN CACHÉ
+# ============================================================================
+
+# Los parámetros con _ no forman parte de la clave de st.cache_data: las
+# prácticas se indexan por el contenido de su hoja, no por el archivo
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def practica_keys(data):
+    """practica_digest de cada práctica del libro `data` (bytes del .xlsx)"""
+    wb = practicas.open_practicas_workbook(io.BytesIO(data))
+    return {n: practicas.practica_digest(wb, n) for n in practicas.PRACTICA_PROCESSORS}
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=5 * CACHE_ENTRIES, show_spinner=False)
+def practica_results(key, n, _data):
+    """Resultado de process_practicaN para la hoja con clave `key` del libro `_data`, con las figuras ya rasterizadas"""
+    wb = practicas.open_practicas_workbook(io.BytesIO(_data))
+    # En PNG: st.image vuelve a codificar en cada ejecución lo que no sea PNG o JPEG
+    return practicas.figures_to_images(practicas.PRACTICA_PROCESSORS[n](wb), fmt='png')
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def report_pdf(data):
+    """Bytes del informe PDF (None si falla); las prácticas ya vistas salen de la caché"""
+    keys = practica_keys(data)
+    return practicas.build_pdf({n: practica_results(keys[n], n, data) for n in practicas.PRACTICA_PROCESSORS})
 
 # ============================================================================
 # INTERFAZ STREAMLIT
 # ============================================================================
 
-st.title("🌱 Dashboard de Prácticas - Fisiología Vegetal")
-st.subheader("Universidad Autónoma de Madrid (UAM)")
-
-# Barra lateral para carga de archivos
-with st.sidebar:
-    st.header("Configuración")
-    uploaded_file = st.file_uploader("Sube tu archivo Excel (.xlsx)", type=["xlsx"])
-    
-if uploaded_file:
-    # Procesamiento (Llamamos a tus funciones originales de lógica)
-    # Nota: En Streamlit, puedes procesar pestaña por pestaña para ahorrar memoria
-    
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "Práctica 1", "Práctica 2", "Práctica 3", "Práctica 4", "Práctica 5"
-    ])
-
-    # --- PESTAÑA 1 ---
-    with tab1:
-        st.header("Potencial Osmótico y Hídrico")
-        p1 = process_practica1(uploaded_file) # Adaptar función para aceptar el objeto file
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Sacarosa")
-            st.dataframe(p1['sacarosa'])
-            st.markdown(p1['sacarosa_expl'])
-            
-        with col2:
-            st.subheader("Cebolla - Plasmólisis")
-            if 'onion_fig' in p1:
-                st.pyplot(p1['onion_fig'])
-            st.markdown(p1['onion_expl'])
-
-    # --- PESTAÑA 4 (Ejemplo de Reacción de Hill) ---
-    with tab4:
-        st.header("Reacción de Hill")
-        p4 = process_practica4(uploaded_file)
-        
-        st.subheader("⚡ Actividad Fotosintética")
-        c1, c2 = st.columns([1, 2])
-        with c1:
-            st.dataframe(p4['fotosintesis'])
-        with c2:
-            st.pyplot(p4['hill_fig'])
-        
-        st.markdown(p4['foto_expl'])
-
-    # --- GENERACIÓN DE PDF ---
-    st.divider()
+def show_practica(data, n):
+    title, sections = TABS[n]
+    st.header(title)
+    with st.spinner(f"Analizando la Práctica {n}..."):
+        builder, _ = practicas.PRACTICA_OUTPUTS[n]
+        outputs = iter(builder(practica_results(practica_keys(data)[n], n, data)))
+    for heading, kinds in sections:
+        st.subheader(heading)
+        for kind in kinds:
+            value = next(outputs)
+            if kind == 'tabla':
+                st.dataframe(value, hide_index=True)
+            elif kind == 'figura':
+                if value is None:
+                    st.warning("No se pudo generar la gráfica")
+                else:
+                    st.image(value)
+            elif value:
+                st.markdown(value, unsafe_allow_html=True)
+
+def show_pdf(data, digest, name):
+    """Botón del informe; una vez generado, la descarga sigue disponible en cada ejecución"""
     if st.button("📄 Generar Informe PDF Completo"):
-        # Reutilizamos tu función generate_simple_pdf
-        all_results = {'p1': p1, 'p2': p2, 'p3': p3, 'p4': p4, 'p5': p5}
-        pdf_path = generate_simple_pdf(all_results)
-        
-        with open(pdf_path, "rb") as f:
-            st.download_button(
-                label="⬇️ Descargar PDF",
-                data=f,
-                file_name="Informe_Fisiologia_UAM.pdf",
-                mime="application/pdf"
-            )
-
-else:
-    st.info("👋 Por favor, sube un archivo Excel en la barra lateral para comenzar el análisis.")
+        st.session_state['pdf_for'] = digest
+    if st.session_state.get('pdf_for') != digest:
+        return
+    with st.spinner("Generando informe PDF..."):
+        pdf_bytes = report_pdf(data)
+    if pdf_bytes is None:
+        st.error("❌ No se pudo generar el PDF")
+        return
+    st.download_button(
+        label="⬇️ Descargar PDF",
+        data=pdf_bytes,
+        file_name=f"Informe_{os.path.splitext(name)[0]}.pdf",
+        mime="application/pdf",
+        on_click='ignore'
+    )
+
+def main():
+    st.set_page_config(page_title="Dashboard Fisiología Vegetal UAM", layout="wide")
+    st.title("🌱 Dashboard de Prácticas - Fisiología Vegetal")
+    st.subheader("Universidad Autónoma de Madrid (UAM)")
+
+    with st.sidebar:
+        st.header("Configuración")
+        uploaded_file = st.file_uploader("Sube tu archivo Excel (.xlsx)", type=["xlsx"])
+
+    if uploaded_file is None:
+        st.info("👋 Por favor, sube un archivo Excel en la barra lateral para comenzar el análisis.")
+        return
+
+    data = uploaded_file.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+
+    # Solo se ejecuta (y se analiza) la pestaña abierta
+    tabs = st.tabs([f"Práctica {n}" for n in TABS], key='practica', on_change='rerun')
+    try:
+        for n, tab in zip(TABS, tabs):
+            if tab.open:
+                with tab:
+                    show_practica(data, n)
+    except practicas.InvalidWorkbookError as e:
+        st.error(str(e))
+        return
+
+    st.divider()
+    show_pdf(data, digest, uploaded_file.name)
+
+main()
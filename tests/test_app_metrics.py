@@ -0,0 +1,56 @@
+"""
+Métricas de la caché de resultados del dashboard Gradio.
+
+Se ejecuta con: python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+# Antes de importar app: análisis en el propio proceso y almacén temporal
+os.environ.setdefault('ANALYSIS_WORKERS', '0')
+os.environ.setdefault('ARTIFACT_DIR', tempfile.mkdtemp(prefix='practicas_tests_'))
+
+import app
+import practicas
+from workbooks import workbook_bytes
+
+
+def cache_ratio():
+    metrics = practicas.MetricsRegistry()
+    app.add_live_metrics(metrics)
+    for line in metrics.render().splitlines():
+        if line.startswith('practicas_cache_ratio_aciertos '):
+            return float(line.split()[1])
+    raise AssertionError("Falta practicas_cache_ratio_aciertos")
+
+
+def test_pdf_download_leaves_cache_ratio_unchanged(tmp_path):
+    path = tmp_path / 'libro.xlsx'
+    path.write_bytes(workbook_bytes(0).getvalue())
+    file = types.SimpleNamespace(name=str(path))
+    for _ in app.process_all_practicas(file, 'sesion'):
+        pass
+    assert app.deliver_pdf(file, 'sesion') is not None
+
+    counts = (app.RESULT_CACHE.hits, app.RESULT_CACHE.misses)
+    ratio = cache_ratio()
+    # Sin trabajo de esta sesión: el PDF sale de la caché de resultados
+    assert app.deliver_pdf(file, 'otra sesion') is not None
+    assert app.deliver_pdf(file, 'otra sesion') is not None
+    assert (app.RESULT_CACHE.hits, app.RESULT_CACHE.misses) == counts
+    assert cache_ratio() == ratio
+
+
+def test_peek_does_not_count_lookups():
+    cache = app.ResultCache()
+    cache.put('libro', ['outputs'])
+    assert cache.peek('libro') == ['outputs']
+    assert cache.peek('otro') is None
+    assert (cache.hits, cache.misses) == (0, 0)